@@ -9,6 +9,8 @@ from .achievements import AchievementsCommand
 from .profile import ProfileCommand
 from .help import HelpCommand
 from .cow import CowCommand
+from .leaderboard import LeaderboardCommand
+from .stats import StatsCommand
 
 __all__ = [
     "GuessCommand",
@@ -21,4 +23,6 @@ __all__ = [
     "ProfileCommand",
     "HelpCommand",
     "CowCommand",
+    "LeaderboardCommand",
+    "StatsCommand",
 ]
@@ -1,10 +1,121 @@
+import operator
+from bisect import bisect_right
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
 from astrbot.api.event import AstrMessageEvent, MessageEventResult
 
 from ..utils.logger_manager import PluginLogger, UserActionLogger
+from ..data import activity_log
 
 
 from ..config import ACHIEVEMENTS
 
+# 成就统计项: 统计项名称 -> 取值函数
+ACHIEVEMENT_STATS: Dict[str, Callable[[Dict[str, Any]], int]] = {
+    "points": lambda user: user["points"],
+    "games_won": lambda user: user["games_won"],
+    "games_played": lambda user: user["games_played"],
+    "consecutive_days": lambda user: user["consecutive_days"],
+    "ssr_count": lambda user: user["ssr_count"],
+    "total_spent": lambda user: user["total_spent"],
+    "spin.total_spins": lambda user: user["spin"]["total"],
+    "spin.streak_days": lambda user: user["spin"]["streak"],
+    # 转盘特等奖（tier=1）次数
+    "spin.jackpots": lambda user: activity_log.hits(user["spin"], 1),
+}
+
+_OPS: Dict[str, Callable[[int, int], bool]] = {
+    ">=": operator.ge,
+    ">": operator.gt,
+    "<=": operator.le,
+    "<": operator.lt,
+    "==": operator.eq,
+}
+
+
+class AchievementIndex:
+    """按统计项索引的成就表
+
+    ">=" 条件按阈值排序并预先计算前缀位图，判定一个统计项只需一次二分查找；
+    其余比较方式按统计项分组后逐条判定。
+    """
+
+    def __init__(self, achievements: List[Dict[str, Any]]):
+        self.achievements = achievements
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.by_bit: Dict[int, Dict[str, Any]] = {}
+        self._thresholds: Dict[str, List[int]] = {}
+        self._prefix_masks: Dict[str, List[int]] = {}
+        self._others: Dict[str, List[Tuple[Callable[[int, int], bool], int, int]]] = {}
+
+        ordered: Dict[str, List[Tuple[int, int]]] = {}
+        for achievement in achievements:
+            bit, stat = achievement["bit"], achievement["stat"]
+            if bit in self.by_bit:
+                raise ValueError(f"成就位重复: {bit}")
+            if stat not in ACHIEVEMENT_STATS:
+                raise ValueError(f"未知的成就统计项: {stat}")
+            self.by_id[achievement["id"]] = achievement
+            self.by_bit[bit] = achievement
+            op = achievement.get("op", ">=")
+            if op == ">=":
+                ordered.setdefault(stat, []).append((achievement["threshold"], bit))
+            else:
+                self._others.setdefault(stat, []).append(
+                    (_OPS[op], achievement["threshold"], bit)
+                )
+
+        for stat, entries in ordered.items():
+            entries.sort()
+            masks, mask = [], 0
+            for _, bit in entries:
+                mask |= 1 << bit
+                masks.append(mask)
+            self._thresholds[stat] = [threshold for threshold, _ in entries]
+            self._prefix_masks[stat] = masks
+
+        self.stats = frozenset(self._thresholds) | frozenset(self._others)
+
+        # 预先渲染的成就行: (位, 已解锁行, 未解锁行)，按定义顺序
+        self.lines: Tuple[Tuple[int, str, str], ...] = tuple(
+            (
+                a["bit"],
+                f"✅ {a['name']}: {a['description']}\n",
+                f"❌ {a['name']}: {a['description']}\n",
+            )
+            for a in achievements
+        )
+
+    def satisfied(self, stat: str, value: int) -> int:
+        """返回统计项取值为 value 时满足条件的成就位图"""
+        mask = 0
+        thresholds = self._thresholds.get(stat)
+        if thresholds:
+            count = bisect_right(thresholds, value)
+            if count:
+                mask = self._prefix_masks[stat][count - 1]
+        for compare, threshold, bit in self._others.get(stat, ()):
+            if compare(value, threshold):
+                mask |= 1 << bit
+        return mask
+
+    def render(self, mask: int) -> str:
+        """由预渲染的成就行拼接成就列表"""
+        unlocked = [line for bit, line, _ in self.lines if mask >> bit & 1]
+        locked = [line for bit, _, line in self.lines if not mask >> bit & 1]
+        if unlocked:
+            head = "🎖️ 已解锁成就 🎖️\n" + "".join(unlocked) + "\n"
+        else:
+            head = "你还没有解锁任何成就，继续努力吧！\n\n"
+        return f"🏆 成就系统 🏆\n{head}🔒 未解锁成就 🔒\n" + "".join(locked)
+
+    def unlocked(self, mask: int) -> List[Dict[str, Any]]:
+        """按定义顺序返回位图中的成就"""
+        return [a for a in self.achievements if mask >> a["bit"] & 1]
+
+
+ACHIEVEMENT_INDEX = AchievementIndex(ACHIEVEMENTS)
+
 
 class AchievementManager:
     """成就管理器"""
@@ -14,118 +125,82 @@ class AchievementManager:
         self.plugin_name = "astrbot_plugin_interactive"
         self.action_logger = UserActionLogger(logger)
         self.user_manager = user_manager
+        self.index = ACHIEVEMENT_INDEX
+        self.unlock_counter = user_manager.metrics.counter(
+            "achievements_unlocked_total", "成就解锁次数", ("achievement",)
+        )
 
     async def check(
-        self, user_id: str, platform: str, user_data: dict, event: AstrMessageEvent
+        self, session, event: AstrMessageEvent, stats: Optional[Iterable[str]] = None
     ) -> None:
-        """检查并解锁成就"""
-        unlocked = []
-
-        for achievement in ACHIEVEMENTS:
-            if achievement["id"] not in user_data["achievements"]:
-                if self._check_condition(achievement, user_data):
-                    user_data["achievements"].append(achievement["id"])
-                    user_data["points"] += achievement["reward"]
-                    unlocked.append(
-                        f"🎖️ {achievement['name']} - {achievement['description']} (+{achievement['reward']}积分)"
-                    )
-                    self.logger.info(
-                        f"[{self.logger}] 用户 {user_id}@{platform} 解锁成就: {achievement['name']}"
-                    )
-
-        if unlocked:
-            await self.user_manager.update_user_data(user_id, platform, user_data)
+        """
+        检查并解锁成就（修改随会话一并提交）
+
+        Args:
+            session: 用户会话
+            event: 消息事件
+            stats: 本次发生变化的统计项，为 None 时检查全部统计项
+        """
+        user_id, platform = session.user_id, session.platform
+        user_data = await session.load()
+        mask = user_data["achievement_bits"]
+
+        pending = set(self.index.stats if stats is None else stats)
+        new_mask = 0
+        while pending:
+            stat = pending.pop()
+            if stat not in self.index.stats:
+                continue
+            gained = self.index.satisfied(stat, ACHIEVEMENT_STATS[stat](user_data))
+            gained &= ~(mask | new_mask)
+            if not gained:
+                continue
+            new_mask |= gained
+            for achievement in self.index.unlocked(gained):
+                self.unlock_counter.inc(1, achievement["id"])
+                session.add_points(achievement["reward"], reason="achievement")
+                session.action_logger.log_achievement(
+                    user_id, platform, achievement["id"], achievement["reward"]
+                )
+                self.logger.info(
+                    "解锁成就",
+                    user_id=user_id,
+                    platform=platform,
+                    achievement=achievement["name"],
+                )
+            # 成就奖励会改变积分，需要重新检查积分类成就
+            pending.add("points")
+
+        if new_mask:
+            user_data["achievement_bits"] = mask | new_mask
+            session.mark_dirty()
+            unlocked = [
+                f"🎖️ {achievement['name']} - {achievement['description']} (+{achievement['reward']}积分)"
+                for achievement in self.index.unlocked(new_mask)
+            ]
             event.set_result(
                 MessageEventResult().message(f"🎉 解锁成就！\n" + "\n".join(unlocked))
             )
 
-    def _check_condition(self, achievement: dict, user_data: dict) -> bool:
-        """检查成就条件"""
-        if achievement["id"] == "first_blood":
-            return user_data["games_won"] >= 1
-        elif achievement["id"] == "sign_master":
-            return user_data["consecutive_days"] >= 7
-        elif achievement["id"] == "millionaire":
-            return user_data["points"] >= 500
-        elif achievement["id"] == "game_addict":
-            return user_data["games_played"] >= 20
-        elif achievement["id"] == "lottery_king":
-            return user_data["ssr_count"] >= 5
-        elif achievement["id"] == "shopper":
-            return user_data["total_spent"] >= 1000
-        # 转盘相关成就
-        elif achievement["id"] == "spin_beginner":
-            spin_data = user_data.get("spin", {})
-            return spin_data.get("total_spins", 0) >= 1
-        elif achievement["id"] == "spin_regular":
-            spin_data = user_data.get("spin", {})
-            return spin_data.get("total_spins", 0) >= 10
-        elif achievement["id"] == "spin_master":
-            spin_data = user_data.get("spin", {})
-            # 检查连续7天参与（简化版：检查最近7天是否都有记录）
-            history = spin_data.get("history", [])
-            if len(history) < 7:
-                return False
-            from datetime import datetime, timedelta
-
-            today = datetime.now().date()
-            dates = set()
-            for entry in history[:20]:  # 检查最近20条记录
-                try:
-                    entry_date = datetime.strptime(entry["date"], "%Y-%m-%d").date()
-                    dates.add(entry_date)
-                except:
-                    continue
-            # 检查今天和前6天是否都有记录
-            for i in range(7):
-                check_date = today - timedelta(days=i)
-                if check_date not in dates:
-                    return False
-            return True
-        elif achievement["id"] == "lucky_star":
-            spin_data = user_data.get("spin", {})
-            history = spin_data.get("history", [])
-            # 检查是否获得过特等奖（tier=1）
-            return any(entry.get("tier") == 1 for entry in history)
-        return False
-
 
 class AchievementsCommand:
     """查看成就命令"""
 
     def __init__(self, user_manager, logger: PluginLogger):
+        self.logger = logger
         self.user_manager = user_manager
 
-    async def handle(self, event: AstrMessageEvent) -> None:
+    async def handle(self, event: AstrMessageEvent, session) -> None:
         """处理查看成就命令"""
         if not event.session_id:
             event.set_result(MessageEventResult().message("无法获取用户ID"))
             return
 
-        user_id = event.get_sender_id()
-        platform = event.get_platform_id()
+        user_id, platform = session.user_id, session.platform
 
-        self.logger.debug(f"[{self.logger}] 用户 {user_id}@{platform} 查看成就列表")
+        self.logger.debug("查看成就列表", user_id=user_id, platform=platform)
 
-        user = await self.user_manager.get_user_data(user_id, platform)
-
-        result = "🏆 成就系统 🏆\n"
-
-        if not user["achievements"]:
-            result += "你还没有解锁任何成就，继续努力吧！\n\n"
-        else:
-            result += "🎖️ 已解锁成就 🎖️\n"
-            for ach_id in user["achievements"]:
-                achievement = next((a for a in ACHIEVEMENTS if a["id"] == ach_id), None)
-                if achievement:
-                    result += (
-                        f"✅ {achievement['name']}: {achievement['description']}\n"
-                    )
-            result += "\n"
-
-        result += "🔒 未解锁成就 🔒\n"
-        for achievement in ACHIEVEMENTS:
-            if achievement["id"] not in user["achievements"]:
-                result += f"❌ {achievement['name']}: {achievement['description']}\n"
+        user = await session.load()
+        result = ACHIEVEMENT_INDEX.render(user["achievement_bits"])
 
         event.set_result(MessageEventResult().message(result))
@@ -0,0 +1,20 @@
+"""
+批量命令参数
+抽奖、转盘和牛牛互动共用的连续执行次数解析
+"""
+
+from typing import Optional
+
+# 单条命令最多连续执行次数
+MAX_BATCH = 10
+
+
+def parse_draw_count(text: str, limit: int) -> Optional[int]:
+    """解析连续执行次数，留空为 1 次，非法或超出上限时返回 None"""
+    text = (text or "").strip()
+    if not text:
+        return 1
+    if not text.isdigit():
+        return None
+    count = int(text)
+    return count if 1 <= count <= limit else None
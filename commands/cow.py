@@ -1,12 +1,54 @@
+import math
 import random
 from datetime import datetime
-from typing import Any
 from astrbot.api.event import AstrMessageEvent, MessageEventResult
 
 from ..utils.logger_manager import PluginLogger, UserActionLogger
-
-
-from ..config import COW_LEVELS, DEFAULT_COW, COW_INTERACTIONS, COW_NICKNAMES
+from .batch import MAX_BATCH, parse_draw_count
+
+
+from ..config import DEFAULT_COW, COW_NICKNAMES
+
+# 互动方式: 恢复的状态、提示文本和流水原因
+_INTERACTIONS = {
+    "feed": {
+        "label": "喂食",
+        "stat": "hunger",
+        "stat_name": "饱食度",
+        "restore": "hunger_restore",
+        "time_field": "last_feed_time",
+        "reason": "cow_feed",
+        "full": "💕 {name} 已经吃饱啦，吃不下更多了！",
+        "done": "🍽️ 你喂了 {name} 一顿美味的食物！",
+    },
+    "play": {
+        "label": "玩耍",
+        "stat": "mood",
+        "stat_name": "心情",
+        "restore": "mood_restore",
+        "time_field": "last_play_time",
+        "reason": "cow_play",
+        "full": "💕 {name} 心情很好，暂时不想玩~",
+        "done": "🎮 你和 {name} 玩得很开心！",
+    },
+    "pet": {
+        "label": "抚摸",
+        "stat": None,
+        "reason": "cow_pet",
+        "done": "💕 你轻轻抚摸了 {name}~",
+    },
+}
+
+_PET_RESPONSES = [
+    "💕 {name} 享受地蹭了蹭你的手~",
+    "😊 {name} 很喜欢你的抚摸~",
+    "🥰 {name} 开心地叫了一声~",
+    "🤗 {name} 温顺地靠在你身边~",
+]
+
+
+def _now_ms() -> int:
+    return int(datetime.now().timestamp() * 1000)
 
 
 class CowCommand:
@@ -20,28 +62,21 @@ class CowCommand:
         self.user_manager = user_manager
 
     async def handle(
-        self, event: AstrMessageEvent, action: str = "", nickname: str = ""
+        self, event: AstrMessageEvent, session, action: str = "", nickname: str = ""
     ) -> None:
         """处理牛牛命令"""
         if not event.session_id:
             event.set_result(MessageEventResult().message("无法获取用户 ID"))
             return
 
-        user_id = event.get_sender_id()
-        platform = event.get_platform_id()
-
         if not action:
-            await self._show_cow_info(event, user_id, platform)
+            await self._show_cow_info(event, session)
         elif action == "adopt":
-            await self._adopt_cow(event, user_id, platform, nickname)
-        elif action == "feed":
-            await self._feed_cow(event, user_id, platform)
-        elif action == "play":
-            await self._play_with_cow(event, user_id, platform)
-        elif action == "pet":
-            await self._pet_cow(event, user_id, platform)
+            await self._adopt_cow(event, session, nickname)
+        elif action in _INTERACTIONS:
+            await self._interact(event, session, action, nickname)
         elif action == "rename":
-            await self._rename_cow(event, user_id, platform, nickname)
+            await self._rename_cow(event, session, nickname)
         else:
             event.set_result(
                 MessageEventResult().message(
@@ -50,13 +85,11 @@ class CowCommand:
                 )
             )
 
-    async def _show_cow_info(
-        self, event: AstrMessageEvent, user_id: str, platform: str
-    ) -> None:
+    async def _show_cow_info(self, event: AstrMessageEvent, session) -> None:
         """显示牛牛信息"""
-        user = await self.user_manager.get_user_data(user_id, platform)
+        user = await session.load()
 
-        if not user.get("cow"):
+        if not user["cow"]:
             event.set_result(
                 MessageEventResult().message(
                     "🐄 你还没有领养牛牛哦！\n"
@@ -65,11 +98,20 @@ class CowCommand:
             )
             return
 
+        runtime = self.star.runtime
         cow = user["cow"]
-        level_info = self._get_level_info(cow["level"])
+        levels = runtime.cow_levels
+        level_info = levels.info(cow["level"])
+        if not cow.get("status_time"):
+            # 旧记录从首次查看时开始计算衰减
+            cow["status_time"] = _now_ms()
+            session.mark_dirty()
+        health, mood, hunger = (
+            round(value) for value in runtime.cow_status.current(cow, _now_ms())
+        )
 
         # 计算升级进度
-        next_level = self._get_next_level(cow["level"])
+        next_level = levels.next(cow["level"])
         if next_level:
             exp_progress = f"{cow['exp']}/{next_level['exp_needed']}"
             favor_progress = f"{cow['favor']}/{next_level['favor_needed']}"
@@ -78,9 +120,9 @@ class CowCommand:
             favor_progress = "已满级"
 
         # 状态条
-        health_bar = self._get_status_bar(cow["health"])
-        mood_bar = self._get_status_bar(cow["mood"])
-        hunger_bar = self._get_status_bar(cow["hunger"])
+        health_bar = self._get_status_bar(health)
+        mood_bar = self._get_status_bar(mood)
+        hunger_bar = self._get_status_bar(hunger)
 
         result = (
             f"🐄 {cow['name']} 的信息 🐄\n"
@@ -88,25 +130,23 @@ class CowCommand:
             f"经验: {exp_progress}\n"
             f"好感度: {favor_progress}\n\n"
             f"状态:\n"
-            f"  ❤️ 健康: {health_bar} {cow['health']}%\n"
-            f"  😊 心情: {mood_bar} {cow['mood']}%\n"
-            f"  🍽️ 饱食: {hunger_bar} {cow['hunger']}%\n\n"
+            f"  ❤️ 健康: {health_bar} {health}%\n"
+            f"  😊 心情: {mood_bar} {mood}%\n"
+            f"  🍽️ 饱食: {hunger_bar} {hunger}%\n\n"
             f"📝 指令:\n"
-            f"  cow feed (10 积分) - 喂食牛牛\n"
-            f"  cow play (5 积分) - 和牛牛玩耍\n"
-            f"  cow pet (免费) - 抚摸牛牛\n"
+            f"  cow feed [次数] ({runtime.cow.feed_cost} 积分/次) - 喂食牛牛\n"
+            f"  cow play [次数] ({runtime.cow.play_cost} 积分/次) - 和牛牛玩耍\n"
+            f"  cow pet [次数] (免费) - 抚摸牛牛\n"
             f"  cow rename <昵称> - 给牛牛改名"
         )
 
         event.set_result(MessageEventResult().message(result))
 
-    async def _adopt_cow(
-        self, event: AstrMessageEvent, user_id: str, platform: str, nickname: str
-    ) -> None:
+    async def _adopt_cow(self, event: AstrMessageEvent, session, nickname: str) -> None:
         """领养牛牛"""
-        user = await self.user_manager.get_user_data(user_id, platform)
+        user = await session.load()
 
-        if user.get("cow"):
+        if user["cow"]:
             event.set_result(
                 MessageEventResult().message(
                     f"❌ 你已经领养了牛牛 {user['cow']['name']}，不能再领养了！"
@@ -125,13 +165,16 @@ class CowCommand:
         # 创建新牛牛
         cow = DEFAULT_COW.copy()
         cow["name"] = nickname
-        cow["created_at"] = int(datetime.now().timestamp() * 1000)
+        cow["created_at"] = cow["status_time"] = _now_ms()
 
         user["cow"] = cow
-        await self.user_manager.update_user_data(user_id, platform, user)
+        session.mark_dirty()
 
         self.logger.info(
-            f"[{self.logger}] 用户 {user_id}@{platform} 领养了牛牛: {nickname}"
+            "领养牛牛",
+            user_id=session.user_id,
+            platform=session.platform,
+            nickname=nickname,
         )
 
         event.set_result(
@@ -141,158 +184,101 @@ class CowCommand:
             )
         )
 
-    async def _feed_cow(
-        self, event: AstrMessageEvent, user_id: str, platform: str
+    async def _interact(
+        self, event: AstrMessageEvent, session, action: str, count: str = ""
     ) -> None:
-        """喂食牛牛"""
-        user = await self.user_manager.get_user_data(user_id, platform)
-
-        if not user.get("cow"):
-            event.set_result(MessageEventResult().message("❌ 你还没有领养牛牛！"))
-            return
-
-        cow = user["cow"]
-        config = COW_INTERACTIONS["feed"]
-
-        # 检查积分
-        if user["points"] < config["points_cost"]:
-            event.set_result(
-                MessageEventResult().message(
-                    f"❌ 积分不足！喂食需要 {config['points_cost']} 积分"
-                )
-            )
-            return
-
-        # 检查是否太饱了
-        if cow["hunger"] >= 100:
+        """
+        与牛牛互动（喂食、玩耍、抚摸），可指定次数
+
+        多次互动一次性计算：按饱食度或心情的剩余空间截断次数，积分一次扣除，
+        经验和好感度一次累加后再结算升级
+        """
+        times = parse_draw_count(count, MAX_BATCH)
+        if times is None:
             event.set_result(
                 MessageEventResult().message(
-                    f"💕 {cow['name']} 已经吃饱啦，吃不下更多了！"
+                    f"❌ 次数必须是 1~{MAX_BATCH} 之间的整数，如 'cow {action} 5'"
                 )
             )
             return
 
-        # 执行喂食
-        user["points"] -= config["points_cost"]
-        user["total_spent"] += config["points_cost"]
-
-        cow["hunger"] = min(100, cow["hunger"] + config["hunger_restore"])
-        cow["favor"] += config["favor_gain"]
-        cow["exp"] += config["exp_gain"]
-        cow["last_feed_time"] = int(datetime.now().timestamp() * 1000)
-
-        # 检查升级
-        leveled_up = self._check_level_up(cow)
-
-        await self.user_manager.update_user_data(user_id, platform, user)
-
-        result = f"🍽️ 你喂了 {cow['name']} 一顿美味的食物！\n"
-        result += f"饱食度 +{config['hunger_restore']} | 好感度 +{config['favor_gain']} | 经验 +{config['exp_gain']}"
-
-        if leveled_up:
-            level_info = self._get_level_info(cow["level"])
-            result += f"\n🎉 升级啦！{cow['name']} 升到了 Lv.{cow['level']} {level_info['name']}！"
+        user = await session.load()
 
-        event.set_result(MessageEventResult().message(result))
-
-    async def _play_with_cow(
-        self, event: AstrMessageEvent, user_id: str, platform: str
-    ) -> None:
-        """和牛牛玩耍"""
-        user = await self.user_manager.get_user_data(user_id, platform)
-
-        if not user.get("cow"):
+        if not user["cow"]:
             event.set_result(MessageEventResult().message("❌ 你还没有领养牛牛！"))
             return
 
+        runtime = self.star.runtime
         cow = user["cow"]
-        config = COW_INTERACTIONS["play"]
-
-        # 检查积分
-        if user["points"] < config["points_cost"]:
-            event.set_result(
-                MessageEventResult().message(
-                    f"❌ 积分不足！玩耍需要 {config['points_cost']} 积分"
+        config = runtime.cow_interactions[action]
+        spec = _INTERACTIONS[action]
+        stat = spec["stat"]
+        now = _now_ms()
+
+        requested = times
+        if stat:
+            runtime.cow_status.settle(cow, now)
+            # 已满时拒绝，否则只执行到刚好回满所需的次数
+            if cow[stat] >= 100:
+                event.set_result(
+                    MessageEventResult().message(spec["full"].format(name=cow["name"]))
                 )
-            )
-            return
+                return
+            restore = config[spec["restore"]]
+            times = min(times, math.ceil((100 - cow[stat]) / restore))
 
-        # 检查心情
-        if cow["mood"] >= 100:
+        # 检查积分
+        cost = config["points_cost"] * times
+        if user["points"] < cost:
+            need = f"{times}次{spec['label']}" if times > 1 else spec["label"]
             event.set_result(
-                MessageEventResult().message(f"💕 {cow['name']} 心情很好，暂时不想玩~")
+                MessageEventResult().message(f"❌ 积分不足！{need}需要 {cost} 积分")
             )
             return
 
-        # 执行玩耍
-        user["points"] -= config["points_cost"]
-        user["total_spent"] += config["points_cost"]
-
-        cow["mood"] = min(100, cow["mood"] + config["mood_restore"])
-        cow["favor"] += config["favor_gain"]
-        cow["exp"] += config["exp_gain"]
-        cow["last_play_time"] = int(datetime.now().timestamp() * 1000)
+        # 执行互动
+        if cost:
+            session.consume_points(cost, reason=spec["reason"])
+            user["total_spent"] += cost
+        if stat:
+            cow[stat] = min(100, cow[stat] + restore * times)
+            cow[spec["time_field"]] = now
+        favor = config["favor_gain"] * times
+        exp = config["exp_gain"] * times
+        cow["favor"] += favor
+        cow["exp"] += exp
 
         # 检查升级
-        leveled_up = self._check_level_up(cow)
-
-        await self.user_manager.update_user_data(user_id, platform, user)
-
-        result = f"🎮 你和 {cow['name']} 玩得很开心！\n"
-        result += f"心情 +{config['mood_restore']} | 好感度 +{config['favor_gain']} | 经验 +{config['exp_gain']}"
+        levels = runtime.cow_levels
+        leveled_up = levels.apply(cow)
 
-        if leveled_up:
-            level_info = self._get_level_info(cow["level"])
-            result += f"\n🎉 升级啦！{cow['name']} 升到了 Lv.{cow['level']} {level_info['name']}！"
+        session.mark_dirty()
 
-        event.set_result(MessageEventResult().message(result))
-
-    async def _pet_cow(
-        self, event: AstrMessageEvent, user_id: str, platform: str
-    ) -> None:
-        """抚摸牛牛"""
-        user = await self.user_manager.get_user_data(user_id, platform)
-
-        if not user.get("cow"):
-            event.set_result(MessageEventResult().message("❌ 你还没有领养牛牛！"))
-            return
-
-        cow = user["cow"]
-        config = COW_INTERACTIONS["pet"]
-
-        # 执行抚摸
-        cow["favor"] += config["favor_gain"]
-        cow["exp"] += config["exp_gain"]
-
-        # 检查升级
-        leveled_up = self._check_level_up(cow)
-
-        await self.user_manager.update_user_data(user_id, platform, user)
-
-        # 随机回应
-        responses = [
-            f"💕 {cow['name']} 享受地蹭了蹭你的手~",
-            f"😊 {cow['name']} 很喜欢你的抚摸~",
-            f"🥰 {cow['name']} 开心地叫了一声~",
-            f"🤗 {cow['name']} 温顺地靠在你身边~",
-        ]
-
-        result = random.choice(responses)
-        result += f"\n好感度 +{config['favor_gain']} | 经验 +{config['exp_gain']}"
-
-        if leveled_up:
-            level_info = self._get_level_info(cow["level"])
-            result += f"\n🎉 升级啦！{cow['name']} 升到了 Lv.{cow['level']} {level_info['name']}！"
+        if action == "pet" and times == 1:
+            result = random.choice(_PET_RESPONSES).format(name=cow["name"])
+        else:
+            result = spec["done"].format(name=cow["name"])
+            if times > 1:
+                result += f"（{times} 次）"
+        if times < requested:
+            result += f"\n💡 {cow['name']} 只需要 {times} 次就满足啦，未扣除多余的积分"
+        gains = [f"好感度 +{favor}", f"经验 +{exp}"]
+        if stat:
+            gains.insert(0, f"{spec['stat_name']} +{restore * times}")
+        result += "\n" + " | ".join(gains)
+        if cost and times > 1:
+            result += f"\n💸 消耗 {cost} 积分"
+        result += self._level_up_message(cow, levels, leveled_up)
 
         event.set_result(MessageEventResult().message(result))
 
     async def _rename_cow(
-        self, event: AstrMessageEvent, user_id: str, platform: str, new_name: str
+        self, event: AstrMessageEvent, session, new_name: str
     ) -> None:
         """给牛牛改名"""
-        user = await self.user_manager.get_user_data(user_id, platform)
+        user = await session.load()
 
-        if not user.get("cow"):
+        if not user["cow"]:
             event.set_result(MessageEventResult().message("❌ 你还没有领养牛牛！"))
             return
 
@@ -306,7 +292,7 @@ class CowCommand:
 
         old_name = user["cow"]["name"]
         user["cow"]["name"] = new_name
-        await self.user_manager.update_user_data(user_id, platform, user)
+        session.mark_dirty()
 
         event.set_result(
             MessageEventResult().message(
@@ -314,34 +300,14 @@ class CowCommand:
             )
         )
 
-    def _get_level_info(self, level: int) -> dict:
-        """获取等级信息"""
-        for level_config in COW_LEVELS:
-            if level_config["level"] == level:
-                return level_config
-        return COW_LEVELS[-1]
-
-    def _get_next_level(self, current_level: int) -> dict | None:
-        """获取下一等级信息"""
-        for level_config in COW_LEVELS:
-            if level_config["level"] == current_level + 1:
-                return level_config
-        return None
-
-    def _check_level_up(self, cow: dict) -> bool:
-        """检查是否升级"""
-        next_level = self._get_next_level(cow["level"])
-        if not next_level:
-            return False
-
-        if (
-            cow["exp"] >= next_level["exp_needed"]
-            and cow["favor"] >= next_level["favor_needed"]
-        ):
-            cow["level"] += 1
-            self.logger.debug(f"[{self.logger}] 牛牛升级到 Lv.{cow['level']}")
-            return True
-        return False
+    def _level_up_message(self, cow: dict, levels, gained: int) -> str:
+        """升级提示，未升级时返回空字符串"""
+        if not gained:
+            return ""
+        self.logger.debug("牛牛升级", level=cow["level"], gained=gained)
+        level_info = levels.info(cow["level"])
+        jump = f"连升 {gained} 级，" if gained > 1 else ""
+        return f"\n🎉 升级啦！{cow['name']} {jump}升到了 Lv.{cow['level']} {level_info['name']}！"
 
     def _get_status_bar(self, value: int) -> str:
         """获取状态条"""
@@ -1,6 +1,8 @@
 from astrbot.api.event import AstrMessageEvent, MessageEventResult
 
 from ..utils.logger_manager import PluginLogger, UserActionLogger
+from ..data import activity_log
+from ..data.game_manager import EVICTED
 
 
 class GuessCommand:
@@ -22,14 +24,13 @@ class GuessCommand:
         self.game_manager = game_manager
         self.achievement_manager = achievement_manager
 
-    async def handle(self, event: AstrMessageEvent, message: str = "") -> None:
+    async def handle(self, event: AstrMessageEvent, session, message: str = "") -> None:
         """处理猜数字命令"""
         if not event.session_id:
             event.set_result(MessageEventResult().message("无法获取用户ID"))
             return
 
-        user_id = event.get_sender_id()
-        platform = event.get_platform_id()
+        user_id, platform = session.user_id, session.platform
 
         if not message:
             event.set_result(
@@ -39,55 +40,70 @@ class GuessCommand:
 
         game_key = f"{platform}:{user_id}"
 
+        # 上一局游戏已超时或被淘汰，先告知答案
+        expired_game = self.game_manager.pop_expired_game(game_key)
+        if expired_game and message != "start":
+            cause = (
+                "因同时进行的游戏过多被提前结束"
+                if expired_game["end_reason"] == EVICTED
+                else "因长时间未操作已结束"
+            )
+            event.set_result(
+                MessageEventResult().message(
+                    f"⏰ 你的上一局游戏{cause}，正确答案是 "
+                    f"{expired_game['target_number']}！输入 'guess start' 重新开始吧~"
+                )
+            )
+            return
+
         if message == "start":
-            await self._start_game(event, user_id, platform)
+            await self._start_game(event, session)
         elif message == "hint":
-            await self._use_hint(event, user_id, platform, game_key)
+            await self._use_hint(event, session, game_key)
         elif message == "giveup":
-            await self._give_up(event, user_id, platform, game_key)
+            await self._give_up(event, session, game_key)
         else:
-            await self._make_guess(event, user_id, platform, game_key, message)
+            await self._make_guess(event, session, game_key, message)
 
-    async def _start_game(
-        self, event: AstrMessageEvent, user_id: str, platform: str
-    ) -> None:
+    async def _start_game(self, event: AstrMessageEvent, session) -> None:
         """开始游戏"""
-        self.logger.info(f"[{self.logger}] 用户 {user_id}@{platform} 开始猜数字游戏")
-        if not await self.user_manager.check_command_limits(user_id, platform, event):
+        user_id, platform = session.user_id, session.platform
+        self.logger.info("开始猜数字游戏", user_id=user_id, platform=platform)
+        if not await self.user_manager.check_command_limits(session, event):
             return
 
-        user = await self.user_manager.get_user_data(user_id, platform)
+        user = await session.load()
         user["games_played"] += 1
-        await self.user_manager.update_user_data(user_id, platform, user)
+        session.mark_dirty()
 
-        game = self.game_manager.create_guess_game(f"{platform}:{user_id}", 100)
+        max_number = max(2, self.star.runtime.guess.max_number)
+        game = self.game_manager.create_guess_game(f"{platform}:{user_id}", max_number)
 
         event.set_result(
             MessageEventResult().message(
-                f"🎮 游戏开始！我已经想好了一个 1~100 之间的数字，猜猜看是多少？\n"
+                f"🎮 游戏开始！我已经想好了一个 1~{max_number} 之间的数字，猜猜看是多少？\n"
                 f"提示：输入 'hint' 可以使用提示令牌（当前持有: {user['hint_tokens']} 枚）"
             )
         )
 
-    async def _use_hint(
-        self, event: AstrMessageEvent, user_id: str, platform: str, game_key: str
-    ) -> None:
+    async def _use_hint(self, event: AstrMessageEvent, session, game_key: str) -> None:
         """使用提示"""
+        user_id, platform = session.user_id, session.platform
         game = self.game_manager.get_game(game_key)
         if not game:
             event.set_result(MessageEventResult().message("你还没有开始游戏！"))
             return
 
-        user = await self.user_manager.get_user_data(user_id, platform)
+        user = await session.load()
         if user["hint_tokens"] <= 0:
-            self.logger.debug(f"[{self.logger}] 用户 {user_id}@{platform} 提示令牌不足")
+            self.logger.debug("提示令牌不足", user_id=user_id, platform=platform)
             event.set_result(
                 MessageEventResult().message("你没有提示令牌了！去商店购买吧~")
             )
             return
 
         user["hint_tokens"] -= 1
-        await self.user_manager.update_user_data(user_id, platform, user)
+        session.mark_dirty()
 
         lower, upper = self.game_manager.get_hint_range(game)
 
@@ -97,17 +113,16 @@ class GuessCommand:
             )
         )
 
-    async def _give_up(
-        self, event: AstrMessageEvent, user_id: str, platform: str, game_key: str
-    ) -> None:
+    async def _give_up(self, event: AstrMessageEvent, session, game_key: str) -> None:
         """放弃游戏"""
+        user_id, platform = session.user_id, session.platform
         game = self.game_manager.get_game(game_key)
         if not game:
             event.set_result(MessageEventResult().message("你还没有开始游戏！"))
             return
 
         self.logger.info(
-            f"[{self.logger}] 用户 {user_id}@{platform} 放弃游戏，答案: {game['target_number']}"
+            "放弃游戏", user_id=user_id, platform=platform, answer=game["target_number"]
         )
         self.game_manager.delete_game(game_key)
 
@@ -120,12 +135,12 @@ class GuessCommand:
     async def _make_guess(
         self,
         event: AstrMessageEvent,
-        user_id: str,
-        platform: str,
+        session,
         game_key: str,
         message: str,
     ) -> None:
         """进行猜测"""
+        user_id, platform = session.user_id, session.platform
         game = self.game_manager.get_game(game_key)
         if not game:
             event.set_result(
@@ -139,64 +154,85 @@ class GuessCommand:
             guess = int(message)
         except ValueError:
             self.logger.debug(
-                f"[{self.logger}] 用户 {user_id}@{platform} 输入无效数字: {message}"
+                "输入无效数字", user_id=user_id, platform=platform, message=message
             )
             event.set_result(MessageEventResult().message("请输入有效的数字！"))
             return
 
-        if guess < 1 or guess > 100:
+        # 范围以开局时的配置为准，重新加载配置不影响进行中的游戏
+        max_number = game["max_number"]
+        if guess < 1 or guess > max_number:
             self.logger.debug(
-                f"[{self.logger}] 用户 {user_id}@{platform} 输入超出范围: {guess}"
+                "输入超出范围", user_id=user_id, platform=platform, guess=guess
+            )
+            event.set_result(
+                MessageEventResult().message(f"请输入 1~{max_number} 之间的数字！")
             )
-            event.set_result(MessageEventResult().message("请输入 1~100 之间的数字！"))
             return
 
         self.game_manager.update_game_attempts(game_key)
 
         if guess == game["target_number"]:
-            await self._game_won(event, user_id, platform, game_key, game)
+            await self._game_won(event, session, game_key, game)
         else:
             await self._guess_feedback(event, game_key, game, guess)
 
     async def _game_won(
         self,
         event: AstrMessageEvent,
-        user_id: str,
-        platform: str,
+        session,
         game_key: str,
         game: dict,
     ) -> None:
         """游戏胜利"""
+        user_id, platform = session.user_id, session.platform
         from ..config import LOTTERY_ITEMS
         from datetime import datetime
 
-        base_points, time_bonus = self.game_manager.calculate_game_score(game)
+        guess_config = self.star.runtime.guess
+        base_points, time_bonus = self.game_manager.calculate_game_score(
+            game,
+            base_points=guess_config.base_points,
+            time_bonus_rate=guess_config.time_bonus_rate,
+            attempt_penalty=guess_config.attempt_penalty,
+        )
 
         # 检查经验卡加成
-        user = await self.user_manager.get_user_data(user_id, platform)
+        user = await session.load()
         exp_card_bonus = 0
         exp_card_msg = ""
-        for item in user["inventory"]:
-            if item["id"] == "exp_card" and item["count"] > 0:
-                exp_card_bonus = int((base_points + time_bonus) * 0.2)
-                exp_card_msg = f"（经验卡加成 +{exp_card_bonus}）"
-                self.logger.info(
-                    f"[{self.logger}] 用户 {user_id}@{platform} 使用经验卡，获得额外 {exp_card_bonus} 积分"
-                )
-                break
+        if user["inventory"].get("exp_card", 0) > 0:
+            exp_card_bonus = int((base_points + time_bonus) * 0.2)
+            exp_card_msg = f"（经验卡加成 +{exp_card_bonus}）"
+            self.logger.info(
+                "使用经验卡",
+                user_id=user_id,
+                platform=platform,
+                bonus=exp_card_bonus,
+            )
 
         total_points = base_points + time_bonus + exp_card_bonus
 
-        user["points"] += total_points
+        session.add_points(total_points, reason="guess_win")
         user["games_won"] += 1
-        await self.user_manager.update_user_data(user_id, platform, user)
+        history = user["guess"]
+        previous_best = history["best"]
+        activity_log.record(
+            history, self.user_manager.day_clock.today(), [game["attempts"]]
+        )
+        session.mark_dirty()
+        record_msg = ""
+        if previous_best is not None and game["attempts"] < previous_best:
+            record_msg = f"\n🏅 新纪录！此前最少需要 {previous_best} 次"
 
-        await self.achievement_manager.check(user_id, platform, user, event)
+        await self.achievement_manager.check(
+            session, event, ("games_won", "games_played", "points")
+        )
 
         self.game_manager.delete_game(game_key)
 
         self.logger.info(
-            f"[{self.logger}] 用户 {user_id}@{platform} 赢得游戏！总积分: {total_points}"
+            "赢得游戏", user_id=user_id, platform=platform, total_points=total_points
         )
 
         if game["attempts"] <= 3:
@@ -211,7 +247,7 @@ class GuessCommand:
                 f"{comment}\n🎉 恭喜你猜对了！答案就是 {game['target_number']}！\n"
                 f"尝试次数: {game['attempts']} ({base_points}分) | "
                 f"用时: {(int(datetime.now().timestamp() * 1000) - game['start_time']) // 1000}秒 ({time_bonus}分){exp_card_msg}\n"
-                f"总计获得 {total_points} 积分！"
+                f"总计获得 {total_points} 积分！{record_msg}"
             )
         )
 
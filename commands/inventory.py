@@ -1,6 +1,7 @@
 from astrbot.api.event import AstrMessageEvent, MessageEventResult
 
 from ..utils.logger_manager import PluginLogger, UserActionLogger
+from ..config import item_info
 
 
 class InventoryCommand:
@@ -12,16 +13,13 @@ class InventoryCommand:
         self.action_logger = UserActionLogger(logger)
         self.user_manager = user_manager
 
-    async def handle(self, event: AstrMessageEvent) -> None:
+    async def handle(self, event: AstrMessageEvent, session) -> None:
         """处理查看物品栏命令"""
         if not event.session_id:
             event.set_result(MessageEventResult().message("无法获取用户ID"))
             return
 
-        user_id = event.get_sender_id()
-        platform = event.get_platform_id()
-
-        user = await self.user_manager.get_user_data(user_id, platform)
+        user = await session.load()
 
         if not user["inventory"]:
             event.set_result(
@@ -30,9 +28,10 @@ class InventoryCommand:
             return
 
         result = "🎒 你的物品栏 🎒\n"
-        for item in user["inventory"]:
-            result += f"[{item['id']}] {item['name']} x{item['count']}\n"
+        for item_id, count in user["inventory"].items():
+            item = item_info(item_id)
+            result += f"[{item_id}] {item['name']} x{count}\n"
             result += f"📝 {item['description']}\n\n"
-        result += "使用'use <物品ID>'来使用物品"
+        result += "使用'use <物品ID或名称>'来使用物品"
 
         event.set_result(MessageEventResult().message(result))
@@ -0,0 +1,73 @@
+from astrbot.api.event import AstrMessageEvent, MessageEventResult
+
+from ..utils.logger_manager import PluginLogger, UserActionLogger
+
+
+from ..data.leaderboard import BOARDS
+
+# 榜单别名
+BOARD_ALIASES = {
+    "": "points",
+    "points": "points",
+    "积分": "points",
+    "wins": "games_won",
+    "games_won": "games_won",
+    "胜场": "games_won",
+    "ssr": "ssr_count",
+    "ssr_count": "ssr_count",
+    "sign": "consecutive_days",
+    "consecutive_days": "consecutive_days",
+    "签到": "consecutive_days",
+    "cow": "cow",
+    "牛牛": "cow",
+}
+
+RANK_MEDALS = ["🥇", "🥈", "🥉"]
+
+
+class LeaderboardCommand:
+    """排行榜命令"""
+
+    def __init__(self, user_manager, logger: PluginLogger, top_n: int = 10):
+        self.logger = logger
+        self.plugin_name = "astrbot_plugin_interactive"
+        self.action_logger = UserActionLogger(logger)
+        self.user_manager = user_manager
+        self.top_n = top_n
+
+    async def handle(self, event: AstrMessageEvent, session, board: str = "") -> None:
+        """处理排行榜命令"""
+        if not event.session_id:
+            event.set_result(MessageEventResult().message("无法获取用户ID"))
+            return
+
+        board_id = BOARD_ALIASES.get(board.strip().lower())
+        if board_id is None:
+            event.set_result(
+                MessageEventResult().message(
+                    "❌ 未知的榜单！可用榜单: points(积分), wins(胜场), ssr, sign(连签), cow(牛牛)"
+                )
+            )
+            return
+
+        leaderboard = self.user_manager.leaderboard
+        # 确保当前用户以最新数据上榜
+        user = await session.load()
+        leaderboard.update(session.key, user)
+
+        top = await leaderboard.top(board_id, self.top_n)
+        rank, total = await leaderboard.rank(board_id, session.key)
+        board_name = BOARDS[board_id][0]
+
+        result = f"🏆 {board_name} TOP {self.top_n} 🏆\n"
+        for i, (key, score) in enumerate(top):
+            medal = RANK_MEDALS[i] if i < len(RANK_MEDALS) else f"{i + 1}."
+            name = key.split(":", 1)[-1]
+            mark = " 👈" if key == session.key else ""
+            result += f"{medal} {name} - {score}{mark}\n"
+
+        score = leaderboard.indexes[board_id].score(session.key)
+        result += f"\n📍 你的排名: 第 {rank}/{total} 名 ({score})\n"
+        result += "💡 可用榜单: points, wins, ssr, sign, cow"
+
+        event.set_result(MessageEventResult().message(result))
@@ -1,10 +1,14 @@
-import random
 from astrbot.api.event import AstrMessageEvent, MessageEventResult
 
 from ..utils.logger_manager import PluginLogger, UserActionLogger
+from ..data import activity_log
 
 
 from ..config import LOTTERY_ITEMS
+from .batch import MAX_BATCH, parse_draw_count
+
+# 各稀有度奖励的流水原因，顺序与 LOTTERY_ITEMS 一致，N 无奖励
+REWARD_REASONS = ("lottery_ssr", "lottery_sr", "lottery_r")
 
 
 class LotteryCommand:
@@ -20,106 +24,124 @@ class LotteryCommand:
         self.user_manager = user_manager
         self.achievement_manager = achievement_manager
 
-    async def handle(self, event: AstrMessageEvent) -> None:
-        """处理抽奖命令"""
+    async def handle(self, event: AstrMessageEvent, session, count: str = "") -> None:
+        """处理抽奖命令（count 为连抽次数）"""
         if not event.session_id:
             event.set_result(MessageEventResult().message("无法获取用户ID"))
             return
 
-        user_id = event.get_sender_id()
-        platform = event.get_platform_id()
-
-        self.logger.info(f"[{self.logger}] 用户 {user_id}@{platform} 开始抽奖")
+        user_id, platform = session.user_id, session.platform
 
-        if not await self.user_manager.check_command_limits(user_id, platform, event):
+        times = parse_draw_count(count, MAX_BATCH)
+        if times is None:
+            event.set_result(
+                MessageEventResult().message(
+                    f"❌ 抽奖次数必须是 1~{MAX_BATCH} 之间的整数，如 'lottery 10'"
+                )
+            )
             return
 
-        user = await self.user_manager.get_user_data(user_id, platform)
+        self.logger.info("开始抽奖", user_id=user_id, platform=platform, times=times)
 
-        # 检查免费抽奖券
-        use_free_ticket = False
-        if user["free_lottery_count"] > 0:
-            user["free_lottery_count"] -= 1
-            use_free_ticket = True
+        if not await self.user_manager.check_command_limits(session, event):
+            return
+
+        user = await session.load()
+        runtime = self.star.runtime
+
+        # 优先使用免费抽奖券，其余按次扣除积分
+        cost = runtime.lottery.cost
+        free = min(times, user["free_lottery_count"])
+        total_cost = (times - free) * cost
+        if user["points"] < total_cost:
+            self.logger.debug("积分不足抽奖", user_id=user_id, platform=platform)
+            need = f"{times}次抽奖需要" if times > 1 else "抽奖需要"
+            event.set_result(
+                MessageEventResult().message(
+                    f"积分不足！{need}{total_cost}积分，你当前只有 {user['points']} 积分"
+                )
+            )
+            return
+        if free:
+            user["free_lottery_count"] -= free
             self.logger.debug(
-                f"[{self.logger}] 用户 {user_id}@{platform} 使用免费抽奖券"
+                "使用免费抽奖券", user_id=user_id, platform=platform, count=free
             )
-        else:
-            if user["points"] < 10:
-                self.logger.debug(
-                    f"[{self.logger}] 用户 {user_id}@{platform} 积分不足抽奖"
-                )
-                event.set_result(
-                    MessageEventResult().message(
-                        f"积分不足！抽奖需要10积分，你当前只有 {user['points']} 积分"
-                    )
-                )
-                return
-            user["points"] -= 10
-            user["total_spent"] += 10
+        if total_cost:
+            session.consume_points(total_cost, reason="lottery")
+            user["total_spent"] += total_cost
+        session.mark_dirty()
 
         # 抽奖动画
         await self.star.context.send_message(event, "抽奖中...")
 
-        # 按概率抽奖
-        # 基础概率：SSR 5%, SR 10%, R 25%, N 60%
-        ssr_threshold = 0.05
-        sr_threshold = 0.15
-        r_threshold = 0.4
-
-        # 幸运护符效果：增加高级奖品概率 20%
-        charm_effect = ""
-        if user["lucky_charm_count"] > 0:
-            ssr_threshold *= 1.2  # SSR: 5% -> 6%
-            sr_threshold *= 1.2  # SR: 10% -> 12%
-            r_threshold *= 1.2  # R: 25% -> 30%
-            user["lucky_charm_count"] -= 1
-            charm_effect = "（幸运护符生效）"
+        # 幸运护符效果：按配置提升 SSR/SR/R 的概率，每个护符生效一次
+        charms = min(times, user["lucky_charm_count"])
+        if charms:
+            user["lucky_charm_count"] -= charms
             self.logger.debug(
-                f"[{self.logger}] 用户 {user_id}@{platform} 幸运护符生效，概率提升 20%"
+                "幸运护符生效", user_id=user_id, platform=platform, count=charms
             )
-            await self.user_manager.update_user_data(user_id, platform, user)
-
-        rand = random.random()
 
-        if rand < ssr_threshold:
-            index = 0  # SSR
-        elif rand < sr_threshold:
-            index = 1  # SR
-        elif rand < r_threshold:
-            index = 2  # R
-        else:
-            index = 3  # N
-
-        prize = LOTTERY_ITEMS[index]
-        result = f"🎰 抽奖结果：{prize}！{charm_effect}"
-
-        self.logger.info(
-            f"[{self.logger}] 用户 {user_id}@{platform} 抽奖结果: {prize} (rand={rand:.3f})"
+        table = runtime.lottery_table
+        indexes = table.draw_many(charms, "lucky_charm") + table.draw_many(
+            times - charms
+        )
+        tally = [0] * len(LOTTERY_ITEMS)
+        for index in indexes:
+            tally[index] += 1
+        activity_log.record(
+            user["lottery"], self.user_manager.day_clock.today(), indexes
         )
 
-        # 特殊奖励处理
-        if index == 0:
-            user["points"] += 100
-            user["ssr_count"] += 1
-            result += " ✨ 额外获得 100 积分！"
+        # 按稀有度汇总发放奖励
+        rewards = runtime.lottery_rewards
+        for reward, reason, hits in zip(rewards, REWARD_REASONS, tally):
+            if hits and reward:
+                session.add_points(reward * hits, reason=reason)
+        if tally[0]:
+            user["ssr_count"] += tally[0]
             self.logger.info(
-                f"[{self.logger}] 用户 {user_id}@{platform} 抽中SSR！累计 {user['ssr_count']} 次"
+                "抽中SSR",
+                user_id=user_id,
+                platform=platform,
+                ssr_count=user["ssr_count"],
             )
-        elif index == 1:
-            user["points"] += 30
-            result += " ✨ 额外获得 30 积分！"
-        elif index == 2:
-            user["points"] += 10
-            result += " ✨ 额外获得 10 积分！"
-
-        result += f"\n当前积分：{user['points']}"
-
-        if use_free_ticket:
-            result = f"(使用免费券) {result}"
 
-        await self.user_manager.update_user_data(user_id, platform, user)
-
-        await self.achievement_manager.check(user_id, platform, user, event)
+        if times == 1:
+            index = indexes[0]
+            prize = LOTTERY_ITEMS[index]
+            self.logger.info(
+                "抽奖结果", user_id=user_id, platform=platform, prize=prize
+            )
+            charm_effect = "（幸运护符生效）" if charms else ""
+            result = f"🎰 抽奖结果：{prize}！{charm_effect}"
+            if rewards[index]:
+                result += f" ✨ 额外获得 {rewards[index]} 积分！"
+            result += f"\n当前积分：{user['points']}"
+            if free:
+                result = f"(使用免费券) {result}"
+        else:
+            self.logger.info(
+                "连抽结果", user_id=user_id, platform=platform, tally=tally
+            )
+            gained = sum(r * hits for r, hits in zip(rewards, tally))
+            result = f"🎰 {times} 连抽结果：\n"
+            for index, (prize, hits) in enumerate(zip(LOTTERY_ITEMS, tally)):
+                if hits:
+                    reward = rewards[index]
+                    bonus = f" (+{reward * hits} 积分)" if reward else ""
+                    result += f"  {prize} x{hits}{bonus}\n"
+            extras = []
+            if free:
+                extras.append(f"免费券 {free} 张")
+            if charms:
+                extras.append(f"幸运护符 {charms} 个")
+            if extras:
+                result += f"🎫 使用了{'、'.join(extras)}\n"
+            result += f"💸 消耗 {total_cost} 积分，✨ 获得 {gained} 积分\n"
+            result += f"当前积分：{user['points']}"
+
+        await self.achievement_manager.check(session, event, ("points", "ssr_count"))
 
         event.set_result(MessageEventResult().message(result))
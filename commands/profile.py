@@ -1,9 +1,10 @@
 from astrbot.api.event import AstrMessageEvent, MessageEventResult
 
 from ..utils.logger_manager import PluginLogger, UserActionLogger
+from ..data import activity_log
 
 
-from ..config import ACHIEVEMENTS
+from ..config import ACHIEVEMENTS, item_info
 
 
 class ProfileCommand:
@@ -15,22 +16,29 @@ class ProfileCommand:
         self.action_logger = UserActionLogger(logger)
         self.user_manager = user_manager
 
-    async def handle(self, event: AstrMessageEvent) -> None:
+    async def handle(self, event: AstrMessageEvent, session) -> None:
         """处理查看个人资料命令"""
         if not event.session_id:
             event.set_result(MessageEventResult().message("无法获取用户ID"))
             return
 
-        user_id = event.get_sender_id()
-        platform = event.get_platform_id()
-
-        user = await self.user_manager.get_user_data(user_id, platform)
+        user_id = session.user_id
+        user = await session.load()
+        limiter = self.user_manager.rate_limiter
+        achievement_count = bin(user["achievement_bits"]).count("1")
+        used = self.user_manager.commands_used_today(user_id, session.platform)
+        spin_days = activity_log.active_days(
+            user["spin"], self.user_manager.day_clock.today()
+        )
 
         # 构建物品列表字符串
         items_list = "无"
         if user["inventory"]:
             items_list = "\n   ".join(
-                [f"{item['name']} x{item['count']}" for item in user["inventory"]]
+                [
+                    f"{item_info(item_id)['name']} x{count}"
+                    for item_id, count in user["inventory"].items()
+                ]
             )
 
         result = (
@@ -38,11 +46,11 @@ class ProfileCommand:
             f"💰 积分: {user['points']}\n"
             f"📅 连续签到: {user['consecutive_days']} 天 (总签到: {user['total_sign_days']}天)\n"
             f"🎮 游戏: {user['games_won']} 胜 / {user['games_played']} 场\n"
-            f"🎯 成就: {len(user['achievements'])}/{len(ACHIEVEMENTS)} 个\n"
+            f"🎯 成就: {achievement_count}/{len(ACHIEVEMENTS)} 个\n"
             f"🎰 抽中SSR: {user['ssr_count']} 次\n"
-            f"🎯 幸运转盘: {user.get('total_spins', 0)} 次 (免费: {user.get('free_spin_count', 0)})\n"
+            f"🎯 幸运转盘: {user['spin']['total']} 次 (免费: {user['free_spin_count']}, 近 7 天参与 {spin_days} 天)\n"
             f"🛒 商店消费: {user['total_spent']} 积分\n"
-            f"🧾 今日使用: {user['daily_command_count']}/50 次\n"
+            f"🧾 今日使用: {used}/{limiter.daily_limit or '∞'} 次\n"
             f"🎁 道具:\n"
             f"  双倍卡: {'1' if user['has_double_card'] else '0'} 张\n"
             f"  免费券: {user['free_lottery_count']} 张\n"
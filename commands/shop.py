@@ -3,9 +3,6 @@ from astrbot.api.event import AstrMessageEvent, MessageEventResult
 from ..utils.logger_manager import PluginLogger, UserActionLogger
 
 
-from ..config import DEFAULT_SHOP_ITEMS
-
-
 class ShopCommand:
     """商店命令"""
 
@@ -20,16 +17,13 @@ class ShopCommand:
         self.achievement_manager = achievement_manager
 
     async def handle(
-        self, event: AstrMessageEvent, action: str = "", item_id: str = ""
+        self, event: AstrMessageEvent, session, action: str = "", item_id: str = ""
     ) -> None:
         """处理商店命令"""
         if not event.session_id:
             event.set_result(MessageEventResult().message("❌ 无法获取用户ID"))
             return
 
-        user_id = event.get_sender_id()
-        platform = event.get_platform_id()
-
         if not action:
             event.set_result(
                 MessageEventResult().message('❌ 请输入 "shop list" 查看商品列表')
@@ -39,7 +33,7 @@ class ShopCommand:
         if action == "list":
             await self._show_shop_list(event)
         elif action == "buy":
-            await self._buy_item(event, user_id, platform, item_id)
+            await self._buy_item(event, session, item_id)
         else:
             event.set_result(
                 MessageEventResult().message(
@@ -49,39 +43,36 @@ class ShopCommand:
 
     async def _show_shop_list(self, event: AstrMessageEvent) -> None:
         """显示商店列表"""
-        self.logger.debug(f"[{self.logger}] 显示商店列表")
-        shop_list = "🛍️ 商店商品列表 🛍️\n"
-        for item in DEFAULT_SHOP_ITEMS:
-            shop_list += f"[{item['id']}] {item['name']} - {item['description']}\n"
-            shop_list += f"💰 价格: {item['price']} 积分 | "
-            shop_list += (
-                f"类型: {'可存储物品' if item['storable'] else '立即生效道具'}\n\n"
-            )
-        shop_list += '💡 提示: 输入 "shop buy <商品ID>" 购买商品'
+        self.logger.debug("显示商店列表")
+        shop_list = self.star.render_cache.get(
+            self.star.runtime, "shop_list", render_shop_list
+        )
         event.set_result(MessageEventResult().message(shop_list))
 
-    async def _buy_item(
-        self, event: AstrMessageEvent, user_id: str, platform: str, item_id: str
-    ) -> None:
+    async def _buy_item(self, event: AstrMessageEvent, session, item_id: str) -> None:
         """购买物品"""
+        user_id, platform = session.user_id, session.platform
         if not item_id:
             event.set_result(MessageEventResult().message("❌ 请输入要购买的商品ID"))
             return
 
-        item = next((i for i in DEFAULT_SHOP_ITEMS if i["id"] == item_id), None)
+        item = self.star.runtime.shop_index.get(item_id)
         if not item:
             self.logger.debug(
-                f"[{self.logger}] 用户 {user_id}@{platform} 尝试购买不存在的商品: {item_id}"
+                "尝试购买不存在的商品",
+                user_id=user_id,
+                platform=platform,
+                item_id=item_id,
             )
             event.set_result(
                 MessageEventResult().message("❌ 找不到该商品，请检查商品ID")
             )
             return
 
-        user = await self.user_manager.get_user_data(user_id, platform)
+        user = await session.load()
         if user["points"] < item["price"]:
             self.logger.debug(
-                f"[{self.logger}] 用户 {user_id}@{platform} 积分不足购买 {item['name']}"
+                "积分不足购买", user_id=user_id, platform=platform, item=item["name"]
             )
             event.set_result(
                 MessageEventResult().message(
@@ -90,22 +81,25 @@ class ShopCommand:
             )
             return
 
-        user["points"] -= item["price"]
+        session.consume_points(item["price"], reason=f"shop:{item_id}")
         user["total_spent"] += item["price"]
+        session.mark_dirty()
 
         self.logger.info(
-            f"[{self.logger}] 用户 {user_id}@{platform} 购买商品: {item['name']} ({item['price']} 积分)"
+            "购买商品",
+            user_id=user_id,
+            platform=platform,
+            item=item["name"],
+            price=item["price"],
         )
 
         if item["storable"]:
-            await self.user_manager.add_item_to_inventory(user_id, platform, item)
+            session.add_item(item_id)
             effect_msg = f"🛍️ 成功购买 {item['name']}！已添加到物品栏，使用 'use {item['id']}' 来使用它"
         else:
             effect_msg = self._apply_item_effect(user, item_id)
 
-        await self.user_manager.update_user_data(user_id, platform, user)
-
-        await self.achievement_manager.check(user_id, platform, user, event)
+        await self.achievement_manager.check(session, event, ("total_spent",))
 
         event.set_result(
             MessageEventResult().message(f"{effect_msg}\n💰 剩余积分: {user['points']}")
@@ -115,18 +109,29 @@ class ShopCommand:
         """应用立即生效物品效果"""
         if item_id == "double_card":
             user["has_double_card"] = True
-            self.logger.debug(f"[{self.logger}] 应用效果: 双倍积分卡")
+            self.logger.debug("应用效果: 双倍积分卡")
             return "✅ 购买成功！下次签到将获得双倍积分！"
         elif item_id == "lottery_ticket":
             user["free_lottery_count"] += 1
-            self.logger.debug(f"[{self.logger}] 应用效果: 免费抽奖券")
+            self.logger.debug("应用效果: 免费抽奖券")
             return "✅ 购买成功！获得一张免费抽奖券！"
         elif item_id == "hint_token":
             user["hint_tokens"] += 1
-            self.logger.debug(f"[{self.logger}] 应用效果: 提示令牌")
+            self.logger.debug("应用效果: 提示令牌")
             return "✅ 购买成功！获得一枚提示令牌！"
         elif item_id == "lucky_charm":
             user["lucky_charm_count"] += 1
-            self.logger.debug(f"[{self.logger}] 应用效果: 幸运护符")
+            self.logger.debug("应用效果: 幸运护符")
             return "✅ 购买成功！获得幸运护符，下次抽奖时生效！"
         return "✅ 购买成功！"
+
+
+def render_shop_list(runtime) -> str:
+    """渲染商店商品列表（价格随配置变化）"""
+    lines = ["🛍️ 商店商品列表 🛍️"]
+    for item in runtime.shop_items:
+        kind = "可存储物品" if item["storable"] else "立即生效道具"
+        lines.append(f"[{item['id']}] {item['name']} - {item['description']}")
+        lines.append(f"💰 价格: {item['price']} 积分 | 类型: {kind}\n")
+    lines.append('💡 提示: 输入 "shop buy <商品ID>" 购买商品')
+    return "\n".join(lines)
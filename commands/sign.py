@@ -1,4 +1,3 @@
-from datetime import datetime, timedelta
 from astrbot.api.event import AstrMessageEvent, MessageEventResult
 
 from ..utils.logger_manager import PluginLogger, UserActionLogger
@@ -17,32 +16,28 @@ class SignCommand:
         self.user_manager = user_manager
         self.achievement_manager = achievement_manager
 
-    async def handle(self, event: AstrMessageEvent) -> None:
+    async def handle(self, event: AstrMessageEvent, session) -> None:
         """处理签到命令"""
         if not event.session_id:
             event.set_result(MessageEventResult().message("无法获取用户ID"))
             return
 
-        user_id = event.get_sender_id()
-        platform = event.get_platform_id()
-
-        if not await self.user_manager.check_command_limits(user_id, platform, event):
+        if not await self.user_manager.check_command_limits(session, event):
             return
 
-        user = await self.user_manager.get_user_data(user_id, platform)
-        today = self._get_today()
+        user = await session.load()
+        sign_config = self.star.runtime.sign
+        today = self.user_manager.day_clock.today()
+        last_sign = user["last_sign_day"]
 
-        if user["last_sign"] == today:
+        if last_sign == today:
             event.set_result(
                 MessageEventResult().message("你今天已经签到过了哦，明天再来吧！")
             )
             return
 
         # 计算连续签到
-        yesterday = datetime.now() - timedelta(days=1)
-        yesterday_str = f"{yesterday.year}-{yesterday.month}-{yesterday.day}"
-
-        if user["last_sign"] == yesterday_str:
+        if last_sign == today - 1:
             user["consecutive_days"] += 1
         else:
             user["consecutive_days"] = 1
@@ -50,8 +45,11 @@ class SignCommand:
         user["total_sign_days"] += 1
 
         # 计算奖励
-        base_reward = 10
-        bonus = min(100, user["consecutive_days"] * 2)
+        base_reward = sign_config.base_reward
+        bonus = min(
+            sign_config.max_consecutive_bonus,
+            user["consecutive_days"] * sign_config.consecutive_bonus,
+        )
 
         # 双倍卡效果
         double_effect = ""
@@ -62,20 +60,20 @@ class SignCommand:
 
         total = base_reward + bonus
 
-        user["points"] += total
-        user["last_sign"] = today
+        session.add_points(total, reason="sign")
+        user["last_sign_day"] = today
+        session.mark_dirty()
 
-        await self.user_manager.update_user_data(user_id, platform, user)
-
-        await self.achievement_manager.check(user_id, platform, user, event)
+        await self.achievement_manager.check(
+            session, event, ("consecutive_days", "points")
+        )
 
         # 特殊签到奖励
         special_bonus = ""
-        if user["consecutive_days"] % 7 == 0:
-            week_bonus = 50
-            user["points"] += week_bonus
+        week_bonus = sign_config.week_bonus
+        if week_bonus and user["consecutive_days"] % 7 == 0:
+            session.add_points(week_bonus, reason="sign_week_bonus")
             special_bonus = f"\n✨ 连续签到满 {user['consecutive_days']} 天，额外奖励 {week_bonus} 积分！"
-            await self.user_manager.update_user_data(user_id, platform, user)
 
         event.set_result(
             MessageEventResult().message(
@@ -85,8 +83,3 @@ class SignCommand:
                 f"当前积分：{user['points']}"
             )
         )
-
-    def _get_today(self) -> str:
-        """获取今天的日期字符串"""
-        now = datetime.now()
-        return f"{now.year}-{now.month}-{now.day}"
@@ -5,7 +5,8 @@
 
 from astrbot.api.event import AstrMessageEvent, MessageEventResult
 from ..utils.logger_manager import PluginLogger, UserActionLogger
-import random
+from ..data import activity_log
+from .batch import MAX_BATCH, parse_draw_count
 
 
 class SpinCommand:
@@ -21,105 +22,79 @@ class SpinCommand:
         self.action_logger = UserActionLogger(logger)
         self.plugin_name = "astrbot_plugin_interactive"
 
-        # 幸运转盘配置
-        self.prizes = [
-            {
-                "name": "特等奖",
-                "probability": 0.01,
-                "points": 500,
-                "description": "500积分大奖",
-            },
-            {
-                "name": "一等奖",
-                "probability": 0.05,
-                "points": 200,
-                "description": "200积分",
-            },
-            {
-                "name": "二等奖",
-                "probability": 0.10,
-                "points": 100,
-                "description": "100积分",
-            },
-            {
-                "name": "三等奖",
-                "probability": 0.15,
-                "points": 50,
-                "description": "50积分",
-            },
-            {
-                "name": "四等奖",
-                "probability": 0.20,
-                "points": 20,
-                "description": "20积分",
-            },
-            {
-                "name": "五等奖",
-                "probability": 0.25,
-                "points": 10,
-                "description": "10积分",
-            },
-            {
-                "name": "谢谢参与",
-                "probability": 0.24,
-                "points": 0,
-                "description": "下次好运",
-            },
-        ]
-
-        # 转盘消耗
-        self.spin_cost = 50
-
-    async def handle(self, event: AstrMessageEvent, message: str = "") -> None:
-        """处理幸运转盘命令"""
+    async def handle(
+        self, event: AstrMessageEvent, session, message: str = "", count: str = ""
+    ) -> None:
+        """处理幸运转盘命令（付费转动时 count 为连转次数）"""
         if not event.session_id:
             event.set_result(MessageEventResult().message("无法获取用户ID"))
             return
 
-        user_id = event.get_sender_id()
-        platform = event.get_platform_id()
+        user_id, platform = session.user_id, session.platform
         msg = message.strip().lower()
+        runtime = self.star.runtime
 
         self.logger.debug(
-            f"[{self.plugin_name}] 用户 {user_id}@{platform} 尝试幸运转盘: {msg}"
+            "尝试幸运转盘", user_id=user_id, platform=platform, message=msg
         )
 
         # 处理子命令
         if msg == "info":
-            event.set_result(MessageEventResult().message(self.get_prizes_info()))
+            event.set_result(
+                MessageEventResult().message(
+                    self.star.render_cache.get(runtime, "spin_info", render_prizes_info)
+                )
+            )
             return
         elif msg == "help":
-            help_text = (
-                "🎰 幸运转盘帮助 🎰\n\n"
-                "可用命令：\n"
-                "• spin - 免费转动一次（每日免费）\n"
-                "• spin pay - 付费转动（50积分）\n"
-                "• spin info - 查看奖品详情\n"
-                "• spin help - 显示此帮助"
+            help_text = self.star.render_cache.get(
+                runtime, "spin_help", render_spin_help
             )
             event.set_result(MessageEventResult().message(help_text))
             return
-        elif msg == "pay":
-            cost = self.spin_cost
+
+        times = 1
+        if msg == "pay":
+            times = parse_draw_count(count, MAX_BATCH)
+            if times is None:
+                event.set_result(
+                    MessageEventResult().message(
+                        f"❌ 连转次数必须是 1~{MAX_BATCH} 之间的整数，如 'spin pay 3'"
+                    )
+                )
+                return
+
+        user = await session.load()
+        use_free_spin = False
+        if msg == "pay":
+            cost = runtime.spin.cost * times
         else:
             # 默认使用免费次数
-            user = await self.user_manager.get_user_data(user_id, platform)
-
-            # 检查是否有免费次数
-            free_spins = user.get("free_spin_count", 0)
-            if free_spins > 0 and msg != "pay":
+            if user["free_spin_count"] > 0:
                 cost = 0
-                user["free_spin_count"] = free_spins - 1
-                await self.user_manager.update_user_data(user_id, platform, user)
+                use_free_spin = True
             else:
-                cost = self.spin_cost
+                cost = runtime.spin.cost
 
-        # 检查用户积分
-        user = await self.user_manager.get_user_data(user_id, platform)
-        if user["points"] < cost:
+        # 付费次数每日有上限（免费次数用完后的默认转动也计入）
+        paid = times if msg == "pay" else int(not use_free_spin)
+        remaining = max(0, runtime.spin.paid_limit - user["paid_spin_count"])
+        if paid > remaining:
             self.logger.debug(
-                f"[{self.plugin_name}] 用户 {user_id}@{platform} 积分不足"
+                "付费转盘次数已达上限", user_id=user_id, platform=platform
             )
+            event.set_result(
+                MessageEventResult().message(
+                    f"⏳ 今日付费转动次数已达上限（每日 {runtime.spin.paid_limit} 次）"
+                    if not remaining
+                    else f"⏳ 今日付费转动只剩 {remaining} 次，请减少连转次数"
+                )
+            )
+            return
+
+        # 检查用户积分
+        if user["points"] < cost:
+            self.logger.debug("转盘积分不足", user_id=user_id, platform=platform)
             event.set_result(
                 MessageEventResult().message(
                     f"💰 积分不足！幸运转盘需要 {cost} 积分，你当前只有 {user['points']} 积分"
@@ -127,66 +102,105 @@ class SpinCommand:
             )
             return
 
-        # 扣除积分
-        user["points"] -= cost
+        # 扣除积分或免费次数
+        if use_free_spin:
+            user["free_spin_count"] -= 1
+        if cost > 0:
+            session.consume_points(cost, reason="spin")
+        user["paid_spin_count"] += paid
         user["total_spent"] += cost
-        await self.user_manager.update_user_data(user_id, platform, user)
+        session.mark_dirty()
 
         # 发送转盘动画
         await self.star.context.send_message(event, "🎰 幸运转盘启动中...")
 
         # 随机抽奖
-        prize = self._spin_wheel()
+        table = runtime.spin_table
+        prizes = [table.prizes[i] for i in table.draw_many(times)]
 
         # 记录抽奖结果
-        self.action_logger.log_lottery(user_id, platform, prize["name"])
+        for prize in prizes:
+            self.action_logger.log_lottery(user_id, platform, prize["name"])
+        activity_log.record(
+            user["spin"],
+            self.user_manager.day_clock.today(),
+            [prize["tier"] for prize in prizes],
+        )
 
         # 发放奖励
-        if prize["points"] > 0:
-            user["points"] += prize["points"]
-            await self.user_manager.update_user_data(user_id, platform, user)
+        points = sum(prize["rewards"]["points"] for prize in prizes)
+        if points > 0:
+            session.add_points(points, reason="spin_prize")
+        item_names = []
+        for prize in prizes:
+            for item in prize["rewards"]["items"]:
+                self._grant_item(session, user, item)
+                item_names.append(item["name"])
 
         # 检查成就
-        await self.achievement_manager.check(user_id, platform, user, event)
+        await self.achievement_manager.check(
+            session,
+            event,
+            ("spin.total_spins", "spin.streak_days", "spin.jackpots", "points"),
+        )
 
         # 返回结果
-        if prize["points"] > 0:
-            result_msg = (
-                f"🎉 恭喜！你抽中了 {prize['name']}！\n"
-                f"🎁 {prize['description']}\n"
-                f"💰 当前积分：{user['points']}"
-            )
+        if times == 1:
+            prize = prizes[0]
+            result_msg = f"{prize['message']}\n🎁 {prize['name']}: {points} 积分"
+            if item_names:
+                result_msg += f" + {'、'.join(item_names)}"
         else:
-            result_msg = (
-                f"😢 很遗憾，{prize['name']}！\n"
-                f"💸 消耗 {cost} 积分\n"
-                f"💰 当前积分：{user['points']}\n"
-                f"💡 下次好运！"
-            )
+            result_msg = f"🎰 {times} 连转结果：\n"
+            for reward in table.prizes:
+                hits = sum(1 for prize in prizes if prize is reward)
+                if hits:
+                    result_msg += f"  {reward['name']} x{hits}\n"
+            result_msg += f"🎁 共获得 {points} 积分"
+            if item_names:
+                counts = {}
+                for name in item_names:
+                    counts[name] = counts.get(name, 0) + 1
+                result_msg += " + " + "、".join(
+                    f"{name} x{n}" for name, n in counts.items()
+                )
+        if cost > 0:
+            result_msg += f"\n💸 消耗 {cost} 积分"
+        result_msg += f"\n💰 当前积分：{user['points']}"
 
         event.set_result(MessageEventResult().message(result_msg))
 
-    def _spin_wheel(self) -> dict:
-        """执行转盘抽奖"""
-        rand = random.random()
-        cumulative_prob = 0
-
-        for prize in self.prizes:
-            cumulative_prob += prize["probability"]
-            if rand < cumulative_prob:
-                return prize
-
-        # 如果概率计算有误，返回最低奖励
-        return self.prizes[-1]
-
-    def get_prizes_info(self) -> str:
-        """获取奖品信息"""
-        info = "🎰 幸运转盘奖品 🎰\n\n"
-        for prize in reversed(self.prizes):
-            emoji = "🌟" if prize["points"] > 0 else "💔"
-            prob_percent = int(prize["probability"] * 100)
-            info += (
-                f"{emoji} {prize['name']}: {prize['description']} ({prob_percent}%)\n"
-            )
-        info += f"\n💰 消耗：{self.spin_cost} 积分/次"
-        return info
+    def _grant_item(self, session, user: dict, item: dict) -> None:
+        """发放转盘奖品中的物品"""
+        if item["id"] == "lottery_ticket":
+            # 与商店中的抽奖券一致，直接增加免费抽奖次数
+            user["free_lottery_count"] += 1
+        else:
+            session.add_item(item["id"])
+
+
+def render_prizes_info(runtime) -> str:
+    """渲染转盘奖品信息（只依赖配置）"""
+    lines = ["🎰 幸运转盘奖品 🎰\n"]
+    table = runtime.spin_table
+    for prize, probability in zip(table.prizes, table.probabilities()):
+        rewards = prize["rewards"]
+        content = f"{rewards['points']}积分"
+        if rewards["items"]:
+            content += " + " + "、".join(item["name"] for item in rewards["items"])
+        lines.append(f"{prize['name']}: {content} ({probability * 100:g}%)")
+    lines.append(f"\n💰 消耗：{runtime.spin.cost} 积分/次")
+    return "\n".join(lines)
+
+
+def render_spin_help(runtime) -> str:
+    """渲染转盘帮助（只依赖配置）"""
+    return (
+        "🎰 幸运转盘帮助 🎰\n\n"
+        "可用命令：\n"
+        "• spin - 免费转动一次（每日免费）\n"
+        f"• spin pay - 付费转动（{runtime.spin.cost}积分）\n"
+        f"• spin pay <次数> - 付费连转（每日付费最多 {runtime.spin.paid_limit} 次）\n"
+        "• spin info - 查看奖品详情\n"
+        "• spin help - 显示此帮助"
+    )
@@ -0,0 +1,74 @@
+import time
+
+from astrbot.api.event import AstrMessageEvent, MessageEventResult
+
+from ..utils.logger_manager import PluginLogger
+from ..utils.metrics import MetricsRegistry
+
+
+class StatsCommand:
+    """运行指标查看命令（管理员）"""
+
+    def __init__(
+        self, metrics: MetricsRegistry, logger: PluginLogger, dump_path: str = ""
+    ):
+        self.logger = logger
+        self.plugin_name = "astrbot_plugin_interactive"
+        self.metrics = metrics
+        self.dump_path = dump_path
+
+    def _command_lines(self) -> list:
+        """每条命令的调用次数、错误次数与耗时分位数"""
+        counter = self.metrics.get("commands_total")
+        histogram = self.metrics.get("command_duration_seconds")
+        if counter is None or histogram is None:
+            return ["  暂无数据"]
+        lines = []
+        for (command,), data in sorted(histogram.values.items()):
+            errors = counter.get(command, "error")
+            p50 = histogram.quantile(0.5, command) * 1000
+            p99 = histogram.quantile(0.99, command) * 1000
+            avg = data.sum / data.count * 1000
+            lines.append(
+                f"  {command}: {data.count} 次 (错误 {errors:.0f}) "
+                f"平均 {avg:.1f}ms p50≤{p50:g}ms p99≤{p99:g}ms"
+            )
+        return lines
+
+    def _value(self, name: str) -> float:
+        metric = self.metrics.get(name)
+        if metric is None:
+            return 0
+        return metric.total() if hasattr(metric, "total") else metric.get()
+
+    async def handle(self, event: AstrMessageEvent) -> None:
+        """处理查看运行指标命令"""
+        if not self.metrics.enabled:
+            event.set_result(MessageEventResult().message("运行指标未启用"))
+            return
+
+        uptime = int(time.time() - self.metrics.started_at)
+        result = (
+            f"📈 运行指标（已运行 {uptime // 3600}小时{uptime % 3600 // 60}分）\n"
+            f"⌨️ 命令:\n" + "\n".join(self._command_lines()) + "\n"
+            f"💾 存储: 读取 {self._value('storage_reads_total'):.0f} 次 "
+            f"({self._value('storage_read_bytes_total') / 1024:.1f}KB), "
+            f"写回 {self._value('storage_writes_total'):.0f} 条 "
+            f"({self._value('storage_written_bytes_total') / 1024:.1f}KB)\n"
+            f"🗃️ 缓存: {self._value('cache_entries'):.0f} 条 "
+            f"(待写回 {self._value('cache_dirty_entries'):.0f}), "
+            f"命中率 {self._value('cache_hit_ratio'):.1%}\n"
+            f"🎮 进行中的游戏: {self._value('active_games'):.0f} 局 "
+            f"(超时 {self._value('guess_games_expired_total'):.0f}, "
+            f"淘汰 {self._value('guess_games_evicted_total'):.0f})\n"
+            f"🏆 成就解锁: {self._value('achievements_unlocked_total'):.0f} 次"
+        )
+
+        if self.dump_path:
+            try:
+                await self.metrics.dump(self.dump_path)
+                result += f"\n📝 已导出到 {self.dump_path}"
+            except Exception as e:
+                self.logger.error("指标导出失败", path=self.dump_path, error=str(e))
+
+        event.set_result(MessageEventResult().message(result))
@@ -13,51 +13,44 @@ class UseCommand:
         self.star = star_instance
         self.user_manager = user_manager
 
-    async def handle(self, event: AstrMessageEvent, item_id: str = "") -> None:
+    async def handle(self, event: AstrMessageEvent, session, item_id: str = "") -> None:
         """处理使用物品命令"""
         if not event.session_id:
             event.set_result(MessageEventResult().message("❌ 无法获取用户ID"))
             return
 
-        user_id = event.get_sender_id()
-        platform = event.get_platform_id()
-
         if not item_id:
             event.set_result(
                 MessageEventResult().message(
-                    "❌ 请输入要使用的物品ID，使用 'shop list' 查看可购买物品"
+                    "❌ 请输入要使用的物品ID或名称，使用 'inventory' 查看物品栏"
                 )
             )
             return
 
-        if not await self.user_manager.check_command_limits(user_id, platform, event):
+        if not await self.user_manager.check_command_limits(session, event):
             return
 
-        user = await self.user_manager.get_user_data(user_id, platform)
-        item = await self.user_manager.get_inventory_item(user_id, platform, item_id)
+        user = await session.load()
+        item = session.get_item(item_id)
 
         if not item:
             event.set_result(
                 MessageEventResult().message(
-                    "❌ 你没有该物品或物品不存在，请检查物品ID是否正确"
+                    "❌ 你没有该物品或物品不存在，请检查物品ID或名称是否正确"
                 )
             )
             return
 
-        result = self._apply_item_effect(user, item)
+        result = self._apply_item_effect(session, user, item)
 
-        await self.user_manager.remove_item_from_inventory(user_id, platform, item_id)
-        await self.user_manager.update_user_data(user_id, platform, user)
+        session.remove_item(item["id"])
 
         event.set_result(MessageEventResult().message(result))
 
-    def _apply_item_effect(self, user: dict, item: dict) -> str:
+    def _apply_item_effect(self, session, user: dict, item: dict) -> str:
         """应用物品效果"""
         if item["id"] == "coffee":
-            if user["daily_command_count"] >= 5:
-                user["daily_command_count"] -= 5
-            else:
-                user["daily_command_count"] = 0
+            self.user_manager.refund_commands(session.user_id, session.platform, 5)
             return "☕ 你喝了一杯提神咖啡，恢复了 5 次每日使用次数！"
         elif item["id"] == "exp_card":
             return "✨ 经验卡已激活！下次猜数字游戏将获得额外 20% 积分奖励！"
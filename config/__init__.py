@@ -2,8 +2,15 @@
 from .achievements import ACHIEVEMENTS
 from .shop_items import DEFAULT_SHOP_ITEMS
 from .lottery_items import LOTTERY_ITEMS
-from .cow_config import COW_LEVELS, DEFAULT_COW, COW_INTERACTIONS, COW_NICKNAMES
+from .cow_config import (
+    COW_LEVELS,
+    DEFAULT_COW,
+    COW_INTERACTIONS,
+    COW_NICKNAMES,
+    COW_DECAY,
+)
 from .spin_config import SPIN_CONFIG, SPIN_REWARDS
+from .item_catalog import ITEM_CATALOG, ITEM_NAME_INDEX, item_info, resolve_item
 
 __all__ = [
     "ACHIEVEMENTS",
@@ -13,6 +20,11 @@ __all__ = [
     "DEFAULT_COW",
     "COW_INTERACTIONS",
     "COW_NICKNAMES",
+    "COW_DECAY",
     "SPIN_CONFIG",
     "SPIN_REWARDS",
-]
\ No newline at end of file
+    "ITEM_CATALOG",
+    "ITEM_NAME_INDEX",
+    "item_info",
+    "resolve_item",
+]
@@ -1,63 +1,97 @@
 # 成就系统配置
+# bit: 成就在用户解锁位图中的位置，上线后不可修改或复用
+# stat: 触发成就的统计项（见 commands/achievements.py 中的 ACHIEVEMENT_STATS）
+# op: 比较方式，默认 ">="
+# threshold: 达成阈值
 ACHIEVEMENTS = [
     {
         "id": "first_blood",
         "name": "初出茅庐",
         "description": "赢得第一场游戏",
         "reward": 50,
+        "bit": 0,
+        "stat": "games_won",
+        "threshold": 1,
     },
     {
         "id": "sign_master",
         "name": "签到达人",
         "description": "连续签到7天",
         "reward": 100,
+        "bit": 1,
+        "stat": "consecutive_days",
+        "threshold": 7,
     },
     {
         "id": "millionaire",
         "name": "积分大亨",
         "description": "总积分达到500",
         "reward": 200,
+        "bit": 2,
+        "stat": "points",
+        "threshold": 500,
     },
     {
         "id": "game_addict",
         "name": "游戏沉迷",
         "description": "参与20场游戏",
         "reward": 150,
+        "bit": 3,
+        "stat": "games_played",
+        "threshold": 20,
     },
     {
         "id": "lottery_king",
         "name": "抽卡之王",
         "description": "抽中5次SSR大奖",
         "reward": 300,
+        "bit": 4,
+        "stat": "ssr_count",
+        "threshold": 5,
     },
     {
         "id": "shopper",
         "name": "购物狂",
         "description": "在商店消费1000积分",
         "reward": 250,
+        "bit": 5,
+        "stat": "total_spent",
+        "threshold": 1000,
     },
     {
         "id": "spin_beginner",
         "name": "转盘新手",
         "description": "首次转动幸运转盘",
         "reward": 30,
+        "bit": 6,
+        "stat": "spin.total_spins",
+        "threshold": 1,
     },
     {
         "id": "spin_regular",
         "name": "转盘常客",
         "description": "累计转动转盘10次",
         "reward": 80,
+        "bit": 7,
+        "stat": "spin.total_spins",
+        "threshold": 10,
     },
     {
         "id": "spin_master",
         "name": "转盘老手",
         "description": "连续7天参与转盘",
         "reward": 200,
+        "bit": 8,
+        "stat": "spin.streak_days",
+        "threshold": 7,
     },
     {
         "id": "lucky_star",
         "name": "幸运之星",
         "description": "在转盘中获得特等奖",
         "reward": 500,
+        "bit": 9,
+        "stat": "spin.jackpots",
+        "threshold": 1,
     },
 ]
\ No newline at end of file
@@ -23,9 +23,21 @@ DEFAULT_COW = {
     "hunger": 100,
     "last_feed_time": 0,
     "last_play_time": 0,
+    "status_time": 0,  # 健康、心情、饱食度最后一次结算的时间（毫秒）
     "created_at": 0,
 }
 
+# 状态衰减配置（每小时）
+# 饱食度和心情随时间线性下降；两者都不低于阈值时健康缓慢恢复，
+# 任一低于阈值后健康开始下降
+COW_DECAY = {
+    "hunger_per_hour": 4,
+    "mood_per_hour": 3,
+    "threshold": 30,
+    "health_loss_per_hour": 2,
+    "health_regen_per_hour": 1,
+}
+
 # 互动配置
 COW_INTERACTIONS = {
     "feed": {"hunger_restore": 30, "favor_gain": 5, "exp_gain": 10, "points_cost": 10},
@@ -47,4 +59,4 @@ COW_NICKNAMES = [
     "牛牛",
     "毛毛",
     "可可",
-]
\ No newline at end of file
+]
@@ -0,0 +1,142 @@
+"""
+牛牛状态与等级计算
+由配置编译出的状态衰减参数和等级表，随运行时配置快照一起构建
+"""
+
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cow_config import COW_DECAY, COW_LEVELS
+
+_HOUR_MS = 3_600_000
+
+
+class CowStatus:
+    """
+    牛牛状态衰减
+
+    不保存定时器，只记录上次结算的时间戳，读取时按流逝时间以闭式计算当前的
+    饱食度、心情和健康；只有在互动修改状态时才把结果写回记录
+    """
+
+    def __init__(
+        self,
+        hunger_per_hour: float = COW_DECAY["hunger_per_hour"],
+        mood_per_hour: float = COW_DECAY["mood_per_hour"],
+        threshold: float = COW_DECAY["threshold"],
+        health_loss_per_hour: float = COW_DECAY["health_loss_per_hour"],
+        health_regen_per_hour: float = COW_DECAY["health_regen_per_hour"],
+    ):
+        self.hunger_rate = max(0.0, hunger_per_hour)
+        self.mood_rate = max(0.0, mood_per_hour)
+        self.threshold = threshold
+        self.health_loss = max(0.0, health_loss_per_hour)
+        self.health_regen = max(0.0, health_regen_per_hour)
+
+    def _time_to_threshold(self, value: float, rate: float) -> float:
+        """数值降到阈值以下所需的小时数"""
+        if value < self.threshold:
+            return 0.0
+        if rate <= 0:
+            return float("inf")
+        return (value - self.threshold) / rate
+
+    def current(self, cow: Dict[str, Any], now: int) -> Tuple[float, float, float]:
+        """
+        计算当前状态
+
+        Args:
+            cow: 牛牛数据
+            now: 当前时间（毫秒）
+
+        Returns:
+            (健康, 心情, 饱食度)
+        """
+        hours = max(0, now - (cow.get("status_time") or now)) / _HOUR_MS
+        health, mood, hunger = cow["health"], cow["mood"], cow["hunger"]
+        if hours <= 0:
+            return health, mood, hunger
+
+        # 饱食度或心情先降到阈值以下的时刻之前健康恢复，之后健康下降
+        healthy = min(
+            hours,
+            self._time_to_threshold(hunger, self.hunger_rate),
+            self._time_to_threshold(mood, self.mood_rate),
+        )
+        health = min(100, health + self.health_regen * healthy)
+        health = max(0, health - self.health_loss * (hours - healthy))
+        return (
+            health,
+            max(0, mood - self.mood_rate * hours),
+            max(0, hunger - self.hunger_rate * hours),
+        )
+
+    def settle(self, cow: Dict[str, Any], now: int) -> None:
+        """把当前状态写回记录并更新结算时间（修改状态前调用）"""
+        health, mood, hunger = self.current(cow, now)
+        cow["health"] = round(health, 2)
+        cow["mood"] = round(mood, 2)
+        cow["hunger"] = round(hunger, 2)
+        cow["status_time"] = now
+
+
+class CowLevelTable:
+    """
+    编译后的牛牛等级表
+
+    启动时按倍率计算各等级的经验和好感度门槛，按等级下标保存；
+    升级时对两列门槛分别二分查找，一次即可跨越多个等级
+    """
+
+    def __init__(
+        self,
+        levels: List[Dict[str, Any]] = COW_LEVELS,
+        exp_mult: float = 1.0,
+        favor_mult: float = 1.0,
+    ):
+        ordered = sorted(levels, key=lambda level: level["level"])
+        self.levels = [
+            {
+                **level,
+                "exp_needed": int(level["exp_needed"] * exp_mult),
+                "favor_needed": int(level["favor_needed"] * favor_mult),
+            }
+            for level in ordered
+        ]
+        self.base_level = ordered[0]["level"]
+        self.max_level = ordered[-1]["level"]
+        # 门槛需单调不减才能二分查找
+        self._exp = self._monotonic(level["exp_needed"] for level in self.levels)
+        self._favor = self._monotonic(level["favor_needed"] for level in self.levels)
+
+    @staticmethod
+    def _monotonic(values) -> List[int]:
+        result = []
+        for value in values:
+            result.append(max(value, result[-1]) if result else value)
+        return result
+
+    def info(self, level: int) -> Dict[str, Any]:
+        """获取等级信息（超出范围时取最近的等级）"""
+        index = min(max(level - self.base_level, 0), len(self.levels) - 1)
+        return self.levels[index]
+
+    def next(self, level: int) -> Optional[Dict[str, Any]]:
+        """获取下一等级信息，已满级时返回 None"""
+        if level >= self.max_level:
+            return None
+        return self.info(level + 1)
+
+    def level_for(self, exp: int, favor: int) -> int:
+        """经验和好感度同时满足门槛的最高等级"""
+        reached = min(bisect_right(self._exp, exp), bisect_right(self._favor, favor))
+        return self.base_level + max(reached, 1) - 1
+
+    def apply(self, cow: Dict[str, Any]) -> int:
+        """按当前经验和好感度更新等级（不会降级），返回提升的等级数"""
+        level = self.level_for(cow["exp"], cow["favor"])
+        gained = level - cow["level"]
+        if gained <= 0:
+            return 0
+        cow["level"] = level
+        return gained
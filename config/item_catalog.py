@@ -0,0 +1,66 @@
+"""
+物品目录
+汇总商店商品和转盘奖品中的物品，用户物品栏只保存物品ID和数量，名称和描述从这里查询
+"""
+
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional
+
+from .shop_items import DEFAULT_SHOP_ITEMS
+from .spin_config import SPIN_REWARDS
+
+
+def _all_items() -> List[Dict]:
+    """全部物品定义，商店在前"""
+    items = list(DEFAULT_SHOP_ITEMS)
+    for reward in SPIN_REWARDS:
+        items.extend(reward["rewards"]["items"])
+    return items
+
+
+def _build_catalog() -> Dict[str, Mapping[str, str]]:
+    catalog: Dict[str, Mapping[str, str]] = {}
+    # 同一物品在商店和转盘中都出现时以商店中的定义为准
+    for item in _all_items():
+        if item["id"] not in catalog:
+            catalog[item["id"]] = MappingProxyType(
+                {
+                    "id": item["id"],
+                    "name": item["name"],
+                    "description": item["description"],
+                }
+            )
+    return catalog
+
+
+def _build_name_index() -> Dict[str, str]:
+    index: Dict[str, str] = {}
+    for item in _all_items():
+        name = item["name"]
+        index.setdefault(name, item["id"])
+        # 带图标前缀的名称（如 "📚 经验卡"）也可以只输入文字部分
+        if " " in name:
+            index.setdefault(name.split(" ", 1)[1], item["id"])
+    return index
+
+
+# 物品ID -> 物品信息（只读）
+ITEM_CATALOG: Mapping[str, Mapping[str, str]] = MappingProxyType(_build_catalog())
+# 物品名称 -> 物品ID
+ITEM_NAME_INDEX: Mapping[str, str] = MappingProxyType(_build_name_index())
+
+
+def resolve_item(text: str) -> Optional[str]:
+    """将用户输入的物品ID或名称解析为物品ID，未知物品返回 None"""
+    text = (text or "").strip()
+    if text in ITEM_CATALOG:
+        return text
+    return ITEM_NAME_INDEX.get(text)
+
+
+def item_info(item_id: str) -> Mapping[str, str]:
+    """物品信息，目录中不存在的旧物品以ID作为名称"""
+    info = ITEM_CATALOG.get(item_id)
+    if info is None:
+        return {"id": item_id, "name": item_id, "description": ""}
+    return info
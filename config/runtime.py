@@ -0,0 +1,336 @@
+"""
+运行时配置快照
+将插件的嵌套配置字典编译为不可变的类型化对象，并预先构建奖品表、等级表、商品目录等
+派生结构。处理函数按属性读取配置；配置变化时整体重建快照并一次性替换
+"""
+
+from dataclasses import asdict, dataclass, fields, replace
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from ..utils.sampler import PrizeTable, boost_weights
+from .cow_config import COW_INTERACTIONS, COW_LEVELS
+from .cow_tables import CowLevelTable, CowStatus
+from .lottery_items import LOTTERY_ITEMS
+from .shop_items import DEFAULT_SHOP_ITEMS
+from .spin_config import SPIN_CONFIG, SPIN_REWARDS
+
+
+@dataclass(frozen=True)
+class PointsConfig:
+    """积分系统配置"""
+
+    initial_points: int = 100
+    daily_command_limit: int = 50
+    command_cooldown: float = 5.0
+    command_burst: int = 1
+
+
+@dataclass(frozen=True)
+class SignConfig:
+    """签到配置"""
+
+    base_reward: int = 10
+    consecutive_bonus: int = 2
+    max_consecutive_bonus: int = 100
+    week_bonus: int = 50
+
+
+@dataclass(frozen=True)
+class LotteryConfig:
+    """抽奖配置"""
+
+    cost: int = 10
+    ssr_rate: float = 5.0
+    sr_rate: float = 10.0
+    r_rate: float = 25.0
+    ssr_reward: int = 100
+    sr_reward: int = 30
+    r_reward: int = 10
+    lucky_charm_boost: float = 20.0
+
+
+@dataclass(frozen=True)
+class SpinConfig:
+    """幸运转盘配置"""
+
+    cost: int = SPIN_CONFIG["cost"]
+    daily_free: int = SPIN_CONFIG["daily_free"]
+    paid_limit: int = SPIN_CONFIG["paid_limit"]
+    # 各档位概率（百分比），参与奖取剩余概率；默认值与 SPIN_REWARDS 一致
+    jackpot_rate: float = 0.5
+    first_rate: float = 2.0
+    second_rate: float = 7.5
+    third_rate: float = 20.0
+    fourth_rate: float = 30.0
+
+
+@dataclass(frozen=True)
+class GuessConfig:
+    """猜数字配置"""
+
+    max_number: int = 100
+    base_points: int = 5
+    time_bonus_rate: float = 2.0
+    attempt_penalty: int = 1
+    session_ttl: int = 600
+    max_sessions: int = 10000
+
+
+@dataclass(frozen=True)
+class CowConfig:
+    """牛牛系统配置"""
+
+    feed_cost: int = 10
+    play_cost: int = 5
+    feed_restore: int = 30
+    play_restore: int = 30
+    level_up_exp_mult: float = 1.0
+    level_up_favor_mult: float = 1.0
+    hunger_decay: float = 4.0
+    mood_decay: float = 3.0
+    status_threshold: int = 30
+    health_decay: float = 2.0
+    health_regen: float = 1.0
+
+
+@dataclass(frozen=True)
+class ShopConfig:
+    """商店配置"""
+
+    enable_custom_prices: bool = False
+    double_card_price: int = 50
+    lottery_ticket_price: int = 40
+    hint_token_price: int = 30
+    lucky_charm_price: int = 100
+    coffee_price: int = 80
+    exp_card_price: int = 120
+
+
+@dataclass(frozen=True)
+class StorageConfig:
+    """存储配置"""
+
+    backend: str = "kv"
+    sqlite_path: str = ""
+    cache_size: int = 1024
+    flush_interval: int = 10
+    max_dirty_age: int = 30
+
+
+@dataclass(frozen=True)
+class JournalConfig:
+    """交易流水配置"""
+
+    enable: bool = True
+    path: str = ""
+    max_file_mb: int = 10
+    backup_count: int = 5
+
+
+@dataclass(frozen=True)
+class MetricsConfig:
+    """运行指标配置"""
+
+    enable: bool = True
+    dump_path: str = ""
+    dump_interval: int = 60
+
+
+# 快照属性名 -> (配置字典中的键, 配置类)
+SECTIONS = {
+    "points": ("points", PointsConfig),
+    "sign": ("sign", SignConfig),
+    "lottery": ("lottery", LotteryConfig),
+    "spin": ("spin", SpinConfig),
+    "guess": ("guess_game", GuessConfig),
+    "cow": ("cow_system", CowConfig),
+    "shop": ("shop", ShopConfig),
+    "storage": ("storage", StorageConfig),
+    "journal": ("journal", JournalConfig),
+    "metrics": ("metrics", MetricsConfig),
+}
+
+# 顶层配置项及默认值
+TOP_LEVEL = {"debug_mode": False, "log_format": "kv", "timezone": ""}
+
+
+def _coerce(value: Any, default: Any) -> Any:
+    """按默认值的类型转换配置值，无法转换时使用默认值"""
+    if value is None:
+        return default
+    try:
+        if isinstance(default, bool):
+            if isinstance(value, str):
+                return value.strip().lower() in ("1", "true", "yes", "on")
+            return bool(value)
+        if isinstance(default, int):
+            return int(value)
+        if isinstance(default, float):
+            return float(value)
+        return str(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _build_section(cls, raw: Optional[Mapping[str, Any]]):
+    raw = raw if isinstance(raw, Mapping) else {}
+    values = {}
+    for field in fields(cls):
+        values[field.name] = _coerce(raw.get(field.name), field.default)
+    return cls(**values)
+
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    """不可变的运行时配置快照"""
+
+    version: int
+    debug_mode: bool
+    log_format: str
+    timezone: str
+    points: PointsConfig
+    sign: SignConfig
+    lottery: LotteryConfig
+    spin: SpinConfig
+    guess: GuessConfig
+    cow: CowConfig
+    shop: ShopConfig
+    storage: StorageConfig
+    journal: JournalConfig
+    metrics: MetricsConfig
+
+    # 派生结构
+    lottery_table: PrizeTable
+    lottery_rewards: Tuple[int, ...]  # 与 LOTTERY_ITEMS 顺序一致
+    spin_table: PrizeTable  # 与 SPIN_REWARDS 顺序一致
+    shop_items: Tuple[Mapping[str, Any], ...]
+    shop_index: Mapping[str, Mapping[str, Any]]
+    cow_interactions: Mapping[str, Mapping[str, Any]]
+    cow_levels: CowLevelTable
+    cow_status: CowStatus
+
+    @staticmethod
+    def default_dict() -> Dict[str, Any]:
+        """默认配置（嵌套字典形式，用于补全插件配置）"""
+        defaults: Dict[str, Any] = dict(TOP_LEVEL)
+        for key, cls in SECTIONS.values():
+            defaults[key] = asdict(cls())
+        return defaults
+
+    @classmethod
+    def from_dict(
+        cls, raw: Optional[Mapping[str, Any]], version: int = 1
+    ) -> "RuntimeConfig":
+        """
+        编译配置快照
+
+        Args:
+            raw: 插件配置字典，缺失或类型错误的项使用默认值
+            version: 快照版本号，每次重新加载递增
+
+        Returns:
+            配置快照
+        """
+        raw = raw or {}
+        sections = {
+            name: _build_section(section_cls, raw.get(key))
+            for name, (key, section_cls) in SECTIONS.items()
+        }
+        top = {
+            key: _coerce(raw.get(key), default) for key, default in TOP_LEVEL.items()
+        }
+        lottery: LotteryConfig = sections["lottery"]
+        spin: SpinConfig = sections["spin"]
+        shop: ShopConfig = sections["shop"]
+        cow: CowConfig = sections["cow"]
+
+        # 稀有度顺序与 LOTTERY_ITEMS 一致: SSR, SR, R, N
+        ssr, sr, r = (
+            max(0.0, rate)
+            for rate in (lottery.ssr_rate, lottery.sr_rate, lottery.r_rate)
+        )
+        boost = 1 + lottery.lucky_charm_boost / 100
+        lottery_table = PrizeTable(
+            LOTTERY_ITEMS,
+            [ssr, sr, r, max(0.0, 100.0 - ssr - sr - r)],
+            {"lucky_charm": lambda w: boost_weights(w, (0, 1, 2), boost, 3)},
+        )
+        lottery_rewards = (lottery.ssr_reward, lottery.sr_reward, lottery.r_reward)
+        lottery_rewards += (0,) * (len(LOTTERY_ITEMS) - len(lottery_rewards))
+
+        # 档位顺序与 SPIN_REWARDS 一致，最后一档（参与奖）取剩余概率
+        spin_rates = [
+            max(0.0, rate)
+            for rate in (
+                spin.jackpot_rate,
+                spin.first_rate,
+                spin.second_rate,
+                spin.third_rate,
+                spin.fourth_rate,
+            )
+        ]
+        spin_table = PrizeTable(
+            SPIN_REWARDS, spin_rates + [max(0.0, 100.0 - sum(spin_rates))]
+        )
+        sections["spin"] = replace(
+            spin,
+            cost=max(0, spin.cost),
+            daily_free=max(0, spin.daily_free),
+            paid_limit=max(0, spin.paid_limit),
+        )
+
+        shop_items = []
+        for item in DEFAULT_SHOP_ITEMS:
+            item = dict(item)
+            if shop.enable_custom_prices:
+                item["price"] = getattr(shop, f"{item['id']}_price", item["price"])
+            shop_items.append(MappingProxyType(item))
+
+        # 恢复量至少为 1，否则批量互动无法计算回满所需次数
+        cow = replace(
+            cow,
+            feed_restore=max(1, cow.feed_restore),
+            play_restore=max(1, cow.play_restore),
+        )
+        sections["cow"] = cow
+        interactions = {
+            action: dict(config) for action, config in COW_INTERACTIONS.items()
+        }
+        interactions["feed"].update(
+            points_cost=cow.feed_cost, hunger_restore=cow.feed_restore
+        )
+        interactions["play"].update(
+            points_cost=cow.play_cost, mood_restore=cow.play_restore
+        )
+
+        return cls(
+            version=version,
+            **top,
+            **sections,
+            lottery_table=lottery_table,
+            lottery_rewards=lottery_rewards,
+            spin_table=spin_table,
+            shop_items=tuple(shop_items),
+            shop_index=MappingProxyType({item["id"]: item for item in shop_items}),
+            cow_interactions=MappingProxyType(
+                {
+                    action: MappingProxyType(config)
+                    for action, config in interactions.items()
+                }
+            ),
+            cow_levels=CowLevelTable(
+                COW_LEVELS,
+                exp_mult=cow.level_up_exp_mult if cow.level_up_exp_mult > 0 else 1.0,
+                favor_mult=(
+                    cow.level_up_favor_mult if cow.level_up_favor_mult > 0 else 1.0
+                ),
+            ),
+            cow_status=CowStatus(
+                hunger_per_hour=cow.hunger_decay,
+                mood_per_hour=cow.mood_decay,
+                threshold=cow.status_threshold,
+                health_loss_per_hour=cow.health_decay,
+                health_regen_per_hour=cow.health_regen,
+            ),
+        )
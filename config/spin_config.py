@@ -2,11 +2,11 @@
 幸运转盘配置
 """
 
-# 转盘基础配置
+# 转盘基础配置（默认值，运行时以插件配置中的 spin 段为准）
 SPIN_CONFIG = {
     "daily_free": 1,  # 每日免费次数
     "paid_limit": 3,  # 付费次数上限
-    "cost": 20,  # 每次付费价格（积分）
+    "cost": 50,  # 每次付费价格（积分），需高于单次期望奖励（约 34 积分 + 物品）
     "cooldown_seconds": 3,  # 转动冷却时间（秒）
 }
 
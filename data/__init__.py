@@ -1,5 +1,29 @@
 # 数据管理模块
 from .user_manager import UserManager
 from .game_manager import GameManager
+from .user_cache import UserCache
+from .user_session import UserSession
+from .user_record import UserRecord, SCHEMA_VERSION
+from .lock_manager import KeyedLockManager
+from .storage import StorageBackend, KVStorage, create_storage
+from .sqlite_storage import SQLiteStorage
+from .leaderboard import Leaderboard, SortedIndex, BOARDS
+from .rate_limiter import RateLimiter
 
-__all__ = ["UserManager", "GameManager"]
+__all__ = [
+    "UserManager",
+    "GameManager",
+    "UserCache",
+    "UserSession",
+    "UserRecord",
+    "SCHEMA_VERSION",
+    "KeyedLockManager",
+    "StorageBackend",
+    "KVStorage",
+    "SQLiteStorage",
+    "create_storage",
+    "Leaderboard",
+    "SortedIndex",
+    "BOARDS",
+    "RateLimiter",
+]
@@ -0,0 +1,136 @@
+"""
+活动记录模块
+每个玩法在用户记录中保存一份活动记录：定长环形缓冲区保存最近的结果，
+按日参与位图与累计字段（总次数、连续天数、最好成绩及其次数）随写入增量更新，
+统计查询都是 O(1) 的位运算或字段读取，记录大小有固定上限
+
+活动记录是可直接 JSON 编码的字典:
+    total: 累计次数
+    recent: 最近结果 [[日序号, 结果], ...]（环形缓冲区）
+    pos: 下一次写入 recent 的位置
+    days: 参与位图，第 i 位表示 last_day - i 当天有参与
+    last_day: 最近一次参与的日序号
+    streak: 截至 last_day 的连续参与天数
+    best: 最好成绩（越小越好，如转盘档位、抽奖稀有度序号、猜中所用次数）
+    best_hits: 取得最好成绩的次数
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+# 环形缓冲区容量
+HISTORY_SIZE = 20
+# 参与位图保留的天数
+DAY_WINDOW = 64
+_DAY_MASK = (1 << DAY_WINDOW) - 1
+
+
+def new_log() -> Dict[str, Any]:
+    """创建空的活动记录"""
+    return {
+        "total": 0,
+        "recent": [],
+        "pos": 0,
+        "days": 0,
+        "last_day": 0,
+        "streak": 0,
+        "best": None,
+        "best_hits": 0,
+    }
+
+
+def record(log: Dict[str, Any], day: int, results: Iterable[Any]) -> None:
+    """
+    写入同一天的一批结果
+
+    Args:
+        log: 活动记录
+        day: 日序号
+        results: 结果列表（按发生顺序）
+    """
+    _touch_day(log, day)
+    recent, pos = log["recent"], log["pos"]
+    best, best_hits = log["best"], log["best_hits"]
+    for result in results:
+        if len(recent) < HISTORY_SIZE:
+            recent.append([day, result])
+        else:
+            recent[pos] = [day, result]
+        pos = (pos + 1) % HISTORY_SIZE
+        if best is None or result < best:
+            best, best_hits = result, 1
+        elif result == best:
+            best_hits += 1
+        log["total"] += 1
+    log["pos"], log["best"], log["best_hits"] = pos, best, best_hits
+
+
+def _touch_day(log: Dict[str, Any], day: int) -> None:
+    """登记当天参与，更新位图和连续天数"""
+    last_day = log["last_day"]
+    if day == last_day:
+        return
+    if day < last_day:
+        # 时钟回拨时只补登位图
+        if last_day - day < DAY_WINDOW:
+            log["days"] |= 1 << (last_day - day)
+        return
+    shift = day - last_day
+    if last_day and shift < DAY_WINDOW:
+        log["days"] = ((log["days"] << shift) | 1) & _DAY_MASK
+    else:
+        log["days"] = 1
+    log["streak"] = log["streak"] + 1 if last_day and shift == 1 else 1
+    log["last_day"] = day
+
+
+def recent(log: Dict[str, Any], limit: Optional[int] = None) -> List[List[Any]]:
+    """最近的结果（新的在前）"""
+    entries, pos = log["recent"], log["pos"]
+    ordered = entries[pos:] + entries[:pos] if len(entries) == HISTORY_SIZE else entries
+    ordered = ordered[::-1]
+    return ordered if limit is None else ordered[:limit]
+
+
+def active_days(log: Dict[str, Any], today: int, days: int = 7) -> int:
+    """最近 days 天（含今天）中有参与的天数"""
+    offset = today - log["last_day"]
+    if offset >= days or offset < 0:
+        return 0
+    window = (1 << min(days - offset, DAY_WINDOW)) - 1
+    return bin(log["days"] & window).count("1")
+
+
+def hits(log: Dict[str, Any], result: Any) -> int:
+    """取得某个最好成绩的次数（如转盘特等奖次数）"""
+    return log["best_hits"] if log["best"] == result else 0
+
+
+def from_history(
+    total: int, history: Iterable[List[Any]], last_day: int = 0, streak: int = 0
+) -> Dict[str, Any]:
+    """
+    由旧版历史列表（新的在前）构建活动记录
+
+    最好成绩只能从保留下来的历史中推算
+    """
+    log = new_log()
+    entries = list(history)[:HISTORY_SIZE][::-1]
+    for day, result in entries:
+        if log["best"] is None or result < log["best"]:
+            log["best"], log["best_hits"] = result, 1
+        elif result == log["best"]:
+            log["best_hits"] += 1
+    days = {day for day, _ in entries}
+    if days and not last_day:
+        last_day = max(days)
+    for day in days:
+        if 0 <= last_day - day < DAY_WINDOW:
+            log["days"] |= 1 << (last_day - day)
+    log.update(
+        total=max(total, len(entries)),
+        recent=[list(entry) for entry in entries],
+        pos=len(entries) % HISTORY_SIZE,
+        last_day=last_day,
+        streak=streak,
+    )
+    return log
@@ -1,60 +1,319 @@
+import asyncio
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, Optional
 import random
 
 from ..utils.logger_manager import PluginLogger
+from ..utils.metrics import MetricsRegistry
+
+# 游戏结束原因
+EXPIRED = "expired"  # 超时未操作
+EVICTED = "evicted"  # 超出同时进行的游戏上限被淘汰
+
+
+def _now_ms() -> int:
+    """当前时间戳（毫秒）"""
+    return int(datetime.now().timestamp() * 1000)
 
 
 class GameManager:
     """游戏状态管理器"""
 
-    def __init__(self, logger: PluginLogger):
-        self.games: Dict[str, Dict] = {}  # 存储游戏状态
+    SNAPSHOT_NAME = "guess_sessions"
+    SNAPSHOT_VERSION = 1
+
+    def __init__(
+        self,
+        logger: PluginLogger,
+        ttl: int = 600,
+        max_games: int = 10000,
+        sweep_interval: int = 60,
+        storage=None,
+        checkpoint_interval: int = 300,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        """
+        初始化游戏状态管理器
+
+        Args:
+            logger: 日志记录器
+            ttl: 游戏无操作多久后过期（秒）
+            max_games: 同时存在的游戏数上限，超出时淘汰最久未操作的游戏
+            sweep_interval: 后台清理过期游戏的间隔（秒）
+            storage: 存储后端，用于保存和恢复进行中的游戏，为 None 时不持久化
+            checkpoint_interval: 定期保存进行中游戏的间隔（秒）
+            metrics: 运行指标，为 None 时不导出过期和淘汰计数
+        """
+        # 存储游戏状态，按最近操作时间排序（最久未操作的在最前）
+        self.games: "OrderedDict[str, Dict]" = OrderedDict()
         self.logger = logger
+        self.configure(ttl, max_games)
+        self.sweep_interval = sweep_interval
+        # 已过期但尚未告知玩家的游戏
+        self._expired: "OrderedDict[str, Dict]" = OrderedDict()
+        metrics = metrics if metrics is not None else MetricsRegistry(enabled=False)
+        self._expired_total = metrics.counter(
+            "guess_games_expired_total", "超时过期的猜数字游戏数"
+        )
+        self._evicted_total = metrics.counter(
+            "guess_games_evicted_total", "因容量上限被淘汰的猜数字游戏数"
+        )
+        self._sweep_task: Optional[asyncio.Task] = None
+        self.storage = storage
+        self.checkpoint_interval = checkpoint_interval
+        self._changed = False  # 自上次保存后是否有变化
+
+    @property
+    def expired_count(self) -> int:
+        """超时过期的游戏数"""
+        return int(self._expired_total.total())
+
+    @property
+    def evicted_count(self) -> int:
+        """因容量上限被淘汰的游戏数"""
+        return int(self._evicted_total.total())
+
+    def configure(self, ttl: int, max_games: int) -> None:
+        """更新过期时间和容量上限，对之后的操作生效"""
+        self.ttl_ms = ttl * 1000
+        self.max_games = max(1, max_games)
 
     def create_guess_game(self, game_key: str, max_number: int = 100) -> Dict:
         """创建猜数字游戏"""
+        now = _now_ms()
         game = {
             "target_number": random.randint(1, max_number),
             "attempts": 0,
-            "start_time": int(datetime.now().timestamp() * 1000),
+            "start_time": now,
             "max_number": max_number,
+            "deadline": now + self.ttl_ms,
         }
+        self.games.pop(game_key, None)
+        self._expired.pop(game_key, None)
         self.games[game_key] = game
+        self._changed = True
+        while len(self.games) > self.max_games:
+            old_key, old_game = self.games.popitem(last=False)
+            self._retire(old_key, old_game, EVICTED)
+            self._evicted_total.inc()
         self.logger.info(
             "创建新游戏", game_key=game_key, target_number=game["target_number"]
         )
         return game
 
     def get_game(self, game_key: str) -> Optional[Dict]:
-        """获取游戏状态"""
-        return self.games.get(game_key)
+        """获取游戏状态（会刷新过期时间），已过期的游戏返回 None"""
+        game = self.games.get(game_key)
+        if game is None:
+            return None
+        now = _now_ms()
+        if game["deadline"] <= now:
+            self._expire(game_key, game)
+            return None
+        game["deadline"] = now + self.ttl_ms
+        self.games.move_to_end(game_key)
+        return game
 
     def delete_game(self, game_key: str) -> bool:
         """删除游戏状态"""
         if game_key in self.games:
             del self.games[game_key]
+            self._changed = True
             self.logger.debug("游戏已删除", game_key=game_key)
             return True
         return False
 
+    def pop_expired_game(self, game_key: str) -> Optional[Dict]:
+        """
+        取出已结束且尚未告知玩家的游戏
+
+        已过期但清理任务尚未处理的游戏在这里一并结束，
+        返回的游戏中 end_reason 为 EXPIRED 或 EVICTED
+        """
+        game = self.games.get(game_key)
+        if game is not None and game["deadline"] <= _now_ms():
+            self._expire(game_key, game)
+        return self._expired.pop(game_key, None)
+
+    def _expire(self, game_key: str, game: Dict) -> None:
+        """结束一局已过期的游戏"""
+        del self.games[game_key]
+        self._retire(game_key, game, EXPIRED)
+        self._expired_total.inc()
+
+    def _retire(self, game_key: str, game: Dict, reason: str) -> None:
+        """记录已结束的游戏，等待玩家下次发消息时告知答案"""
+        self._changed = True
+        game["end_reason"] = reason
+        self._expired[game_key] = game
+        self._expired.move_to_end(game_key)
+        while len(self._expired) > self.max_games:
+            self._expired.popitem(last=False)
+        self.logger.debug(
+            "游戏已过期" if reason == EXPIRED else "游戏已被淘汰",
+            game_key=game_key,
+            target_number=game["target_number"],
+        )
+
+    def sweep(self) -> int:
+        """清理过期游戏，返回清理数量"""
+        now = _now_ms()
+        count = 0
+        # 过期时间随操作顺延，最前面的游戏总是最早过期
+        while self.games:
+            game_key, game = next(iter(self.games.items()))
+            if game["deadline"] > now:
+                break
+            del self.games[game_key]
+            self._retire(game_key, game, EXPIRED)
+            count += 1
+        if count:
+            self._expired_total.inc(count)
+        return count
+
+    def dump_snapshot(self) -> Dict:
+        """
+        导出进行中游戏的紧凑快照
+
+        每局游戏保存为 [键, 目标数字, 尝试次数, 已用时(ms), 最大数字, 剩余有效期(ms)]
+        """
+        now = _now_ms()
+        return {
+            "v": self.SNAPSHOT_VERSION,
+            "games": [
+                [
+                    key,
+                    game["target_number"],
+                    game["attempts"],
+                    now - game["start_time"],
+                    game["max_number"],
+                    game["deadline"] - now,
+                ]
+                for key, game in self.games.items()
+                if game["deadline"] > now
+            ],
+        }
+
+    def load_snapshot(self, snapshot: Optional[Dict]) -> int:
+        """
+        从快照恢复游戏，开始时间和过期时间按当前时间重新计算，
+        插件停机期间不计入用时
+
+        Returns:
+            恢复的游戏数
+        """
+        if not snapshot or snapshot.get("v") != self.SNAPSHOT_VERSION:
+            return 0
+        now = _now_ms()
+        count = 0
+        for key, target, attempts, elapsed, max_number, remaining in snapshot.get(
+            "games", []
+        ):
+            if key in self.games or remaining <= 0:
+                continue
+            self.games[key] = {
+                "target_number": target,
+                "attempts": attempts,
+                "start_time": now - elapsed,
+                "max_number": max_number,
+                "deadline": now + remaining,
+            }
+            count += 1
+        # 保持按过期时间排序，清理任务依赖这一顺序
+        for key in sorted(self.games, key=lambda k: self.games[k]["deadline"]):
+            self.games.move_to_end(key)
+        while len(self.games) > self.max_games:
+            self.games.popitem(last=False)
+        return count
+
+    async def restore(self) -> int:
+        """从存储恢复进行中的游戏"""
+        if self.storage is None:
+            return 0
+        try:
+            count = self.load_snapshot(await self.storage.load_blob(self.SNAPSHOT_NAME))
+        except Exception as e:
+            self.logger.error("恢复游戏失败", error=str(e))
+            return 0
+        self._changed = False
+        if count:
+            self.logger.info("已恢复进行中的游戏", count=count)
+        return count
+
+    async def checkpoint(self, force: bool = False) -> None:
+        """保存进行中的游戏（无变化时跳过）"""
+        if self.storage is None or not (self._changed or force):
+            return
+        self._changed = False
+        try:
+            await self.storage.save_blob(self.SNAPSHOT_NAME, self.dump_snapshot())
+        except Exception as e:
+            self._changed = True
+            self.logger.error("保存游戏失败", error=str(e))
+
+    async def _sweep_loop(self) -> None:
+        """后台定期清理过期游戏并保存检查点"""
+        elapsed = 0
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            count = self.sweep()
+            if count:
+                self.logger.info("已清理过期游戏", count=count, active=len(self.games))
+            elapsed += self.sweep_interval
+            if elapsed >= self.checkpoint_interval:
+                elapsed = 0
+                await self.checkpoint()
+
+    def start(self) -> None:
+        """启动后台清理任务"""
+        if self._sweep_task is None or self._sweep_task.done():
+            self._sweep_task = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self) -> None:
+        """停止后台清理任务并保存进行中的游戏"""
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+            try:
+                await self._sweep_task
+            except asyncio.CancelledError:
+                pass
+            self._sweep_task = None
+        await self.checkpoint(force=True)
+
     def update_game_attempts(self, game_key: str) -> None:
         """增加游戏尝试次数"""
         if game_key in self.games:
             self.games[game_key]["attempts"] += 1
+            self._changed = True
             self.logger.debug(
                 "游戏尝试次数更新",
                 game_key=game_key,
                 attempts=self.games[game_key]["attempts"],
             )
 
-    def calculate_game_score(self, game: Dict) -> tuple[int, int]:
-        """计算游戏得分"""
-        time_used = int(
-            (int(datetime.now().timestamp() * 1000) - game["start_time"]) / 1000
-        )
-        base_points = max(1, 10 - game["attempts"]) * 5
-        time_bonus = max(1, 60 - time_used) * 2
+    def calculate_game_score(
+        self,
+        game: Dict,
+        base_points: int = 5,
+        time_bonus_rate: float = 2.0,
+        attempt_penalty: int = 1,
+    ) -> tuple[int, int]:
+        """
+        计算游戏得分
+
+        Args:
+            game: 游戏状态
+            base_points: 每档尝试得分
+            time_bonus_rate: 每秒剩余时间的奖励积分
+            attempt_penalty: 每次尝试扣除的档数
+
+        Returns:
+            (尝试得分, 时间奖励)
+        """
+        time_used = int((_now_ms() - game["start_time"]) / 1000)
+        base_points = max(1, 10 - game["attempts"] * attempt_penalty) * base_points
+        time_bonus = int(max(1, 60 - time_used) * time_bonus_rate)
         self.logger.debug(
             "计算得分",
             base_points=base_points,
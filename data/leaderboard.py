@@ -0,0 +1,221 @@
+"""
+排行榜模块
+在内存中维护按分数排序的索引，随用户数据提交增量更新，并定期保存快照
+"""
+
+import asyncio
+import time
+from bisect import bisect_left, insort
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..utils.logger_manager import PluginLogger
+from .user_record import UserRecord
+
+# 榜单定义: 榜单ID -> (显示名称, 分数提取函数)
+BOARDS: Dict[str, Tuple[str, Callable[[UserRecord], int]]] = {
+    "points": ("积分榜", lambda user: user["points"]),
+    "games_won": ("胜场榜", lambda user: user["games_won"]),
+    "ssr_count": ("SSR 榜", lambda user: user["ssr_count"]),
+    "consecutive_days": ("连签榜", lambda user: user["consecutive_days"]),
+    "cow": ("牛牛等级榜", lambda user: user["cow"]["level"] if user["cow"] else 0),
+}
+
+
+class SortedIndex:
+    """
+    单个榜单的有序索引（分数降序，同分按用户键升序）
+
+    条目按顺序分段存放在若干长度不超过 2 * LOAD 的有序列表中，并记录每段的最大值：
+    更新为 O(log n + LOAD)，名次查询为 O(log n + n / LOAD)，
+    批量加载只排序一次，为 O(n log n)
+    """
+
+    LOAD = 1000
+
+    def __init__(self):
+        self._scores: Dict[str, int] = {}
+        self._buckets: List[List[Tuple[int, str]]] = []  # 每段为有序的 (-score, key)
+        self._maxes: List[Tuple[int, str]] = []  # 每段的最后一个条目
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._scores
+
+    def score(self, key: str) -> Optional[int]:
+        """获取用户分数"""
+        return self._scores.get(key)
+
+    def update(self, key: str, score: int) -> bool:
+        """更新用户分数，分数未变化时返回 False"""
+        old = self._scores.get(key)
+        if old == score:
+            return False
+        if old is not None:
+            self._delete((-old, key))
+        self._scores[key] = score
+        self._insert((-score, key))
+        return True
+
+    def remove(self, key: str) -> None:
+        """移除用户"""
+        old = self._scores.pop(key, None)
+        if old is not None:
+            self._delete((-old, key))
+
+    def bulk_load(self, entries: Iterable[Tuple[str, int]]) -> None:
+        """批量加载 (key, score)，已在榜上的用户保留当前分数"""
+        scores = self._scores
+        for key, score in entries:
+            if key not in scores:
+                scores[key] = score
+        order = sorted((-score, key) for key, score in scores.items())
+        self._buckets = [
+            order[start : start + self.LOAD]
+            for start in range(0, len(order), self.LOAD)
+        ]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+
+    def _insert(self, entry: Tuple[int, str]) -> None:
+        if not self._buckets:
+            self._buckets.append([entry])
+            self._maxes.append(entry)
+            return
+        pos = min(bisect_left(self._maxes, entry), len(self._maxes) - 1)
+        bucket = self._buckets[pos]
+        insort(bucket, entry)
+        self._maxes[pos] = bucket[-1]
+        # 段过长时对半拆分
+        if len(bucket) > 2 * self.LOAD:
+            half = bucket[self.LOAD :]
+            del bucket[self.LOAD :]
+            self._buckets.insert(pos + 1, half)
+            self._maxes[pos] = bucket[-1]
+            self._maxes.insert(pos + 1, half[-1])
+
+    def _delete(self, entry: Tuple[int, str]) -> None:
+        pos = bisect_left(self._maxes, entry)
+        bucket = self._buckets[pos]
+        del bucket[bisect_left(bucket, entry)]
+        if bucket:
+            self._maxes[pos] = bucket[-1]
+        else:
+            del self._buckets[pos]
+            del self._maxes[pos]
+
+    def rank(self, key: str) -> Optional[int]:
+        """获取用户名次（从 1 开始），不在榜上时返回 None"""
+        score = self._scores.get(key)
+        if score is None:
+            return None
+        entry = (-score, key)
+        pos = bisect_left(self._maxes, entry)
+        before = sum(len(bucket) for bucket in self._buckets[:pos])
+        return before + bisect_left(self._buckets[pos], entry) + 1
+
+    def top(self, n: int) -> List[Tuple[str, int]]:
+        """获取前 n 名 (key, score)"""
+        result: List[Tuple[str, int]] = []
+        for bucket in self._buckets:
+            for neg, key in bucket[: n - len(result)]:
+                result.append((key, -neg))
+            if len(result) >= n:
+                break
+        return result
+
+    def items(self) -> List[Tuple[str, int]]:
+        """导出全部 (key, score)"""
+        return [(key, -neg) for bucket in self._buckets for neg, key in bucket]
+
+
+class Leaderboard:
+    """排行榜管理器"""
+
+    SNAPSHOT_NAME = "leaderboard_snapshot"
+    SNAPSHOT_VERSION = 1
+    SNAPSHOT_INTERVAL = 300  # 快照最小保存间隔（秒）
+
+    def __init__(self, storage, logger: PluginLogger):
+        self.storage = storage
+        self.logger = logger
+        self.indexes: Dict[str, SortedIndex] = {
+            board: SortedIndex() for board in BOARDS
+        }
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._dirty = False
+        self._last_snapshot = time.monotonic()
+
+    def update(self, key: str, user: Dict[str, Any]) -> None:
+        """根据最新用户数据更新全部榜单"""
+        changed = False
+        for board, (_, extract) in BOARDS.items():
+            changed |= self.indexes[board].update(key, extract(user))
+        if changed:
+            self._dirty = True
+
+    async def ensure_loaded(self) -> None:
+        """首次使用时从存储重建索引（已有的增量数据比快照更新，优先保留）"""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if not self._loaded:
+                await self._rebuild()
+                self._loaded = True
+
+    async def _rebuild(self) -> None:
+        """从存储后端遍历或快照重建索引"""
+        started = time.perf_counter()
+        if self.storage.supports_scan:
+            entries: Dict[str, List[Tuple[str, int]]] = {board: [] for board in BOARDS}
+            for key, data in await self.storage.scan_users():
+                user, _ = UserRecord.decode(data)
+                for board, (_, extract) in BOARDS.items():
+                    entries[board].append((key, extract(user)))
+            for board, board_entries in entries.items():
+                self.indexes[board].bulk_load(board_entries)
+            source = "scan"
+        else:
+            snapshot = await self.storage.load_blob(self.SNAPSHOT_NAME)
+            if snapshot and snapshot.get("v") == self.SNAPSHOT_VERSION:
+                for board, board_entries in snapshot.get("boards", {}).items():
+                    index = self.indexes.get(board)
+                    if index is not None:
+                        index.bulk_load(board_entries)
+            source = "snapshot"
+        self.logger.info(
+            "排行榜索引已重建",
+            source=source,
+            users=len(self.indexes["points"]),
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+        )
+
+    async def save_snapshot(self, force: bool = False) -> None:
+        """保存快照（未到保存间隔或无变化时跳过）"""
+        # 支持遍历的后端在启动时直接重建，无需快照
+        if not self._dirty or self.storage.supports_scan:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_snapshot < self.SNAPSHOT_INTERVAL:
+            return
+        # 先合并旧快照，避免用部分数据覆盖完整快照
+        await self.ensure_loaded()
+        snapshot = {
+            "v": self.SNAPSHOT_VERSION,
+            "boards": {board: index.items() for board, index in self.indexes.items()},
+        }
+        await self.storage.save_blob(self.SNAPSHOT_NAME, snapshot)
+        self._dirty = False
+        self._last_snapshot = now
+
+    async def top(self, board: str, n: int = 10) -> List[Tuple[str, int]]:
+        """获取榜单前 n 名"""
+        await self.ensure_loaded()
+        return self.indexes[board].top(n)
+
+    async def rank(self, board: str, key: str) -> Tuple[Optional[int], int]:
+        """获取用户名次和榜单总人数"""
+        await self.ensure_loaded()
+        index = self.indexes[board]
+        return index.rank(key), len(index)
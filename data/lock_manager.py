@@ -0,0 +1,37 @@
+"""
+用户锁管理模块
+按用户键提供 asyncio 锁，串行化同一用户的读-改-写操作
+"""
+
+import asyncio
+import weakref
+
+
+class KeyedLockManager:
+    """按键分配的异步锁注册表"""
+
+    def __init__(self):
+        # 弱引用字典：没有协程持有或等待某个锁时，该锁会被自动回收
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = (
+            weakref.WeakValueDictionary()
+        )
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    def get(self, key: str) -> asyncio.Lock:
+        """
+        获取指定键的锁
+
+        调用方必须在使用期间持有返回的锁对象引用，否则锁可能被回收
+        """
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[key] = lock
+        return lock
+
+    def locked(self, key: str) -> bool:
+        """指定键的锁当前是否被持有"""
+        lock = self._locks.get(key)
+        return lock is not None and lock.locked()
@@ -0,0 +1,152 @@
+"""
+命令频率限制模块
+在内存中为每个用户维护令牌桶（冷却时间）和每日计数器，计数器以快照形式延迟持久化
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+# 拒绝原因
+DAILY_LIMIT = "daily_limit"
+COOLDOWN = "cooldown"
+
+
+class _LimitState:
+    """单个用户的限流状态"""
+
+    __slots__ = ("day", "count", "tokens", "stamp")
+
+    def __init__(self, day: int, count: int, tokens: float, stamp: int):
+        self.day = day  # 计数器所属日序号
+        self.count = count  # 当日已使用次数
+        self.tokens = tokens  # 令牌桶剩余令牌
+        self.stamp = stamp  # 令牌桶上次结算时间（毫秒）
+
+
+class RateLimiter:
+    """令牌桶 + 每日计数器限流器"""
+
+    SNAPSHOT_NAME = "rate_limits"
+    SNAPSHOT_VERSION = 2  # 2: 日期改为日序号
+
+    def __init__(self, daily_limit: int = 50, cooldown: float = 5, burst: int = 1):
+        """
+        初始化限流器
+
+        Args:
+            daily_limit: 每日命令次数上限，小于等于 0 表示不限制
+            cooldown: 每恢复一个令牌所需的秒数，小于等于 0 表示不限制频率
+            burst: 令牌桶容量，即冷却完成后允许连续执行的命令数
+        """
+        self.configure(daily_limit, cooldown, burst)
+        self._states: Dict[str, _LimitState] = {}
+        self.dirty = False  # 是否有尚未保存到快照的变化
+
+    def configure(self, daily_limit: int, cooldown: float, burst: int) -> None:
+        """更新限流参数，已有用户的计数和令牌保留"""
+        self.daily_limit = daily_limit
+        self.cooldown_ms = int(cooldown * 1000)
+        self.burst = max(1, burst)
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._states
+
+    @staticmethod
+    def _now_ms() -> int:
+        return int(time.time() * 1000)
+
+    def _refill(self, state: _LimitState, now: int) -> None:
+        """按流逝时间补充令牌"""
+        if self.cooldown_ms <= 0:
+            state.tokens = self.burst
+        elif now > state.stamp:
+            state.tokens = min(
+                self.burst, state.tokens + (now - state.stamp) / self.cooldown_ms
+            )
+        state.stamp = now
+
+    def acquire(self, key: str, day: int) -> Tuple[Optional[str], int]:
+        """
+        尝试为一次命令消耗额度
+
+        Args:
+            key: 用户键
+            day: 今天的日序号
+
+        Returns:
+            (拒绝原因, 需要等待的毫秒数)，允许执行时拒绝原因为 None
+        """
+        now = self._now_ms()
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = _LimitState(day, 0, self.burst, now)
+        if state.day != day:
+            state.day = day
+            state.count = 0
+
+        if self.daily_limit > 0 and state.count >= self.daily_limit:
+            return DAILY_LIMIT, 0
+
+        self._refill(state, now)
+        if state.tokens < 1:
+            return COOLDOWN, int((1 - state.tokens) * self.cooldown_ms)
+
+        state.tokens -= 1
+        state.count += 1
+        self.dirty = True
+        return None, 0
+
+    def used(self, key: str, day: int) -> int:
+        """获取用户当日已使用次数"""
+        state = self._states.get(key)
+        return state.count if state is not None and state.day == day else 0
+
+    def refund(self, key: str, count: int) -> None:
+        """返还每日次数（如使用提神咖啡）"""
+        state = self._states.get(key)
+        if state is not None:
+            state.count = max(0, state.count - count)
+            self.dirty = True
+
+    def prune(self, day: int) -> int:
+        """移除已无限制作用的状态（非今日且令牌已满），返回移除数量"""
+        now = self._now_ms()
+        stale = []
+        for key, state in self._states.items():
+            if state.day == day and state.count:
+                continue
+            self._refill(state, now)
+            if state.tokens >= self.burst:
+                stale.append(key)
+        for key in stale:
+            del self._states[key]
+        if stale:
+            self.dirty = True
+        return len(stale)
+
+    def dump_snapshot(self, day: int) -> Dict:
+        """导出当日仍有计数或冷却中的用户状态"""
+        entries: List[list] = []
+        for key, state in self._states.items():
+            if state.day == day or state.tokens < self.burst:
+                count = state.count if state.day == day else 0
+                entries.append([key, count, round(state.tokens, 3), state.stamp])
+        return {"v": self.SNAPSHOT_VERSION, "day": day, "entries": entries}
+
+    def load_snapshot(self, snapshot: Optional[Dict], day: int) -> int:
+        """从快照恢复状态（已在内存中的用户优先），返回恢复数量"""
+        if not snapshot or snapshot.get("v") != self.SNAPSHOT_VERSION:
+            return 0
+        same_day = snapshot.get("day") == day
+        restored = 0
+        for key, count, tokens, stamp in snapshot.get("entries", []):
+            if key in self._states:
+                continue
+            state = _LimitState(day, count if same_day else 0, tokens, stamp)
+            self._refill(state, max(stamp, self._now_ms()))
+            self._states[key] = state
+            restored += 1
+        return restored
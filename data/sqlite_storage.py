@@ -0,0 +1,149 @@
+"""
+SQLite 存储后端
+常用字段独立成列，其余字段存放在 JSON 列中；所有数据库操作在单独的线程中串行执行
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .storage import StorageBackend
+
+# 独立成列的常用字段: (字段名, 列类型, 默认值)
+HOT_FIELDS = (
+    ("id", "TEXT", ""),
+    ("platform", "TEXT", ""),
+    ("points", "INTEGER", 0),
+    ("consecutive_days", "INTEGER", 0),
+    ("total_sign_days", "INTEGER", 0),
+    ("games_played", "INTEGER", 0),
+    ("games_won", "INTEGER", 0),
+    ("ssr_count", "INTEGER", 0),
+    ("total_spent", "INTEGER", 0),
+)
+_HOT_NAMES = tuple(name for name, _, _ in HOT_FIELDS)
+
+_CREATE_USERS = (
+    "CREATE TABLE IF NOT EXISTS users (key TEXT PRIMARY KEY, "
+    + ", ".join(f"{name} {sql_type}" for name, sql_type, _ in HOT_FIELDS)
+    + ", extra TEXT NOT NULL)"
+)
+_CREATE_BLOBS = "CREATE TABLE IF NOT EXISTS blobs (name TEXT PRIMARY KEY, value TEXT)"
+_SELECT_USER = f"SELECT {', '.join(_HOT_NAMES)}, extra FROM users WHERE key = ?"
+_SELECT_ALL_USERS = f"SELECT key, {', '.join(_HOT_NAMES)}, extra FROM users"
+_UPSERT_USER = (
+    f"INSERT OR REPLACE INTO users (key, {', '.join(_HOT_NAMES)}, extra) "
+    f"VALUES ({', '.join('?' * (len(_HOT_NAMES) + 2))})"
+)
+_SELECT_BLOB = "SELECT value FROM blobs WHERE name = ?"
+_UPSERT_BLOB = "INSERT OR REPLACE INTO blobs (name, value) VALUES (?, ?)"
+
+
+class SQLiteStorage(StorageBackend):
+    """SQLite 存储后端（WAL 模式）"""
+
+    DEFAULT_PATH = os.path.join(
+        "data", "plugin_data", "astrbot_plugin_interactive", "interactive.db"
+    )
+    supports_scan = True
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        """
+        初始化 SQLite 存储
+
+        Args:
+            path: 数据库文件路径，":memory:" 表示内存数据库
+        """
+        self.path = path
+        # sqlite3 连接不是线程安全的，使用单线程执行器串行化全部操作
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开连接并初始化表结构（在执行器线程中调用）"""
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, check_same_thread=False, cached_statements=64
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_CREATE_USERS)
+            conn.execute(_CREATE_BLOBS)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    async def _run(self, func, *args):
+        """在数据库线程中执行操作"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    @staticmethod
+    def _encode(key: str, data: Dict[str, Any]) -> tuple:
+        """将用户记录拆分为列值"""
+        extra = {k: v for k, v in data.items() if k not in _HOT_NAMES}
+        hot = tuple(data.get(name, default) for name, _, default in HOT_FIELDS)
+        return (key, *hot, json.dumps(extra, ensure_ascii=False, separators=(",", ":")))
+
+    @staticmethod
+    def _decode(row: tuple) -> Dict[str, Any]:
+        """将列值还原为用户记录"""
+        data = dict(zip(_HOT_NAMES, row[:-1]))
+        data.update(json.loads(row[-1]))
+        return data
+
+    def _load_user_sync(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute(_SELECT_USER, (key,)).fetchone()
+        return self._decode(row) if row else None
+
+    def _save_users_sync(self, rows: List[tuple]) -> None:
+        conn = self._connect()
+        with conn:
+            conn.executemany(_UPSERT_USER, rows)
+
+    def _scan_users_sync(self) -> List[Tuple[str, Dict[str, Any]]]:
+        rows = self._connect().execute(_SELECT_ALL_USERS).fetchall()
+        return [(row[0], self._decode(row[1:])) for row in rows]
+
+    def _load_blob_sync(self, name: str) -> Any:
+        row = self._connect().execute(_SELECT_BLOB, (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _save_blob_sync(self, name: str, value: str) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute(_UPSERT_BLOB, (name, value))
+
+    def _close_sync(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def load_user(self, key: str) -> Optional[Dict[str, Any]]:
+        return await self._run(self._load_user_sync, key)
+
+    async def save_users(self, entries: List[Tuple[str, Dict[str, Any]]]) -> None:
+        if not entries:
+            return
+        # 在事件循环线程中完成序列化，避免与后续修改产生竞争
+        rows = [self._encode(key, data) for key, data in entries]
+        await self._run(self._save_users_sync, rows)
+
+    async def scan_users(self) -> List[Tuple[str, Dict[str, Any]]]:
+        return await self._run(self._scan_users_sync)
+
+    async def load_blob(self, name: str) -> Any:
+        return await self._run(self._load_blob_sync, name)
+
+    async def save_blob(self, name: str, value: Any) -> None:
+        encoded = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        await self._run(self._save_blob_sync, name, encoded)
+
+    async def close(self) -> None:
+        await self._run(self._close_sync)
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,78 @@
+"""
+存储后端模块
+定义 UserManager 使用的存储接口，并提供基于宿主 KV 接口的默认实现
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class StorageBackend:
+    """存储后端接口"""
+
+    # 是否支持遍历全部用户（跨用户查询、排行榜重建等依赖此能力）
+    supports_scan = False
+
+    async def load_user(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取用户记录，不存在时返回 None"""
+        raise NotImplementedError
+
+    async def save_users(self, entries: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """批量写入用户记录"""
+        raise NotImplementedError
+
+    async def load_blob(self, name: str) -> Any:
+        """读取插件级数据（如快照），不存在时返回 None"""
+        raise NotImplementedError
+
+    async def save_blob(self, name: str, value: Any) -> None:
+        """写入插件级数据"""
+        raise NotImplementedError
+
+    async def scan_users(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """遍历全部用户记录（仅 supports_scan 为 True 时可用）"""
+        raise NotImplementedError(f"{type(self).__name__} 不支持遍历用户")
+
+    async def close(self) -> None:
+        """释放资源"""
+
+
+class KVStorage(StorageBackend):
+    """基于宿主 get_kv_data/put_kv_data 的存储后端"""
+
+    def __init__(self, star_instance):
+        self.star = star_instance
+
+    async def load_user(self, key: str) -> Optional[Dict[str, Any]]:
+        return await self.star.get_kv_data(key, None)
+
+    async def save_users(self, entries: List[Tuple[str, Dict[str, Any]]]) -> None:
+        for key, data in entries:
+            await self.star.put_kv_data(key, data)
+
+    async def load_blob(self, name: str) -> Any:
+        return await self.star.get_kv_data(name, None)
+
+    async def save_blob(self, name: str, value: Any) -> None:
+        await self.star.put_kv_data(name, value)
+
+
+def create_storage(star_instance, config: Optional[Dict[str, Any]]) -> StorageBackend:
+    """
+    根据配置创建存储后端
+
+    Args:
+        star_instance: 插件实例（KV 后端使用）
+        config: storage 配置节
+
+    Returns:
+        存储后端实例
+    """
+    config = config or {}
+    backend = config.get("backend", "kv")
+    if backend == "sqlite":
+        from .sqlite_storage import SQLiteStorage
+
+        return SQLiteStorage(config.get("sqlite_path") or SQLiteStorage.DEFAULT_PATH)
+    if backend != "kv":
+        raise ValueError(f"未知的存储后端: {backend}")
+    return KVStorage(star_instance)
@@ -0,0 +1,134 @@
+"""
+用户数据缓存模块
+提供带脏标记的 LRU 写回缓存，合并对宿主 KV 存储的写入
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class _CacheEntry:
+    """缓存条目"""
+
+    __slots__ = ("data", "dirty_since")
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        self.dirty_since: Optional[float] = None  # 首次变脏的时间（monotonic 秒）
+
+
+class UserCache:
+    """用户数据 LRU 写回缓存"""
+
+    def __init__(self, max_size: int = 1024):
+        """
+        初始化缓存
+
+        Args:
+            max_size: 最多缓存的用户记录数
+        """
+        self.max_size = max(1, max_size)
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """获取缓存的用户数据，命中时刷新 LRU 顺序"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry.data
+
+    def put(
+        self, key: str, data: Dict[str, Any], dirty: bool = False
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        写入缓存
+
+        Args:
+            key: 用户键
+            data: 用户数据
+            dirty: 是否标记为待写回
+
+        Returns:
+            因容量不足被淘汰、且仍需写回的 (key, data) 列表
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = _CacheEntry(data)
+            self._entries[key] = entry
+        else:
+            entry.data = data
+            self._entries.move_to_end(key)
+        if dirty and entry.dirty_since is None:
+            entry.dirty_since = time.monotonic()
+        return self._evict()
+
+    def dirty_age(self, key: str) -> Optional[float]:
+        """获取条目处于脏状态的时长（秒），非脏条目返回 None"""
+        entry = self._entries.get(key)
+        if entry is None or entry.dirty_since is None:
+            return None
+        return time.monotonic() - entry.dirty_since
+
+    def take_dirty(
+        self, min_age: float = 0.0, keys: Optional[List[str]] = None
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        取出需要写回的条目并清除脏标记
+
+        Args:
+            min_age: 只取出脏状态持续超过该时长（秒）的条目
+            keys: 只检查这些键，None 表示检查全部
+
+        Returns:
+            (key, data) 列表
+        """
+        now = time.monotonic()
+        result = []
+        for key in keys if keys is not None else list(self._entries):
+            entry = self._entries.get(key)
+            if entry is None or entry.dirty_since is None:
+                continue
+            if now - entry.dirty_since >= min_age:
+                entry.dirty_since = None
+                result.append((key, entry.data))
+        return result
+
+    def mark_dirty(self, key: str) -> None:
+        """重新标记为脏（写回失败时使用）"""
+        entry = self._entries.get(key)
+        if entry is not None and entry.dirty_since is None:
+            entry.dirty_since = time.monotonic()
+
+    def discard(self, key: str) -> None:
+        """丢弃缓存条目（不写回）"""
+        self._entries.pop(key, None)
+
+    def dirty_count(self) -> int:
+        """待写回的条目数"""
+        return sum(1 for e in self._entries.values() if e.dirty_since is not None)
+
+    def hit_ratio(self) -> float:
+        """缓存命中率"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _evict(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """按 LRU 顺序淘汰超出容量的条目"""
+        evicted = []
+        while len(self._entries) > self.max_size:
+            key, entry = self._entries.popitem(last=False)
+            if entry.dirty_since is not None:
+                evicted.append((key, entry.data))
+        return evicted
@@ -1,14 +1,26 @@
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+import asyncio
+import json
+from typing import Dict, Any, List, Optional, Tuple
 
 from ..utils.logger_manager import PluginLogger, UserActionLogger
+from ..utils.metrics import MetricsRegistry
+from ..utils.day_clock import DayClock
+from ..config.runtime import RuntimeConfig
+from .user_cache import UserCache
+from .user_record import UserRecord
+from .user_session import UserSession
+from .lock_manager import KeyedLockManager
+from .storage import KVStorage, StorageBackend
+from .leaderboard import Leaderboard
+from .rate_limiter import DAILY_LIMIT, RateLimiter
 
 
 class UserManager:
     """用户数据管理器"""
 
-    def __init__(self, star_instance):
+    def __init__(self, star_instance, storage: Optional[StorageBackend] = None):
         self.star = star_instance
+        self.storage = storage if storage is not None else KVStorage(star_instance)
         self.logger = (
             star_instance.logger
             if hasattr(star_instance, "logger")
@@ -19,87 +31,247 @@ class UserManager:
             if hasattr(star_instance, "action_logger")
             else UserActionLogger(self.logger)
         )
+        self.metrics = (
+            star_instance.metrics
+            if hasattr(star_instance, "metrics")
+            else MetricsRegistry(enabled=False)
+        )
+        self.day_clock = (
+            star_instance.day_clock
+            if hasattr(star_instance, "day_clock")
+            else DayClock()
+        )
+        runtime = (
+            star_instance.runtime
+            if hasattr(star_instance, "runtime")
+            else RuntimeConfig.from_dict({})
+        )
+
+        # 写回缓存配置
+        storage_config = runtime.storage
+        self.flush_interval = self._positive(storage_config.flush_interval, 10)
+        self.max_dirty_age = self._positive(storage_config.max_dirty_age, 30)
+        self.cache = UserCache(self._positive(storage_config.cache_size, 1024))
+        self._flush_task: Optional[asyncio.Task] = None
+
+        # 按用户串行化读-改-写
+        self.locks = KeyedLockManager()
+
+        # 排行榜索引，随用户数据提交增量更新
+        self.leaderboard = Leaderboard(self.storage, self.logger)
+
+        # 命令限流，计数器只在内存中更新，定期保存快照
+        self.rate_limiter = RateLimiter()
+        self.configure(runtime)
+        self._register_metrics()
+
+    def _register_metrics(self) -> None:
+        """注册存储读写与缓存相关指标"""
+        metrics = self.metrics
+        self._reads = metrics.counter("storage_reads_total", "用户数据读取次数")
+        self._read_bytes = metrics.counter(
+            "storage_read_bytes_total", "用户数据读取字节数（JSON 编码后）"
+        )
+        self._writes = metrics.counter("storage_writes_total", "用户数据写回条数")
+        self._written_bytes = metrics.counter(
+            "storage_written_bytes_total", "用户数据写回字节数（JSON 编码后）"
+        )
+        metrics.gauge("cache_hits", "用户缓存命中次数", lambda: self.cache.hits)
+        metrics.gauge("cache_misses", "用户缓存未命中次数", lambda: self.cache.misses)
+        metrics.gauge("cache_hit_ratio", "用户缓存命中率", self.cache.hit_ratio)
+        metrics.gauge("cache_entries", "缓存的用户记录数", lambda: len(self.cache))
+        metrics.gauge(
+            "cache_dirty_entries", "待写回的用户记录数", self.cache.dirty_count
+        )
+
+    @staticmethod
+    def _encoded_size(data: Any) -> int:
+        """用户数据 JSON 编码后的字节数"""
+        return len(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode())
+
+    @staticmethod
+    def _positive(value, default):
+        """配置值不为正数时使用默认值"""
+        return value if value > 0 else default
+
+    def configure(self, runtime: RuntimeConfig) -> None:
+        """
+        应用运行时配置中可热更新的部分（新用户积分、每日免费转盘次数和命令限流参数）
+
+        Args:
+            runtime: 配置快照
+        """
+        points = runtime.points
+        self.initial_points = points.initial_points
+        self.daily_free_spins = runtime.spin.daily_free
+        self.rate_limiter.configure(
+            daily_limit=points.daily_command_limit,
+            cooldown=max(0, points.command_cooldown),
+            burst=points.command_burst,
+        )
 
     def _get_user_key(self, user_id: str, platform: str) -> str:
         """生成用户数据存储的键"""
         return f"{platform}:{user_id}"
 
-    def _get_today(self) -> str:
-        """获取今天的日期字符串"""
-        now = datetime.now()
-        return f"{now.year}-{now.month}-{now.day}"
+    def _get_today(self) -> int:
+        """获取今天的日序号"""
+        return self.day_clock.today()
 
-    async def get_user_data(self, user_id: str, platform: str) -> Dict[str, Any]:
-        """获取用户数据"""
+    def rollover(self, user: UserRecord) -> None:
+        """
+        按天惰性重置用户的每日字段（每个用户每天只执行一次）
+
+        重置结果只由日期决定，不标记为脏：当天有其他修改时随之写回，
+        否则下次读取时会得到相同的结果
+        """
+        today = self.day_clock.today()
+        if user["day"] == today:
+            return
+        user["day"] = today
+        user["free_spin_count"] = self.daily_free_spins
+        user["paid_spin_count"] = 0
+
+    async def get_user_data(self, user_id: str, platform: str) -> UserRecord:
+        """获取用户数据（优先从缓存读取，旧版记录在此迁移）"""
         key = self._get_user_key(user_id, platform)
-        data = await self.star.get_kv_data(key, None)
+        data = self.cache.get(key)
+        if data is not None:
+            return data
+
+        data = await self.storage.load_user(key)
+        is_new = data is None
+        if self.metrics.enabled:
+            self._reads.inc()
+            if data is not None:
+                self._read_bytes.inc(self._encoded_size(data))
 
         if data is None:
             # 新用户初始化
             self.logger.info("创建新用户", user_id=user_id, platform=platform)
-            data = {
-                "id": user_id,
-                "platform": platform,
-                "points": 100,
-                "last_sign": "",
-                "consecutive_days": 0,
-                "total_sign_days": 0,
-                "games_played": 0,
-                "games_won": 0,
-                "achievements": [],
-                "has_double_card": False,
-                "free_lottery_count": 0,
-                "free_spin_count": 1,  # 每日免费转盘次数
-                "hint_tokens": 0,
-                "lucky_charm_count": 0,
-                "last_command_time": 0,
-                "daily_command_count": 0,
-                "last_command_date": self._get_today(),
-                "total_spent": 0,
-                "ssr_count": 0,
-                "inventory": [],
-            }
-            await self.star.put_kv_data(key, data)
-
-        return data
+            user = UserRecord(
+                id=user_id,
+                platform=platform,
+                points=self.initial_points,
+                day=self._get_today(),
+                free_spin_count=self.daily_free_spins,
+            )
+            migrated = False
+        else:
+            user, migrated = UserRecord.decode(data)
+            if migrated:
+                # 迁移后的记录会写回，同时补登排行榜（旧快照中可能没有该用户）
+                self.leaderboard.update(key, user)
+                self.logger.debug("用户数据已迁移", user_id=user_id, platform=platform)
+
+        # 新用户和迁移过的旧记录只标记为脏，由后台任务统一写回
+        await self._write_back(self.cache.put(key, user, dirty=is_new or migrated))
+        return user
 
     async def update_user_data(
-        self, user_id: str, platform: str, data: Dict[str, Any]
+        self, user_id: str, platform: str, data: UserRecord
     ) -> None:
-        """更新用户数据"""
+        """更新用户数据（写入缓存并标记为脏，超过最大脏数据时长时立即写回）"""
         key = self._get_user_key(user_id, platform)
-        await self.star.put_kv_data(key, data)
+        self.leaderboard.update(key, data)
+        evicted = self.cache.put(key, data, dirty=True)
+        age = self.cache.dirty_age(key)
+        if age is not None and age >= self.max_dirty_age:
+            evicted += self.cache.take_dirty(keys=[key])
+        await self._write_back(evicted)
 
-    async def check_command_limits(self, user_id: str, platform: str, event) -> bool:
-        """检查冷却时间和每日限制"""
-        from astrbot.api.event import MessageEventResult
+    async def _write_back(self, entries: List[Tuple[str, UserRecord]]) -> None:
+        """将数据编码后批量写回存储后端，失败的条目重新标记为脏"""
+        if not entries:
+            return
+        encoded = [(key, user.encode()) for key, user in entries]
+        try:
+            await self.storage.save_users(encoded)
+            if self.metrics.enabled:
+                self._writes.inc(len(encoded))
+                self._written_bytes.inc(
+                    sum(self._encoded_size(data) for _, data in encoded)
+                )
+        except Exception as e:
+            self.logger.error("用户数据写回失败", count=len(entries), error=str(e))
+            for key, _ in entries:
+                if key in self.cache:
+                    self.cache.mark_dirty(key)
 
-        user = await self.get_user_data(user_id, platform)
-        now = int(datetime.now().timestamp() * 1000)
-        today = self._get_today()
+    async def flush(self, force: bool = False) -> int:
+        """
+        写回缓存中的脏数据
+
+        Args:
+            force: 为 True 时写回全部脏数据，否则只写回超过最大脏数据时长的条目
+
+        Returns:
+            写回的条目数
+        """
+        entries = self.cache.take_dirty(0 if force else self.max_dirty_age)
+        await self._write_back(entries)
+        if entries:
+            self.logger.debug("缓存写回完成", count=len(entries), force=force)
+        return len(entries)
+
+    async def _flush_loop(self) -> None:
+        """后台定期写回任务"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+                await self.leaderboard.save_snapshot()
+                await self.save_rate_limits()
+            except Exception as e:
+                self.logger.error("定期写回失败", error=str(e))
 
-        # 重置每日计数器
-        if user["last_command_date"] != today:
-            user["daily_command_count"] = 0
-            user["last_command_date"] = today
+    def start(self) -> None:
+        """启动后台写回任务"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
 
-        # 检查每日限制 (默认50次)
-        daily_limit = 50
-        if user["daily_command_count"] >= daily_limit:
+    async def stop(self) -> None:
+        """停止后台写回任务并强制写回全部脏数据"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        count = await self.flush(force=True)
+        await self.leaderboard.save_snapshot(force=True)
+        await self.save_rate_limits()
+        self.logger.info("用户缓存已写回", count=count)
+
+    async def close(self) -> None:
+        """关闭存储后端"""
+        await self.storage.close()
+
+    def session(self, user_id: str, platform: str) -> UserSession:
+        """创建请求级用户会话（需配合 async with 使用以获取用户锁）"""
+        return UserSession(self, user_id, platform)
+
+    async def check_command_limits(self, session: UserSession, event) -> bool:
+        """检查冷却时间和每日限制（计数只在限流器中，无需读取用户数据）"""
+        from astrbot.api.event import MessageEventResult
+
+        reason, wait_ms = self.rate_limiter.acquire(session.key, self._get_today())
+        if reason is None:
+            return True
+
+        user_id, platform = session.user_id, session.platform
+        if reason == DAILY_LIMIT:
             self.logger.debug(
                 "今日使用次数已达上限", user_id=user_id, platform=platform
             )
             event.set_result(
                 MessageEventResult().message(
-                    f"今日使用次数已达上限（{daily_limit}次），请明天再来吧！"
+                    f"今日使用次数已达上限（{self.rate_limiter.daily_limit}次），请明天再来吧！"
                 )
             )
-            return False
-
-        # 检查冷却时间 (默认5000ms)
-        cool_down = 5000
-        if now - user["last_command_time"] < cool_down:
-            remaining = (cool_down - (now - user["last_command_time"])) // 1000 + 1
+        else:
+            remaining = wait_ms // 1000 + 1
             self.logger.debug(
                 "操作过于频繁",
                 user_id=user_id,
@@ -109,153 +281,74 @@ class UserManager:
             event.set_result(
                 MessageEventResult().message(f"操作太频繁啦，请 {remaining} 秒后再试~")
             )
-            return False
+        return False
 
-        # 更新计数器
-        user["daily_command_count"] += 1
-        user["last_command_time"] = now
-        await self.update_user_data(user_id, platform, user)
-        return True
+    def commands_used_today(self, user_id: str, platform: str) -> int:
+        """获取用户今日已使用的命令次数"""
+        key = self._get_user_key(user_id, platform)
+        return self.rate_limiter.used(key, self._get_today())
+
+    def refund_commands(self, user_id: str, platform: str, count: int) -> None:
+        """返还用户今日的命令次数"""
+        self.rate_limiter.refund(self._get_user_key(user_id, platform), count)
+
+    async def restore(self) -> None:
+        """从快照恢复限流计数器"""
+        try:
+            snapshot = await self.storage.load_blob(RateLimiter.SNAPSHOT_NAME)
+        except Exception as e:
+            self.logger.error("限流快照读取失败", error=str(e))
+            return
+        restored = self.rate_limiter.load_snapshot(snapshot, self._get_today())
+        if restored:
+            self.logger.info("已恢复限流计数器", count=restored)
+
+    async def save_rate_limits(self) -> None:
+        """计数器有变化时保存限流快照"""
+        today = self._get_today()
+        self.rate_limiter.prune(today)
+        if not self.rate_limiter.dirty:
+            return
+        snapshot = self.rate_limiter.dump_snapshot(today)
+        self.rate_limiter.dirty = False
+        try:
+            await self.storage.save_blob(RateLimiter.SNAPSHOT_NAME, snapshot)
+        except Exception as e:
+            self.rate_limiter.dirty = True
+            self.logger.error("限流快照保存失败", error=str(e))
 
     async def add_points(self, user_id: str, platform: str, points: int) -> None:
         """增加积分"""
-        if points <= 0:
-            self.logger.warning("尝试增加非正积分", points=points)
-            return
-        user = await self.get_user_data(user_id, platform)
-        user["points"] += points
-        await self.update_user_data(user_id, platform, user)
-        self.action_logger.log_transaction(
-            user_id, platform, "earn", points, user["points"], reason="game_reward"
-        )
-        self.logger.debug(
-            "积分增加",
-            user_id=user_id,
-            platform=platform,
-            amount=points,
-            balance=user["points"],
-        )
+        async with self.session(user_id, platform) as session:
+            await session.load()
+            session.add_points(points)
 
     async def consume_points(self, user_id: str, platform: str, points: int) -> bool:
         """消耗积分"""
-        if points <= 0:
-            self.logger.warning("尝试消耗非正积分", points=points)
-            return False
-        user = await self.get_user_data(user_id, platform)
-        if user["points"] < points:
-            self.logger.debug(
-                "积分不足",
-                user_id=user_id,
-                platform=platform,
-                required=points,
-                current=user["points"],
-            )
-            return False
-        user["points"] -= points
-        # 确保积分不会变成负数
-        if user["points"] < 0:
-            user["points"] = 0
-            self.logger.warning("积分修正为0", user_id=user_id, platform=platform)
-        await self.update_user_data(user_id, platform, user)
-        self.action_logger.log_transaction(
-            user_id, platform, "spend", points, user["points"], reason="game_cost"
-        )
-        self.logger.debug(
-            "积分消耗",
-            user_id=user_id,
-            platform=platform,
-            amount=points,
-            balance=user["points"],
-        )
-        return True
+        async with self.session(user_id, platform) as session:
+            await session.load()
+            return session.consume_points(points)
 
     async def add_item_to_inventory(
-        self, user_id: str, platform: str, item: Dict[str, Any]
+        self, user_id: str, platform: str, item_id: str
     ) -> None:
         """添加物品到物品栏"""
-        user = await self.get_user_data(user_id, platform)
-        existing_item = next(
-            (i for i in user["inventory"] if i["id"] == item["id"]), None
-        )
-
-        if existing_item:
-            existing_item["count"] += 1
-            # 限制物品数量上限，防止溢出
-            if existing_item["count"] > 999:
-                existing_item["count"] = 999
-                self.logger.warning(
-                    "物品数量已达上限",
-                    user_id=user_id,
-                    platform=platform,
-                    item=item["name"],
-                )
-            self.logger.debug(
-                "物品数量增加",
-                user_id=user_id,
-                platform=platform,
-                item=item["name"],
-                count=existing_item["count"],
-            )
-        else:
-            user["inventory"].append(
-                {
-                    "id": item["id"],
-                    "name": item["name"],
-                    "description": item["description"],
-                    "count": 1,
-                }
-            )
-            self.logger.info(
-                "获得新物品", user_id=user_id, platform=platform, item=item["name"]
-            )
-        await self.update_user_data(user_id, platform, user)
+        async with self.session(user_id, platform) as session:
+            await session.load()
+            session.add_item(item_id)
 
     async def remove_item_from_inventory(
         self, user_id: str, platform: str, item_id: str
     ) -> bool:
         """从物品栏移除物品"""
-        user = await self.get_user_data(user_id, platform)
-        for i, item in enumerate(user["inventory"]):
-            if item["id"] == item_id:
-                if item["count"] > 1:
-                    item["count"] -= 1
-                    # 确保数量不会变成负数
-                    if item["count"] < 0:
-                        item["count"] = 0
-                        self.logger.warning(
-                            "物品数量异常，修正为0",
-                            user_id=user_id,
-                            platform=platform,
-                            item=item["name"],
-                        )
-                    self.logger.debug(
-                        "物品数量减少",
-                        user_id=user_id,
-                        platform=platform,
-                        item=item["name"],
-                        count=item["count"],
-                    )
-                else:
-                    user["inventory"].pop(i)
-                    self.logger.debug(
-                        "物品已用完",
-                        user_id=user_id,
-                        platform=platform,
-                        item=item["name"],
-                    )
-                await self.update_user_data(user_id, platform, user)
-                return True
-        self.logger.debug(
-            "物品栏中未找到物品", user_id=user_id, platform=platform, item_id=item_id
-        )
-        return False
+        async with self.session(user_id, platform) as session:
+            await session.load()
+            return session.remove_item(item_id)
 
     async def get_inventory_item(
         self, user_id: str, platform: str, item_id: str
     ) -> Optional[Dict[str, Any]]:
         """获取物品栏中的物品"""
-        user = await self.get_user_data(user_id, platform)
-        for item in user["inventory"]:
-            if item["id"] == item_id or item["name"] == item_id:
-                return item
-        return None
+        async with self.session(user_id, platform) as session:
+            await session.load()
+            return session.get_item(item_id)
@@ -0,0 +1,214 @@
+"""
+用户记录模块
+用 __slots__ 定义字段固定的用户记录：旧版数据在读取时按结构版本一次性迁移，
+写回时省略等于默认值的字段
+"""
+
+from typing import Any, Callable, Dict, Iterator, Mapping, Tuple
+
+from ..config import ACHIEVEMENTS
+from ..utils.day_clock import DayClock
+from .activity_log import from_history, new_log
+
+# 当前结构版本，没有版本号的旧版字典视为版本 1
+SCHEMA_VERSION = 4
+
+
+# 字段定义: (字段名, 默认值)，可变类型的默认值为工厂函数
+FIELDS: Tuple[Tuple[str, Any], ...] = (
+    ("id", ""),
+    ("platform", ""),
+    ("points", 0),
+    ("day", 0),  # 每日字段所属的日序号
+    ("last_sign_day", 0),
+    ("consecutive_days", 0),
+    ("total_sign_days", 0),
+    ("games_played", 0),
+    ("games_won", 0),
+    ("achievement_bits", 0),  # 已解锁成就位图
+    ("has_double_card", False),
+    ("free_lottery_count", 0),
+    ("free_spin_count", 0),  # 每日免费转盘次数
+    ("paid_spin_count", 0),  # 当日已付费转盘次数
+    ("hint_tokens", 0),
+    ("lucky_charm_count", 0),
+    ("total_spent", 0),
+    ("ssr_count", 0),
+    ("inventory", dict),  # 物品ID -> 数量，物品信息见 ITEM_CATALOG
+    ("spin", new_log),  # 转盘活动记录，结果为奖品档位
+    ("lottery", new_log),  # 抽奖活动记录，结果为稀有度序号
+    ("guess", new_log),  # 猜数字活动记录，结果为猜中所用次数
+    ("cow", None),
+)
+_FIELD_NAMES = frozenset(name for name, _ in FIELDS)
+
+
+def _default(value: Any) -> Any:
+    return value() if callable(value) else value
+
+
+def _clone(value: Any) -> Any:
+    """复制记录中的 JSON 值（字段只包含字典、列表和不可变标量）"""
+    if isinstance(value, dict):
+        return {key: _clone(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_clone(item) for item in value]
+    return value
+
+
+# 编码时用于比较的默认值（只读）
+_ENCODE_DEFAULTS = tuple((name, _default(default)) for name, default in FIELDS)
+
+
+class UserRecord:
+    """
+    用户记录
+
+    支持按键读写（user["points"]），所有字段总是存在，处理函数无需再提供默认值
+    """
+
+    __slots__ = tuple(name for name, _ in FIELDS)
+
+    def __init__(self, **values: Any):
+        for name, default in FIELDS:
+            setattr(self, name, values[name] if name in values else _default(default))
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _FIELD_NAMES:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in _FIELD_NAMES:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in _FIELD_NAMES
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name, _ in FIELDS)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """按键读取字段，未知字段返回 default"""
+        return getattr(self, key) if key in _FIELD_NAMES else default
+
+    def snapshot(self) -> Tuple[Any, ...]:
+        """复制当前全部字段（嵌套的字典和列表一并复制），用于回滚"""
+        return tuple(_clone(getattr(self, name)) for name, _ in FIELDS)
+
+    def restore(self, snapshot: Tuple[Any, ...]) -> None:
+        """恢复到 snapshot() 时的状态（快照对象由记录接管，不可再次使用）"""
+        for (name, _), value in zip(FIELDS, snapshot):
+            setattr(self, name, value)
+
+    def encode(self) -> Dict[str, Any]:
+        """编码为存储格式（带版本号，省略等于默认值的字段）"""
+        data: Dict[str, Any] = {"v": SCHEMA_VERSION}
+        for name, default in _ENCODE_DEFAULTS:
+            value = getattr(self, name)
+            if value != default:
+                data[name] = value
+        return data
+
+    @classmethod
+    def decode(cls, data: Mapping[str, Any]) -> Tuple["UserRecord", bool]:
+        """
+        从存储格式解码，必要时先迁移到当前版本
+
+        Args:
+            data: 存储中读出的用户数据
+
+        Returns:
+            (用户记录, 是否进行了迁移)
+        """
+        version = data.get("v", 1)
+        migrated = version < SCHEMA_VERSION
+        if migrated:
+            data = dict(data)
+            while version < SCHEMA_VERSION:
+                data = _MIGRATIONS[version](data)
+                version += 1
+        return (
+            cls(**{name: data[name] for name in _FIELD_NAMES if name in data}),
+            migrated,
+        )
+
+
+_ACHIEVEMENT_BITS = {a["id"]: a["bit"] for a in ACHIEVEMENTS}
+
+# 已废弃的字段：命令计数改由限流器快照保存
+_DROPPED_V1 = ("last_command_time", "daily_command_count", "last_command_date")
+
+
+def _migrate_v1(data: Dict[str, Any]) -> Dict[str, Any]:
+    """版本 1 -> 2：合并旧版签到、成就和转盘字段，移除废弃字段"""
+    if "last_sign" in data:
+        # 旧版以未补零的日期字符串保存签到日期
+        data["last_sign_day"] = DayClock.day_of(data.pop("last_sign")) or 0
+
+    legacy = data.pop("achievements", None)
+    if legacy:
+        mask = data.get("achievement_bits", 0)
+        for achievement_id in legacy:
+            bit = _ACHIEVEMENT_BITS.get(achievement_id)
+            if bit is not None:
+                mask |= 1 << bit
+        data["achievement_bits"] = mask
+
+    spin = data.get("spin") or {}
+    history = []
+    for entry in spin.get("history", []):
+        day = DayClock.day_of(entry.get("day", entry.get("date")))
+        if day is not None:
+            history.append({"day": day, "tier": entry.get("tier")})
+    if "last_day" in spin:
+        last_day, streak = spin["last_day"], spin.get("streak_days", 0)
+    else:
+        # 由历史日期推算连续参与天数
+        days = {entry["day"] for entry in history}
+        last_day, streak = (max(days), 0) if days else (0, 0)
+        while last_day - streak in days:
+            streak += 1
+    data["spin"] = {
+        "total_spins": spin.get("total_spins", 0),
+        "history": history,
+        "last_day": last_day,
+        "streak_days": streak,
+    }
+
+    for name in _DROPPED_V1:
+        data.pop(name, None)
+    return data
+
+
+def _migrate_v2(data: Dict[str, Any]) -> Dict[str, Any]:
+    """版本 2 -> 3：转盘历史列表改为活动记录"""
+    spin = data.get("spin")
+    if spin:
+        data["spin"] = from_history(
+            spin["total_spins"],
+            ([entry["day"], entry["tier"]] for entry in spin["history"]),
+            last_day=spin["last_day"],
+            streak=spin["streak_days"],
+        )
+    return data
+
+
+def _migrate_v3(data: Dict[str, Any]) -> Dict[str, Any]:
+    """版本 3 -> 4：物品栏由物品列表改为 物品ID -> 数量"""
+    inventory: Dict[str, int] = {}
+    for item in data.get("inventory") or []:
+        count = inventory.get(item["id"], 0) + item.get("count", 1)
+        if count > 0:
+            inventory[item["id"]] = count
+    data["inventory"] = inventory
+    return data
+
+
+# 版本迁移: 起始版本 -> 迁移函数
+_MIGRATIONS: Dict[int, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    1: _migrate_v1,
+    2: _migrate_v2,
+    3: _migrate_v3,
+}
@@ -0,0 +1,240 @@
+"""
+用户会话模块
+为单条消息提供工作单元：用户数据只读取一次，所有修改在结束时统一提交一次。
+会话期间持有该用户的锁，同一用户的并发消息会依次处理；处理中途出错时
+用户数据恢复到加载时的状态，暂存的流水事件一并丢弃
+"""
+
+import asyncio
+from typing import Any, Dict, Optional, Tuple
+
+from ..config import item_info, resolve_item
+from ..utils.logger_manager import UserActionLogger
+from ..utils.transaction_journal import PendingJournal
+from .user_record import UserRecord
+
+# 单种物品的数量上限
+MAX_ITEM_COUNT = 999
+
+
+class UserSession:
+    """请求级用户会话"""
+
+    def __init__(self, user_manager, user_id: str, platform: str):
+        """
+        初始化用户会话
+
+        Args:
+            user_manager: 用户数据管理器
+            user_id: 用户ID
+            platform: 平台
+        """
+        self.user_manager = user_manager
+        self.user_id = user_id
+        self.platform = platform
+        self.key = f"{platform}:{user_id}"
+        self.logger = user_manager.logger
+        self.action_logger = user_manager.action_logger
+        # 流水事件暂存到提交时再写入
+        self._pending: Optional[PendingJournal] = None
+        if self.action_logger.journal is not None:
+            self._pending = PendingJournal(self.action_logger.journal)
+            self.action_logger = UserActionLogger(
+                self.action_logger.logger, journal=self._pending
+            )
+        self._user: Optional[UserRecord] = None
+        self._snapshot: Optional[Tuple[Any, ...]] = None
+        self._dirty = False
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def __aenter__(self) -> "UserSession":
+        # 持有锁对象的强引用，保证会话期间锁不会被回收
+        self._lock = self.user_manager.locks.get(self.key)
+        await self._lock.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                await self.commit()
+            else:
+                self.rollback()
+        finally:
+            self._lock.release()
+            self._lock = None
+
+    @property
+    def loaded(self) -> bool:
+        """用户数据是否已加载"""
+        return self._user is not None
+
+    @property
+    def dirty(self) -> bool:
+        """是否有未提交的修改"""
+        return self._dirty
+
+    @property
+    def user(self) -> UserRecord:
+        """已加载的用户数据"""
+        if self._user is None:
+            raise RuntimeError("用户数据尚未加载，请先调用 load()")
+        return self._user
+
+    async def load(self) -> UserRecord:
+        """加载用户数据（同一会话内只读取一次）"""
+        if self._user is None:
+            self._user = await self.user_manager.get_user_data(
+                self.user_id, self.platform
+            )
+            self.user_manager.rollover(self._user)
+            # 缓存中的记录会被原地修改，保存加载时的状态以便回滚
+            self._snapshot = self._user.snapshot()
+        return self._user
+
+    def mark_dirty(self) -> None:
+        """标记用户数据已修改，结束时需要提交"""
+        self._dirty = True
+
+    async def commit(self) -> None:
+        """提交修改（没有修改时不产生任何写入）"""
+        if self._user is None or not self._dirty:
+            return
+        await self.user_manager.update_user_data(
+            self.user_id, self.platform, self._user
+        )
+        self._dirty = False
+        self._snapshot = None
+        if self._pending is not None:
+            self._pending.flush()
+            # 流水积压时等待后台写入追上
+            await self._pending.wait_for_capacity()
+
+    def rollback(self) -> None:
+        """放弃未提交的修改（用户数据恢复到加载时的状态，丢弃暂存的流水）"""
+        if self._snapshot is not None:
+            self._user.restore(self._snapshot)
+            self._snapshot = None
+        if self._pending is not None:
+            self._pending.discard()
+        if self._dirty:
+            self.logger.warning("会话异常结束，修改未提交", key=self.key)
+        self._dirty = False
+
+    # ========== 数据操作 ==========
+    def add_points(self, points: int, reason: str = "game_reward") -> None:
+        """增加积分"""
+        if points <= 0:
+            self.logger.warning("尝试增加非正积分", points=points)
+            return
+        user = self.user
+        user["points"] += points
+        self.mark_dirty()
+        self.action_logger.log_transaction(
+            self.user_id, self.platform, "earn", points, user["points"], reason=reason
+        )
+        self.logger.debug(
+            "积分增加",
+            user_id=self.user_id,
+            platform=self.platform,
+            amount=points,
+            balance=user["points"],
+        )
+
+    def consume_points(self, points: int, reason: str = "game_cost") -> bool:
+        """消耗积分"""
+        if points <= 0:
+            self.logger.warning("尝试消耗非正积分", points=points)
+            return False
+        user = self.user
+        if user["points"] < points:
+            self.logger.debug(
+                "积分不足",
+                user_id=self.user_id,
+                platform=self.platform,
+                required=points,
+                current=user["points"],
+            )
+            return False
+        user["points"] -= points
+        # 确保积分不会变成负数
+        if user["points"] < 0:
+            user["points"] = 0
+            self.logger.warning(
+                "积分修正为0", user_id=self.user_id, platform=self.platform
+            )
+        self.mark_dirty()
+        self.action_logger.log_transaction(
+            self.user_id, self.platform, "spend", points, user["points"], reason=reason
+        )
+        self.logger.debug(
+            "积分消耗",
+            user_id=self.user_id,
+            platform=self.platform,
+            amount=points,
+            balance=user["points"],
+        )
+        return True
+
+    def add_item(self, item_id: str) -> None:
+        """添加物品到物品栏"""
+        inventory = self.user["inventory"]
+        name = item_info(item_id)["name"]
+        count = inventory.get(item_id, 0) + 1
+        # 限制物品数量上限，防止溢出
+        if count > MAX_ITEM_COUNT:
+            count = MAX_ITEM_COUNT
+            self.logger.warning(
+                "物品数量已达上限",
+                user_id=self.user_id,
+                platform=self.platform,
+                item=name,
+            )
+        inventory[item_id] = count
+        self.logger.debug(
+            "获得物品",
+            user_id=self.user_id,
+            platform=self.platform,
+            item=name,
+            count=count,
+        )
+        self.mark_dirty()
+        self.action_logger.log_item_change(
+            self.user_id, self.platform, item_id, 1, count
+        )
+
+    def remove_item(self, item_id: str) -> bool:
+        """从物品栏移除一个物品"""
+        inventory = self.user["inventory"]
+        count = inventory.get(item_id, 0) - 1
+        if count < 0:
+            self.logger.debug(
+                "物品栏中未找到物品",
+                user_id=self.user_id,
+                platform=self.platform,
+                item_id=item_id,
+            )
+            return False
+        if count:
+            inventory[item_id] = count
+        else:
+            del inventory[item_id]
+        self.logger.debug(
+            "物品数量减少",
+            user_id=self.user_id,
+            platform=self.platform,
+            item=item_info(item_id)["name"],
+            count=count,
+        )
+        self.mark_dirty()
+        self.action_logger.log_item_change(
+            self.user_id, self.platform, item_id, -1, count
+        )
+        return True
+
+    def get_item(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """获取物品栏中的物品（支持按ID或名称查找），返回物品信息和数量"""
+        resolved = resolve_item(item_id) or item_id
+        count = self.user["inventory"].get(resolved, 0)
+        if not count:
+            return None
+        return {**item_info(resolved), "count": count}
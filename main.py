@@ -1,8 +1,13 @@
 from astrbot.api import star
-from astrbot.api.event import AstrMessageEvent, filter
+from astrbot.api.event import AstrMessageEvent, MessageEventResult, filter
 
 from .utils.logger_manager import PluginLogger, UserActionLogger
-from .data import UserManager, GameManager
+from .utils.transaction_journal import TransactionJournal
+from .utils.metrics import MetricsRegistry, instrumented
+from .utils.day_clock import DayClock, parse_timezone
+from .utils.render_cache import RenderCache
+from .config.runtime import RuntimeConfig
+from .data import UserManager, GameManager, UserSession, create_storage
 from .commands.achievements import AchievementManager, AchievementsCommand
 from .commands.guess import GuessCommand
 from .commands.sign import SignCommand
@@ -14,6 +19,8 @@ from .commands.profile import ProfileCommand
 from .commands.help import HelpCommand
 from .commands.cow import CowCommand
 from .commands.spin import SpinCommand
+from .commands.leaderboard import LeaderboardCommand
+from .commands.stats import StatsCommand
 
 
 class Main(star.Star):
@@ -29,17 +36,35 @@ class Main(star.Star):
         # 初始化配置
         self.config = config if config else {}
         self._init_config()
+        self.runtime = RuntimeConfig.from_dict(self.config)
 
         # 初始化日志系统
         self.logger = PluginLogger(
-            self.name, enable_debug=self.config.get("debug_mode", False)
+            self.name,
+            enable_debug=self.runtime.debug_mode,
+            log_format=self.runtime.log_format,
         )
-        self.action_logger = UserActionLogger(self.logger)
+        self.journal = self._create_journal()
+        self.action_logger = UserActionLogger(self.logger, journal=self.journal)
+        self.day_clock = self._create_day_clock()
+        self.metrics = MetricsRegistry(enabled=self.runtime.metrics.enable)
+        # 只依赖配置的静态回复，快照版本变化后自动重建
+        self.render_cache = RenderCache()
 
         # 初始化管理器
-        self.user_manager = UserManager(self)
-        self.game_manager = GameManager(self.logger)
+        self.storage = create_storage(self, self.config.get("storage"))
+        self.user_manager = UserManager(self, self.storage)
+        self.game_manager = GameManager(
+            self.logger,
+            ttl=self.runtime.guess.session_ttl,
+            max_games=self.runtime.guess.max_sessions,
+            storage=self.storage,
+            metrics=self.metrics,
+        )
         self.achievement_manager = AchievementManager(self.user_manager, self.logger)
+        self.metrics.gauge(
+            "active_games", "进行中的猜数字游戏数", lambda: len(self.game_manager.games)
+        )
 
         # 初始化命令处理器
         self.guess_command = GuessCommand(
@@ -62,62 +87,21 @@ class Main(star.Star):
         self.inventory_command = InventoryCommand(self.user_manager, self.logger)
         self.achievements_command = AchievementsCommand(self.user_manager, self.logger)
         self.profile_command = ProfileCommand(self.user_manager, self.logger)
-        self.help_command = HelpCommand()
+        self.leaderboard_command = LeaderboardCommand(self.user_manager, self.logger)
+        self.help_command = HelpCommand(self)
         self.cow_command = CowCommand(self, self.user_manager, self.logger)
         self.spin_command = SpinCommand(
             self, self.user_manager, self.achievement_manager, self.logger
         )
+        self.stats_command = StatsCommand(
+            self.metrics, self.logger, dump_path=self._metrics_dump_path()
+        )
 
         self.logger.info("插件组件初始化完成")
 
     def _init_config(self) -> None:
         """初始化配置，确保所有配置项都有默认值"""
-        defaults = {
-            "points": {
-                "initial_points": 100,
-                "daily_command_limit": 50,
-                "command_cooldown": 5,
-            },
-            "sign": {
-                "base_reward": 10,
-                "consecutive_bonus": 2,
-                "max_consecutive_bonus": 100,
-                "week_bonus": 50,
-            },
-            "lottery": {
-                "cost": 10,
-                "ssr_rate": 5.0,
-                "sr_rate": 10.0,
-                "r_rate": 25.0,
-                "ssr_reward": 100,
-                "sr_reward": 30,
-                "r_reward": 10,
-                "lucky_charm_boost": 20.0,
-            },
-            "guess_game": {
-                "max_number": 100,
-                "base_points": 5,
-                "time_bonus_rate": 2.0,
-                "attempt_penalty": 1,
-            },
-            "cow_system": {
-                "feed_cost": 10,
-                "play_cost": 5,
-                "feed_restore": 30,
-                "play_restore": 30,
-                "level_up_exp_mult": 1.0,
-                "level_up_favor_mult": 1.0,
-            },
-            "shop": {
-                "enable_custom_prices": False,
-                "double_card_price": 50,
-                "lottery_ticket_price": 40,
-                "hint_token_price": 30,
-                "lucky_charm_price": 100,
-                "coffee_price": 80,
-                "exp_card_price": 120,
-            },
-        }
+        defaults = RuntimeConfig.default_dict()
 
         # 合并默认值到配置
         for key, value in defaults.items():
@@ -140,97 +124,229 @@ class Main(star.Star):
                 return None
         return value
 
+    def reload_config(self) -> RuntimeConfig:
+        """
+        按当前配置重新编译运行时快照并整体替换
+
+        编译失败时保留旧快照并抛出异常；存储、日志、流水、时区和指标等启动时
+        创建的组件不随之重建，修改这些配置仍需重载插件
+
+        Returns:
+            新的配置快照
+        """
+        self._init_config()
+        runtime = RuntimeConfig.from_dict(self.config, version=self.runtime.version + 1)
+        self.runtime = runtime
+
+        self.user_manager.configure(runtime)
+        self.game_manager.configure(
+            runtime.guess.session_ttl, runtime.guess.max_sessions
+        )
+
+        self.logger.info("配置已重新加载", version=runtime.version)
+        return runtime
+
+    def _create_journal(self) -> TransactionJournal | None:
+        """根据配置创建交易流水，未启用时返回 None"""
+        journal = self.runtime.journal
+        if not journal.enable:
+            return None
+        return TransactionJournal(
+            self.logger,
+            path=journal.path or TransactionJournal.DEFAULT_PATH,
+            max_bytes=int(journal.max_file_mb * 1024 * 1024),
+            backup_count=journal.backup_count,
+        )
+
+    def _create_day_clock(self) -> DayClock:
+        """根据时区配置创建日期时钟，配置无效时使用服务器本地时区"""
+        try:
+            return DayClock(parse_timezone(self.runtime.timezone))
+        except ValueError as e:
+            self.logger.warning("时区配置无效，使用服务器本地时区", error=str(e))
+            return DayClock()
+
+    def _metrics_dump_path(self) -> str:
+        """指标导出文件路径，未启用指标时返回空字符串"""
+        if not self.metrics.enabled:
+            return ""
+        return self.runtime.metrics.dump_path or MetricsRegistry.DEFAULT_DUMP_PATH
+
     async def initialize(self) -> None:
         """插件初始化"""
+        if self.journal is not None:
+            self.journal.start()
+        interval = self.runtime.metrics.dump_interval
+        if self.metrics.enabled and interval > 0:
+            self.metrics.start_dump(self._metrics_dump_path(), interval, self.logger)
+        await self.user_manager.restore()
+        self.user_manager.start()
+        await self.game_manager.restore()
+        self.game_manager.start()
         self.logger.info("互动游戏插件已加载")
 
     async def terminate(self) -> None:
         """插件卸载"""
-        self.logger.info(
-            "互动游戏插件已卸载，当前活跃游戏数: {len(self.game_manager.games)}"
-        )
+        active_games = len(self.game_manager.games)
+        await self.game_manager.stop()
+        await self.user_manager.stop()
+        await self.user_manager.close()
+        if self.journal is not None:
+            await self.journal.stop()
+        await self.metrics.stop_dump()
+        self.logger.info("互动游戏插件已卸载，已保存进行中的游戏: %d 局", active_games)
+
+    def _session(self, event: AstrMessageEvent) -> UserSession:
+        """为当前消息创建用户会话，命令处理结束时统一提交"""
+        return self.user_manager.session(event.get_sender_id(), event.get_platform_id())
 
     # ========== 命令注册 ==========
     @filter.command("guess")
+    @instrumented("guess")
     async def guess(self, event: AstrMessageEvent, message: str = "") -> None:
         """猜数字游戏"""
-        user_id = event.get_sender_id()
-        self.logger.debug("用户 {user_id} 执行 guess 命令: {message}")
-        await self.guess_command.handle(event, message)
+        self.logger.debug(
+            "执行 guess 命令", user_id=event.get_sender_id(), message=message
+        )
+        async with self._session(event) as session:
+            await self.guess_command.handle(event, session, message)
 
     @filter.command("sign")
+    @instrumented("sign")
     async def sign(self, event: AstrMessageEvent) -> None:
         """每日签到"""
-        user_id = event.get_sender_id()
-        self.logger.debug("用户 {user_id} 执行 sign 命令")
-        await self.sign_command.handle(event)
+        self.logger.debug("执行 sign 命令", user_id=event.get_sender_id())
+        async with self._session(event) as session:
+            await self.sign_command.handle(event, session)
 
     @filter.command("lottery")
-    async def lottery(self, event: AstrMessageEvent) -> None:
-        """消耗10积分抽奖"""
-        user_id = event.get_sender_id()
-        self.logger.debug("用户 {user_id} 执行 lottery 命令")
-        await self.lottery_command.handle(event)
+    @instrumented("lottery")
+    async def lottery(self, event: AstrMessageEvent, count: str = "") -> None:
+        """消耗积分抽奖，可指定连抽次数"""
+        self.logger.debug(
+            "执行 lottery 命令", user_id=event.get_sender_id(), count=count
+        )
+        async with self._session(event) as session:
+            await self.lottery_command.handle(event, session, count)
 
     @filter.command("shop")
+    @instrumented("shop")
     async def shop(
         self, event: AstrMessageEvent, action: str = "", item_id: str = ""
     ) -> None:
         """积分商店"""
-        user_id = event.get_sender_id()
         self.logger.debug(
-            "用户 {user_id} 执行 shop 命令: action={action}, item_id={item_id}"
+            "执行 shop 命令",
+            user_id=event.get_sender_id(),
+            action=action,
+            item_id=item_id,
         )
-        await self.shop_command.handle(event, action, item_id)
+        async with self._session(event) as session:
+            await self.shop_command.handle(event, session, action, item_id)
 
     @filter.command("use")
+    @instrumented("use")
     async def use_item(self, event: AstrMessageEvent, item_id: str = "") -> None:
         """使用物品"""
-        user_id = event.get_sender_id()
-        self.logger.debug("用户 {user_id} 执行 use 命令: item_id={item_id}")
-        await self.use_command.handle(event, item_id)
+        self.logger.debug(
+            "执行 use 命令", user_id=event.get_sender_id(), item_id=item_id
+        )
+        async with self._session(event) as session:
+            await self.use_command.handle(event, session, item_id)
 
     @filter.command("inventory")
+    @instrumented("inventory")
     async def inventory(self, event: AstrMessageEvent) -> None:
         """查看物品栏"""
-        user_id = event.get_sender_id()
-        self.logger.debug("用户 {user_id} 执行 inventory 命令")
-        await self.inventory_command.handle(event)
+        self.logger.debug("执行 inventory 命令", user_id=event.get_sender_id())
+        async with self._session(event) as session:
+            await self.inventory_command.handle(event, session)
 
     @filter.command("achievements")
+    @instrumented("achievements")
     async def achievements(self, event: AstrMessageEvent) -> None:
         """查看成就"""
-        user_id = event.get_sender_id()
-        self.logger.debug("用户 {user_id} 执行 achievements 命令")
-        await self.achievements_command.handle(event)
+        self.logger.debug("执行 achievements 命令", user_id=event.get_sender_id())
+        async with self._session(event) as session:
+            await self.achievements_command.handle(event, session)
 
     @filter.command("profile")
+    @instrumented("profile")
     async def profile(self, event: AstrMessageEvent) -> None:
         """查看个人资料"""
-        user_id = event.get_sender_id()
-        self.logger.debug("用户 {user_id} 执行 profile 命令")
-        await self.profile_command.handle(event)
+        self.logger.debug("执行 profile 命令", user_id=event.get_sender_id())
+        async with self._session(event) as session:
+            await self.profile_command.handle(event, session)
+
+    @filter.command("leaderboard")
+    @instrumented("leaderboard")
+    async def leaderboard(self, event: AstrMessageEvent, board: str = "") -> None:
+        """排行榜"""
+        self.logger.debug(
+            "执行 leaderboard 命令", user_id=event.get_sender_id(), board=board
+        )
+        async with self._session(event) as session:
+            await self.leaderboard_command.handle(event, session, board)
 
     @filter.command("interactive")
+    @instrumented("interactive")
     async def interactive_help(self, event: AstrMessageEvent) -> None:
         """互动功能帮助"""
         self.logger.debug("执行 interactive_help 命令")
         await self.help_command.handle(event)
 
     @filter.command("cow")
+    @instrumented("cow")
     async def cow(
         self, event: AstrMessageEvent, action: str = "", nickname: str = ""
     ) -> None:
         """牛牛系统"""
-        user_id = event.get_sender_id()
         self.logger.debug(
-            "用户 {user_id} 执行 cow 命令: action={action}, nickname={nickname}"
+            "执行 cow 命令",
+            user_id=event.get_sender_id(),
+            action=action,
+            nickname=nickname,
         )
-        await self.cow_command.handle(event, action, nickname)
+        async with self._session(event) as session:
+            await self.cow_command.handle(event, session, action, nickname)
 
     @filter.command("spin")
-    async def spin(self, event: AstrMessageEvent, message: str = "") -> None:
+    @instrumented("spin")
+    async def spin(
+        self, event: AstrMessageEvent, message: str = "", count: str = ""
+    ) -> None:
         """幸运转盘"""
-        user_id = event.get_sender_id()
-        self.logger.debug("用户 {user_id} 执行 spin 命令: {message}")
-        await self.spin_command.handle(event, message.strip())
+        self.logger.debug(
+            "执行 spin 命令",
+            user_id=event.get_sender_id(),
+            message=message,
+            count=count,
+        )
+        async with self._session(event) as session:
+            await self.spin_command.handle(event, session, message.strip(), count)
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("interactive_stats")
+    @instrumented("interactive_stats")
+    async def interactive_stats(self, event: AstrMessageEvent) -> None:
+        """查看插件运行指标（管理员）"""
+        self.logger.debug("执行 interactive_stats 命令", user_id=event.get_sender_id())
+        await self.stats_command.handle(event)
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @filter.command("interactive_reload")
+    @instrumented("interactive_reload")
+    async def interactive_reload(self, event: AstrMessageEvent) -> None:
+        """重新加载插件配置（管理员）"""
+        self.logger.debug("执行 interactive_reload 命令", user_id=event.get_sender_id())
+        try:
+            runtime = self.reload_config()
+        except Exception as e:
+            self.logger.error("重新加载配置失败，继续使用旧配置", error=str(e))
+            event.set_result(
+                MessageEventResult().message(f"❌ 配置加载失败，已保留原配置: {e}")
+            )
+            return
+        event.set_result(
+            MessageEventResult().message(f"✅ 配置已重新加载（版本 {runtime.version}）")
+        )
@@ -0,0 +1,4 @@
+"""
+开发工具
+离线模拟与性能测试脚本，不随插件加载，在插件目录下以 python -m tools.<脚本名> 运行
+"""
@@ -0,0 +1,223 @@
+"""
+性能基准测试
+在内存宿主中按真实的命令组合并发驱动 Main 的命令处理函数，统计每条命令的延迟分位数、
+KV 操作次数和内存分配
+
+用法（在插件目录下）:
+    python -m tools.benchmark
+    python -m tools.benchmark --levels 10 100 --kv-latency 2 --scenarios sign_burst
+    python -m tools.benchmark --tracemalloc --json bench.json
+
+场景:
+    sign_burst     零点签到高峰：所有用户同时签到
+    lottery_spam   抽奖刷屏：每个用户连续发送多条 lottery（大部分被冷却拦截）
+    guess_session  猜数字：开始游戏后二分猜测直到猜中或放弃
+    mixed          混合：签到、抽奖、转盘、查看资料和排行榜
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .fake_host import FakeEvent, create_plugin
+
+
+class Bench:
+    """单次基准运行的上下文"""
+
+    def __init__(self, plugin):
+        self.plugin = plugin
+        self.latencies: List[float] = []
+
+    async def run(self, handler: str, user_id: str, *params: str) -> str:
+        """执行一条命令并记录延迟"""
+        event = FakeEvent(user_id)
+        started = time.perf_counter()
+        await getattr(self.plugin, handler)(event, *params)
+        self.latencies.append(time.perf_counter() - started)
+        return event.text
+
+
+async def sign_burst(bench: Bench, user_id: str) -> None:
+    await bench.run("sign", user_id)
+
+
+async def lottery_spam(bench: Bench, user_id: str) -> None:
+    for _ in range(5):
+        await bench.run("lottery", user_id)
+
+
+async def guess_session(bench: Bench, user_id: str) -> None:
+    await bench.run("guess", user_id, "start")
+    low, high = 1, 100
+    for _ in range(7):
+        guess = (low + high) // 2
+        text = await bench.run("guess", user_id, str(guess))
+        if "猜大了" in text:
+            high = guess - 1
+        elif "猜小了" in text:
+            low = guess + 1
+        else:
+            return
+    await bench.run("guess", user_id, "giveup")
+
+
+async def mixed(bench: Bench, user_id: str) -> None:
+    actions = [
+        ("sign",),
+        ("lottery",),
+        ("spin",),
+        ("profile",),
+        ("leaderboard",),
+        ("inventory",),
+    ]
+    for action in random.sample(actions, 4):
+        await bench.run(*action, user_id)
+
+
+SCENARIOS: Dict[str, Callable[[Bench, str], Awaitable[None]]] = {
+    "sign_burst": sign_burst,
+    "lottery_spam": lottery_spam,
+    "guess_session": guess_session,
+    "mixed": mixed,
+}
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def _prepare(users: List[str], config: dict) -> Dict[str, str]:
+    """预先创建用户并写回，返回 KV 数据，使测量包含冷加载"""
+    plugin = create_plugin(config)
+    await asyncio.gather(
+        *(plugin.user_manager.get_user_data(user_id, "sim") for user_id in users)
+    )
+    await plugin.user_manager.flush(force=True)
+    return plugin._kv
+
+
+async def run_scenario(
+    name: str, concurrency: int, args: argparse.Namespace
+) -> Dict[str, Any]:
+    """以指定并发用户数运行一个场景"""
+    users = [f"bench{i}" for i in range(concurrency)]
+    config = {"points": {"command_cooldown": args.cooldown}}
+    kv = await _prepare(users, config)
+
+    plugin = create_plugin(config, kv_latency=args.kv_latency / 1000)
+    plugin._kv = kv
+    await plugin.initialize()
+    bench = Bench(plugin)
+    scenario = SCENARIOS[name]
+
+    if args.tracemalloc:
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0] if args.tracemalloc else 0
+    started = time.perf_counter()
+    await asyncio.gather(*(scenario(bench, user_id) for user_id in users))
+    elapsed = time.perf_counter() - started
+    if args.tracemalloc:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    # 计入关闭时的写回，反映每条命令最终产生的存储开销
+    await plugin.terminate()
+
+    commands = len(bench.latencies)
+    stats = plugin.kv_stats
+    result = {
+        "scenario": name,
+        "users": concurrency,
+        "commands": commands,
+        "p50_ms": _percentile(bench.latencies, 0.5) * 1000,
+        "p99_ms": _percentile(bench.latencies, 0.99) * 1000,
+        "throughput": commands / elapsed if elapsed else 0.0,
+        "kv_reads_per_cmd": stats.reads / commands,
+        "kv_writes_per_cmd": stats.writes / commands,
+        "kv_bytes_written_per_cmd": stats.bytes_written / commands,
+        "messages_sent": plugin.context.sent,
+    }
+    if args.tracemalloc:
+        result["peak_kb_per_cmd"] = (peak - before) / 1024 / commands
+        result["retained_kb_per_cmd"] = (current - before) / 1024 / commands
+    return result
+
+
+def print_results(results: List[Dict[str, Any]], with_memory: bool) -> None:
+    """输出结果表格"""
+    header = (
+        f"{'场景':<14}{'用户':>6}{'命令':>7}{'p50 ms':>9}{'p99 ms':>9}"
+        f"{'cmd/s':>9}{'KV读/条':>9}{'KV写/条':>9}{'写入B/条':>10}"
+    )
+    if with_memory:
+        header += f"{'峰值KB/条':>11}{'留存KB/条':>11}"
+    print(header)
+    for r in results:
+        line = (
+            f"{r['scenario']:<16}{r['users']:>6}{r['commands']:>7}"
+            f"{r['p50_ms']:>9.3f}{r['p99_ms']:>9.3f}{r['throughput']:>9.0f}"
+            f"{r['kv_reads_per_cmd']:>10.2f}{r['kv_writes_per_cmd']:>10.2f}"
+            f"{r['kv_bytes_written_per_cmd']:>11.0f}"
+        )
+        if with_memory:
+            line += f"{r['peak_kb_per_cmd']:>12.2f}{r['retained_kb_per_cmd']:>12.2f}"
+        print(line)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="插件性能基准测试")
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=sorted(SCENARIOS),
+        default=list(SCENARIOS),
+        help="要运行的场景",
+    )
+    parser.add_argument(
+        "--levels",
+        nargs="+",
+        type=int,
+        default=[10, 100, 1000],
+        help="并发用户数",
+    )
+    parser.add_argument(
+        "--kv-latency", type=float, default=0.0, help="每次 KV 操作的模拟延迟（毫秒）"
+    )
+    parser.add_argument(
+        "--cooldown", type=float, default=5, help="命令冷却时间（秒），0 表示不限制"
+    )
+    parser.add_argument(
+        "--tracemalloc", action="store_true", help="统计每条命令的内存分配（较慢）"
+    )
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--json", help="将结果写入 JSON 文件")
+    return parser.parse_args(argv)
+
+
+async def _main(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    results = []
+    for name in args.scenarios:
+        for level in args.levels:
+            results.append(await run_scenario(name, level, args))
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    random.seed(args.seed)
+    results = asyncio.run(_main(args))
+    print_results(results, args.tracemalloc)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
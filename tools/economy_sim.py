@@ -0,0 +1,302 @@
+"""
+游戏经济离线模拟
+在内存宿主中驱动真实的签到、抽奖、转盘、牛牛和商店命令，模拟大量用户的多日行为，
+统计积分通胀、各玩法的期望收益以及成就解锁曲线
+
+用法（在插件目录下）:
+    python -m tools.economy_sim --users 1000 --days 30
+    python -m tools.economy_sim --users 200 --days 60 --lottery-rate 3 --json report.json
+
+安装 NumPy 时每日行为次数按用户向量化生成，否则退回标准库 random。
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from .fake_host import FakeEvent, SimClock, create_plugin, plugin_module
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖
+    np = None
+
+
+class Ledger:
+    """交易流水替身，按原因汇总积分收支"""
+
+    def __init__(self):
+        self.earned: Dict[str, int] = defaultdict(int)
+        self.spent: Dict[str, int] = defaultdict(int)
+        self.items: Dict[str, int] = defaultdict(int)
+
+    def record(self, event_type: str, user_id: str, platform: str, **fields) -> bool:
+        if event_type == "earn":
+            self.earned[fields.get("reason", "")] += fields["amount"]
+        elif event_type == "spend":
+            self.spent[fields.get("reason", "")] += fields["amount"]
+        elif event_type == "item":
+            self.items[fields["item"]] += fields["delta"]
+        return True
+
+    async def wait_for_capacity(self) -> None:
+        return None
+
+
+class Behavior:
+    """用户每日行为模型"""
+
+    def __init__(self, args: argparse.Namespace):
+        self.sign_prob = args.sign_prob
+        self.lottery_rate = args.lottery_rate
+        self.spin_rate = args.spin_rate
+        self.cow_prob = args.cow_prob
+        self.shop_prob = args.shop_prob
+        self._np_rng = np.random.default_rng(args.seed) if np is not None else None
+        self._rng = random.Random(args.seed)
+
+    def daily_plan(self, users: int) -> Dict[str, List[int]]:
+        """生成全部用户当日的行为次数"""
+        if self._np_rng is not None:
+            rng = self._np_rng
+            return {
+                "sign": (rng.random(users) < self.sign_prob).tolist(),
+                "lottery": rng.poisson(self.lottery_rate, users).tolist(),
+                "spin": rng.poisson(self.spin_rate, users).tolist(),
+                "cow": (rng.random(users) < self.cow_prob).tolist(),
+                "shop": (rng.random(users) < self.shop_prob).tolist(),
+            }
+        rng = self._rng
+        return {
+            "sign": [rng.random() < self.sign_prob for _ in range(users)],
+            "lottery": [_poisson(rng, self.lottery_rate) for _ in range(users)],
+            "spin": [_poisson(rng, self.spin_rate) for _ in range(users)],
+            "cow": [rng.random() < self.cow_prob for _ in range(users)],
+            "shop": [rng.random() < self.shop_prob for _ in range(users)],
+        }
+
+
+def _poisson(rng: random.Random, lam: float) -> int:
+    """泊松分布抽样（Knuth 算法，适用于较小的 λ）"""
+    if lam <= 0:
+        return 0
+    threshold, k, p = pow(2.718281828459045, -lam), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= threshold:
+            return k
+        k += 1
+
+
+def _percentile(sorted_values: List[int], q: float) -> int:
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def expected_values(plugin) -> Dict[str, float]:
+    """由奖品表直接计算各玩法每次的期望净收益（积分）"""
+    runtime = plugin.runtime
+    table = runtime.lottery_table
+    result = {}
+    for modifier, name in ((None, "lottery"), ("lucky_charm", "lottery_charm")):
+        probs = table.probabilities(modifier)
+        result[name] = (
+            sum(p * r for p, r in zip(probs, runtime.lottery_rewards))
+            - runtime.lottery.cost
+        )
+
+    spin_table = runtime.spin_table
+    result["spin_pay"] = (
+        sum(
+            p * prize["rewards"]["points"]
+            for p, prize in zip(spin_table.probabilities(), spin_table.prizes)
+        )
+        - runtime.spin.cost
+    )
+    return result
+
+
+class EconomySimulator:
+    """经济模拟器"""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        random.seed(args.seed)
+        config: Dict[str, Any] = {
+            # 模拟中不考虑命令限流
+            "points": {"daily_command_limit": 0, "command_cooldown": 0},
+            "storage": {"cache_size": max(1024, args.users * 2)},
+        }
+        self.plugin = create_plugin(config)
+        # 与插件的批量上限保持一致，避免 --batch 时被拒绝
+        self.max_batch = plugin_module("commands.batch").MAX_BATCH
+        self.ledger = Ledger()
+        self.plugin.action_logger.journal = self.ledger
+        self.clock = SimClock()
+        self.clock.install(self.plugin)
+        self.behavior = Behavior(args)
+        self.user_ids = [f"sim{i}" for i in range(args.users)]
+        self.commands = 0
+        self.daily: List[Dict[str, Any]] = []
+
+    async def _run(self, handler: str, user_id: str, *params: str) -> str:
+        event = FakeEvent(user_id)
+        await getattr(self.plugin, handler)(event, *params)
+        self.commands += 1
+        return event.text
+
+    async def _draws(self, handler: str, user_id: str, count: int, *prefix: str):
+        """按批量或逐次执行抽奖类命令"""
+        if count <= 0:
+            return
+        if self.args.batch:
+            while count > 0:
+                n = min(self.max_batch, count)
+                await self._run(handler, user_id, *prefix, str(n))
+                count -= n
+        else:
+            for _ in range(count):
+                await self._run(handler, user_id, *prefix)
+
+    async def simulate_day(self, day: int) -> None:
+        plan = self.behavior.daily_plan(len(self.user_ids))
+        for i, user_id in enumerate(self.user_ids):
+            if day == 0 and plan["cow"][i]:
+                await self._run("cow", user_id, "adopt", f"牛{i}")
+            if plan["sign"][i]:
+                await self._run("sign", user_id)
+            await self._draws("lottery", user_id, plan["lottery"][i])
+            if plan["spin"][i]:
+                await self._run("spin", user_id)
+                await self._draws("spin", user_id, plan["spin"][i] - 1, "pay")
+            if plan["cow"][i]:
+                await self._run("cow", user_id, "feed")
+                await self._run("cow", user_id, "play")
+                await self._run("cow", user_id, "pet")
+            if plan["shop"][i]:
+                user = await self.plugin.user_manager.get_user_data(user_id, "sim")
+                if user["points"] >= self.args.shop_threshold:
+                    await self._run("shop", user_id, "buy", "lucky_charm")
+        self.daily.append(await self._snapshot(day))
+
+    async def _snapshot(self, day: int) -> Dict[str, Any]:
+        """统计当日结束时的用户状态"""
+        index = self.plugin.achievement_manager.index
+        points = []
+        unlocks = defaultdict(int)
+        for user_id in self.user_ids:
+            user = await self.plugin.user_manager.get_user_data(user_id, "sim")
+            points.append(user["points"])
+            mask = user["achievement_bits"]
+            for achievement in index.unlocked(mask):
+                unlocks[achievement["id"]] += 1
+        points.sort()
+        users = len(points)
+        return {
+            "day": day + 1,
+            "mean": sum(points) / users,
+            "p50": _percentile(points, 0.5),
+            "p90": _percentile(points, 0.9),
+            "max": points[-1],
+            "achievements": {
+                a["id"]: unlocks[a["id"]] / users for a in index.achievements
+            },
+        }
+
+    async def run(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        for day in range(self.args.days):
+            await self.simulate_day(day)
+            self.clock.advance(days=1)
+        elapsed = time.perf_counter() - started
+        await self.plugin.terminate()
+
+        first, last = self.daily[0], self.daily[-1]
+        days = max(1, len(self.daily) - 1)
+        return {
+            "users": self.args.users,
+            "days": self.args.days,
+            "user_days": self.args.users * self.args.days,
+            "commands": self.commands,
+            "elapsed_s": round(elapsed, 2),
+            "numpy": np is not None,
+            "expected_values": expected_values(self.plugin),
+            "inflation_per_day": (last["mean"] - first["mean"]) / days,
+            "earned": dict(self.ledger.earned),
+            "spent": dict(self.ledger.spent),
+            "daily": self.daily,
+        }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """输出文本报告"""
+    print(
+        f"模拟 {report['users']} 用户 x {report['days']} 天 = {report['user_days']} 用户日, "
+        f"{report['commands']} 条命令, 耗时 {report['elapsed_s']}s "
+        f"(NumPy: {'是' if report['numpy'] else '否'})"
+    )
+    print("\n每次期望净收益（积分）:")
+    for name, value in report["expected_values"].items():
+        print(f"  {name:<14} {value:+.2f}")
+    print(f"\n人均积分日增长: {report['inflation_per_day']:+.1f}")
+
+    print("\n积分来源:")
+    for reason, amount in sorted(report["earned"].items(), key=lambda x: -x[1]):
+        print(f"  +{amount:<10} {reason}")
+    print("积分去向:")
+    for reason, amount in sorted(report["spent"].items(), key=lambda x: -x[1]):
+        print(f"  -{amount:<10} {reason}")
+
+    print("\n   天     均值      p50      p90      最大")
+    daily = report["daily"]
+    step = max(1, len(daily) // 10)
+    for row in daily[::step] + ([daily[-1]] if (len(daily) - 1) % step else []):
+        print(
+            f"{row['day']:>5} {row['mean']:>8.0f} {row['p50']:>8} "
+            f"{row['p90']:>8} {row['max']:>9}"
+        )
+
+    print("\n成就解锁比例（首日 -> 末日）:")
+    for achievement_id, ratio in daily[-1]["achievements"].items():
+        start = daily[0]["achievements"][achievement_id]
+        print(f"  {achievement_id:<14} {start:6.1%} -> {ratio:6.1%}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="游戏经济离线模拟")
+    parser.add_argument("--users", type=int, default=500, help="模拟用户数")
+    parser.add_argument("--days", type=int, default=30, help="模拟天数")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--sign-prob", type=float, default=0.8, help="每日签到概率")
+    parser.add_argument(
+        "--lottery-rate", type=float, default=2.0, help="每日抽奖次数均值"
+    )
+    parser.add_argument("--spin-rate", type=float, default=1.0, help="每日转盘次数均值")
+    parser.add_argument("--cow-prob", type=float, default=0.5, help="养牛用户比例")
+    parser.add_argument("--shop-prob", type=float, default=0.1, help="每日逛商店概率")
+    parser.add_argument(
+        "--shop-threshold", type=int, default=300, help="积分高于此值才会购买幸运护符"
+    )
+    parser.add_argument(
+        "--batch", action="store_true", help="抽奖和转盘使用连抽命令（每批最多 10 次）"
+    )
+    parser.add_argument("--json", help="将完整报告写入 JSON 文件")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    report = asyncio.run(EconomySimulator(args).run())
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
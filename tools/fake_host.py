@@ -0,0 +1,247 @@
+"""
+内存中的 AstrBot 宿主替身
+提供 star.Star 的 KV 接口、Context、消息事件与命令过滤器，用于在没有 AstrBot 的环境中
+加载插件并直接调用命令处理函数
+"""
+
+import asyncio
+import datetime as _dt
+import importlib
+import importlib.util
+import json
+import logging
+import sys
+import types
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PLUGIN_DIR = Path(__file__).resolve().parent.parent
+PLUGIN_PACKAGE = "astrbot_plugin_interactive"
+
+
+class KVStats:
+    """KV 操作统计"""
+
+    __slots__ = ("reads", "writes", "bytes_read", "bytes_written")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.reads = 0
+        self.writes = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    @property
+    def ops(self) -> int:
+        return self.reads + self.writes
+
+
+class FakeStar:
+    """star.Star 替身，KV 数据以 JSON 文本保存在内存中"""
+
+    def __init__(self, context, config: Optional[dict] = None):
+        self.context = context
+        self.kv_latency = 0.0  # 每次 KV 操作的模拟延迟（秒）
+        self.kv_stats = KVStats()
+        self._kv: Dict[str, str] = {}
+
+    async def get_kv_data(self, key: str, default: Any) -> Any:
+        if self.kv_latency:
+            await asyncio.sleep(self.kv_latency)
+        self.kv_stats.reads += 1
+        raw = self._kv.get(key)
+        if raw is None:
+            return default
+        self.kv_stats.bytes_read += len(raw)
+        return json.loads(raw)
+
+    async def put_kv_data(self, key: str, value: Any) -> None:
+        if self.kv_latency:
+            await asyncio.sleep(self.kv_latency)
+        raw = json.dumps(value, ensure_ascii=False)
+        self.kv_stats.writes += 1
+        self.kv_stats.bytes_written += len(raw)
+        self._kv[key] = raw
+
+
+class FakeContext:
+    """star.Context 替身，记录主动发送的消息数量"""
+
+    def __init__(self):
+        self.sent = 0
+
+    async def send_message(self, event, message) -> None:
+        self.sent += 1
+
+
+class FakeResult:
+    """MessageEventResult 替身"""
+
+    def __init__(self):
+        self.text = ""
+
+    def message(self, text: str) -> "FakeResult":
+        self.text = text
+        return self
+
+
+class FakeEvent:
+    """AstrMessageEvent 替身"""
+
+    def __init__(self, user_id: str, platform: str = "sim", message: str = ""):
+        self.user_id = user_id
+        self.platform = platform
+        self.message_str = message
+        self.session_id = f"{platform}:{user_id}"
+        self.result: Optional[FakeResult] = None
+
+    def get_sender_id(self) -> str:
+        return self.user_id
+
+    def get_platform_id(self) -> str:
+        return self.platform
+
+    def set_result(self, result: FakeResult) -> None:
+        self.result = result
+
+    @property
+    def text(self) -> str:
+        return self.result.text if self.result else ""
+
+
+class _Filter:
+    """filter 替身，记录注册的命令"""
+
+    class PermissionType:
+        ADMIN = "admin"
+        MEMBER = "member"
+
+    def __init__(self):
+        self.commands: Dict[str, str] = {}
+
+    def command(self, name: str, *args, **kwargs):
+        def decorator(func):
+            self.commands[name] = func.__name__
+            return func
+
+        return decorator
+
+    def permission_type(self, *args, **kwargs):
+        return lambda func: func
+
+
+def install_stubs(force: bool = False) -> None:
+    """注册 astrbot.api 替身模块（已安装 AstrBot 时默认不覆盖）"""
+    if not force:
+        try:
+            importlib.import_module("astrbot.api")
+            return
+        except ImportError:
+            pass
+
+    astrbot = types.ModuleType("astrbot")
+    api = types.ModuleType("astrbot.api")
+    event = types.ModuleType("astrbot.api.event")
+    star = types.ModuleType("astrbot.api.star")
+
+    star.Star = FakeStar
+    star.Context = FakeContext
+    api.star = star
+    api.logger = logging.getLogger("astrbot")
+    event.AstrMessageEvent = FakeEvent
+    event.MessageEventResult = FakeResult
+    event.filter = _Filter()
+    api.event = event
+    astrbot.api = api
+
+    sys.modules.update(
+        {
+            "astrbot": astrbot,
+            "astrbot.api": api,
+            "astrbot.api.event": event,
+            "astrbot.api.star": star,
+        }
+    )
+
+
+def load_plugin() -> types.ModuleType:
+    """以包的形式加载插件并返回其 main 模块"""
+    install_stubs()
+    if PLUGIN_PACKAGE not in sys.modules:
+        spec = importlib.util.spec_from_file_location(
+            PLUGIN_PACKAGE,
+            PLUGIN_DIR / "__init__.py",
+            submodule_search_locations=[str(PLUGIN_DIR)],
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[PLUGIN_PACKAGE] = module
+        spec.loader.exec_module(module)
+    return importlib.import_module(f"{PLUGIN_PACKAGE}.main")
+
+
+def plugin_module(name: str) -> types.ModuleType:
+    """导入插件的子模块（如 "commands.batch"）"""
+    load_plugin()
+    return importlib.import_module(f"{PLUGIN_PACKAGE}.{name}")
+
+
+def create_plugin(config: Optional[dict] = None, kv_latency: float = 0.0):
+    """
+    创建插件实例
+
+    Args:
+        config: 插件配置，未指定的项使用默认值；默认关闭交易流水和指标定期导出以免写入本地文件
+        kv_latency: 每次 KV 操作的模拟延迟（秒）
+
+    Returns:
+        插件 Main 实例，KV 统计在 plugin.kv_stats 中
+    """
+    main = load_plugin()
+    config = dict(config or {})
+    config.setdefault("journal", {"enable": False})
+    config.setdefault("metrics", {"dump_interval": 0})
+    plugin = main.Main(FakeContext(), config)
+    plugin.kv_latency = kv_latency
+    return plugin
+
+
+def registered_commands() -> List[str]:
+    """已注册的命令名称（仅在使用替身模块时可用）"""
+    load_plugin()
+    commands = getattr(sys.modules["astrbot.api.event"].filter, "commands", {})
+    return sorted(commands)
+
+
+class SimClock:
+    """模拟时钟，替换插件各模块中的 datetime.now() 和日期时钟以便快进日期"""
+
+    def __init__(self, start: Optional[_dt.datetime] = None):
+        self.now = start or _dt.datetime(2024, 1, 1, 8, 0, 0)
+
+    def advance(self, days: int = 0, seconds: float = 0) -> None:
+        """时钟前进"""
+        self.now += _dt.timedelta(days=days, seconds=seconds)
+
+    def timestamp(self) -> float:
+        """当前模拟时间的 Unix 时间戳"""
+        return self.now.timestamp()
+
+    def install(self, plugin=None) -> None:
+        """替换已加载的插件模块中的 datetime 类，指定插件实例时同时接管其日期时钟"""
+        clock = self
+        if plugin is not None:
+            plugin.day_clock.clock = self.timestamp
+            plugin.day_clock.reset()
+
+        class _SimDatetime(_dt.datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return clock.now if tz is None else clock.now.astimezone(tz)
+
+        for name, module in list(sys.modules.items()):
+            if not name.startswith(PLUGIN_PACKAGE + "."):
+                continue
+            if getattr(module, "datetime", None) is _dt.datetime:
+                module.datetime = _SimDatetime
@@ -3,5 +3,19 @@
 """
 
 from .logger_manager import PluginLogger, UserActionLogger
+from .transaction_journal import PendingJournal, TransactionJournal
+from .metrics import MetricsRegistry, instrumented
+from .day_clock import DayClock, parse_timezone
+from .render_cache import RenderCache
 
-__all__ = ["PluginLogger", "UserActionLogger"]
\ No newline at end of file
+__all__ = [
+    "PluginLogger",
+    "UserActionLogger",
+    "TransactionJournal",
+    "PendingJournal",
+    "MetricsRegistry",
+    "instrumented",
+    "DayClock",
+    "parse_timezone",
+    "RenderCache",
+]
@@ -0,0 +1,117 @@
+"""
+日期时钟模块
+按配置的时区把当前时间换算成整数日序号（date.toordinal()），每天只计算一次，
+其余时间只需一次浮点比较，供签到、每日计数等按天重置的逻辑共用
+"""
+
+import re
+import time
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from typing import Callable, Optional
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python 3.8 及以下
+    ZoneInfo = None
+
+_OFFSET_PATTERN = re.compile(r"^(?:UTC|GMT)?([+-])(\d{1,2})(?::?(\d{2}))?$", re.I)
+
+
+def parse_timezone(name: str) -> Optional[tzinfo]:
+    """
+    解析时区配置
+
+    Args:
+        name: IANA 时区名（如 Asia/Shanghai）或固定偏移（如 +08:00、UTC+8），
+            留空表示使用服务器本地时区
+
+    Returns:
+        时区对象，本地时区返回 None
+
+    Raises:
+        ValueError: 无法识别的时区
+    """
+    name = (name or "").strip()
+    if not name:
+        return None
+    if name.upper() in ("UTC", "GMT"):
+        return timezone.utc
+    match = _OFFSET_PATTERN.match(name)
+    if match:
+        sign, hours, minutes = match.groups()
+        offset = timedelta(hours=int(hours), minutes=int(minutes or 0))
+        return timezone(-offset if sign == "-" else offset)
+    if ZoneInfo is not None:
+        try:
+            return ZoneInfo(name)
+        except Exception:
+            pass
+    raise ValueError(f"无法识别的时区: {name}")
+
+
+class DayClock:
+    """按天缓存的日期时钟"""
+
+    def __init__(
+        self, tz: Optional[tzinfo] = None, clock: Callable[[], float] = time.time
+    ):
+        """
+        初始化日期时钟
+
+        Args:
+            tz: 时区，None 表示服务器本地时区
+            clock: 返回当前 Unix 时间戳（秒）的函数，模拟时可替换
+        """
+        self.tz = tz
+        self.clock = clock
+        self._day = 0
+        self._date_str = ""
+        self._next_rollover = float("-inf")
+        self._valid_from = float("inf")
+
+    def _roll(self, now: float) -> None:
+        """重新计算当天的日序号和下一次跨天的时间点"""
+        current = datetime.fromtimestamp(now, self.tz)
+        midnight = current.replace(hour=0, minute=0, second=0, microsecond=0)
+        self._day = midnight.toordinal()
+        self._date_str = midnight.strftime("%Y-%m-%d")
+        self._valid_from = midnight.timestamp()
+        self._next_rollover = (midnight + timedelta(days=1)).timestamp()
+
+    def today(self) -> int:
+        """今天的日序号"""
+        now = self.clock()
+        if not self._valid_from <= now < self._next_rollover:
+            self._roll(now)
+        return self._day
+
+    def today_str(self) -> str:
+        """今天的日期字符串（%Y-%m-%d）"""
+        self.today()
+        return self._date_str
+
+    def reset(self) -> None:
+        """丢弃缓存（修改时区或替换时钟后调用）"""
+        self._next_rollover = float("-inf")
+        self._valid_from = float("inf")
+
+    @staticmethod
+    def day_of(value) -> Optional[int]:
+        """
+        将日期字符串转换为日序号，兼容旧版未补零的格式（如 2024-1-5）
+
+        Returns:
+            日序号，无法解析时返回 None
+        """
+        if isinstance(value, int):
+            return value
+        try:
+            year, month, day = (int(part) for part in str(value).split("-"))
+            return date(year, month, day).toordinal()
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def date_of(day: int) -> str:
+        """将日序号转换为日期字符串（%Y-%m-%d）"""
+        return date.fromordinal(day).isoformat()
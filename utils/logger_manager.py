@@ -3,40 +3,93 @@
 提供插件专用的日志记录功能
 """
 
+import json
+import logging
+from typing import Any
+
 from astrbot.api import logger
 
 
 class PluginLogger:
-    """插件日志记录器"""
+    """插件日志记录器
+
+    支持消息模板与结构化字段，例如::
+
+        logger.debug("用户 %s 执行命令", user_id, command="sign", cost=10)
+
+    只有在对应级别启用时才会格式化消息，关闭调试日志时 debug 调用几乎没有开销。
+    """
 
-    def __init__(self, plugin_name: str, enable_debug: bool = False):
+    FORMATS = ("kv", "json")
+
+    def __init__(
+        self, plugin_name: str, enable_debug: bool = False, log_format: str = "kv"
+    ):
         """
         初始化插件日志记录器
 
         Args:
             plugin_name: 插件名称
             enable_debug: 是否启用调试模式
+            log_format: 结构化字段的输出格式，kv 为 key=value，json 为单行 JSON
         """
         self.plugin_name = plugin_name
         self.enable_debug = enable_debug
-
-    def info(self, message: str) -> None:
+        self.log_format = log_format if log_format in self.FORMATS else "kv"
+
+    @property
+    def debug_enabled(self) -> bool:
+        """调试日志是否会被输出"""
+        return self.enable_debug and logger.isEnabledFor(logging.DEBUG)
+
+    def is_enabled(self, level: int) -> bool:
+        """指定级别的日志是否会被输出"""
+        if level <= logging.DEBUG:
+            return self.debug_enabled
+        return logger.isEnabledFor(level)
+
+    def _format(self, message: str, args: tuple, fields: dict) -> str:
+        """格式化日志消息（仅在确定输出时调用）"""
+        if args:
+            message = message % args
+        if self.log_format == "json":
+            record = {"plugin": self.plugin_name, "msg": message}
+            record.update(fields)
+            return json.dumps(record, ensure_ascii=False, default=str)
+        if fields:
+            message += " " + " ".join(
+                f"{key}={_format_value(value)}" for key, value in fields.items()
+            )
+        return f"[{self.plugin_name}] {message}"
+
+    def log(self, level: int, message: str, /, *args: Any, **fields: Any) -> None:
+        """记录指定级别的日志"""
+        if self.is_enabled(level):
+            logger.log(level, self._format(message, args, fields))
+
+    def info(self, message: str, /, *args: Any, **fields: Any) -> None:
         """记录信息日志"""
-        logger.info(f"[{self.plugin_name}] {message}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(self._format(message, args, fields))
 
-    def debug(self, message: str) -> None:
+    def debug(self, message: str, /, *args: Any, **fields: Any) -> None:
         """记录调试日志"""
-        logger.debug(f"[{self.plugin_name}] {message}")
+        if self.enable_debug and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(self._format(message, args, fields))
 
-    def warning(self, message: str) -> None:
+    def warning(self, message: str, /, *args: Any, **fields: Any) -> None:
         """记录警告日志"""
-        logger.warning(f"[{self.plugin_name}] {message}")
+        if logger.isEnabledFor(logging.WARNING):
+            logger.warning(self._format(message, args, fields))
 
-    def error(self, message: str) -> None:
+    def error(self, message: str, /, *args: Any, **fields: Any) -> None:
         """记录错误日志"""
-        logger.error(f"[{self.plugin_name}] {message}")
+        if logger.isEnabledFor(logging.ERROR):
+            logger.error(self._format(message, args, fields))
 
-    def log_action(self, user_id: str, platform: str, action: str, details: str = "") -> None:
+    def log_action(
+        self, user_id: str, platform: str, action: str, details: str = "", *args: Any
+    ) -> None:
         """
         记录用户操作日志
 
@@ -44,52 +97,127 @@ class PluginLogger:
             user_id: 用户ID
             platform: 平台
             action: 操作类型
-            details: 操作详情
+            details: 操作详情（可包含 % 占位符，由 args 延迟填充）
         """
-        self.info(f"用户 {user_id}@{platform} 执行操作: {action}" + (f" - {details}" if details else ""))
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        if details:
+            self.info(
+                "用户 %s@%s 执行操作: %s - " + details, user_id, platform, action, *args
+            )
+        else:
+            self.info("用户 %s@%s 执行操作: %s", user_id, platform, action)
+
+
+def _format_value(value: Any) -> str:
+    """格式化 key=value 中的值，包含空白的字符串加引号"""
+    if isinstance(value, str) and (not value or any(c.isspace() for c in value)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
 
 
 class UserActionLogger:
     """用户操作日志记录器"""
 
-    def __init__(self, plugin_logger: PluginLogger):
+    def __init__(self, plugin_logger: PluginLogger, journal=None):
         """
         初始化用户操作日志记录器
 
         Args:
             plugin_logger: 插件日志记录器实例
+            journal: 交易流水（TransactionJournal），为 None 时只输出日志
         """
         self.logger = plugin_logger
+        self.journal = journal
+
+    def log_transaction(
+        self,
+        user_id: str,
+        platform: str,
+        kind: str,
+        amount: int,
+        balance: int,
+        reason: str = "",
+    ) -> None:
+        """记录积分收支（kind 为 earn 或 spend）"""
+        if self.journal is not None:
+            self.journal.record(
+                kind, user_id, platform, amount=amount, balance=balance, reason=reason
+            )
+        self.logger.debug(
+            "积分流水",
+            user_id=user_id,
+            platform=platform,
+            kind=kind,
+            amount=amount,
+            balance=balance,
+            reason=reason,
+        )
+
+    def log_item_change(
+        self, user_id: str, platform: str, item_id: str, delta: int, count: int
+    ) -> None:
+        """记录物品数量变动"""
+        if self.journal is not None:
+            self.journal.record(
+                "item", user_id, platform, item=item_id, delta=delta, count=count
+            )
+
+    def log_achievement(
+        self, user_id: str, platform: str, achievement_id: str, reward: int
+    ) -> None:
+        """记录成就解锁"""
+        if self.journal is not None:
+            self.journal.record(
+                "achievement",
+                user_id,
+                platform,
+                achievement=achievement_id,
+                reward=reward,
+            )
+        self.logger.log_action(user_id, platform, "解锁成就", "%s", achievement_id)
 
     def log_sign(self, user_id: str, platform: str, reward: int) -> None:
         """记录签到操作"""
-        self.logger.log_action(user_id, platform, "签到", f"获得 {reward} 积分")
+        self.logger.log_action(user_id, platform, "签到", "获得 %s 积分", reward)
 
     def log_lottery(self, user_id: str, platform: str, result: str) -> None:
         """记录抽奖操作"""
-        self.logger.log_action(user_id, platform, "抽奖", f"结果: {result}")
+        self.logger.log_action(user_id, platform, "抽奖", "结果: %s", result)
 
-    def log_shop_buy(self, user_id: str, platform: str, item_name: str, price: int) -> None:
+    def log_shop_buy(
+        self, user_id: str, platform: str, item_name: str, price: int
+    ) -> None:
         """记录商店购买操作"""
-        self.logger.log_action(user_id, platform, "购买", f"{item_name} ({price} 积分)")
+        self.logger.log_action(
+            user_id, platform, "购买", "%s (%s 积分)", item_name, price
+        )
 
     def log_game_start(self, user_id: str, platform: str, game_type: str) -> None:
         """记录游戏开始操作"""
-        self.logger.log_action(user_id, platform, "开始游戏", f"类型: {game_type}")
+        self.logger.log_action(user_id, platform, "开始游戏", "类型: %s", game_type)
 
-    def log_game_end(self, user_id: str, platform: str, game_type: str, score: int, won: bool) -> None:
+    def log_game_end(
+        self, user_id: str, platform: str, game_type: str, score: int, won: bool
+    ) -> None:
         """记录游戏结束操作"""
         result = "胜利" if won else "失败"
-        self.logger.log_action(user_id, platform, "结束游戏", f"{game_type} - {result} ({score} 分)")
+        self.logger.log_action(
+            user_id, platform, "结束游戏", "%s - %s (%s 分)", game_type, result, score
+        )
 
     def log_item_use(self, user_id: str, platform: str, item_name: str) -> None:
         """记录物品使用操作"""
-        self.logger.log_action(user_id, platform, "使用物品", f"{item_name}")
+        self.logger.log_action(user_id, platform, "使用物品", "%s", item_name)
 
     def log_cow_action(self, user_id: str, platform: str, action: str) -> None:
         """记录牛牛操作"""
-        self.logger.log_action(user_id, platform, "牛牛互动", action)
+        self.logger.log_action(user_id, platform, "牛牛互动", "%s", action)
 
-    def log_generic(self, user_id: str, platform: str, action: str, details: str = "") -> None:
+    def log_generic(
+        self, user_id: str, platform: str, action: str, details: str = ""
+    ) -> None:
         """记录通用操作"""
-        self.logger.log_action(user_id, platform, action, details)
\ No newline at end of file
+        self.logger.log_action(
+            user_id, platform, action, "%s" if details else "", details
+        )
@@ -0,0 +1,296 @@
+"""
+指标模块
+进程内的轻量指标注册表（计数器、仪表、直方图），支持导出 Prometheus 文本格式
+"""
+
+import asyncio
+import functools
+import os
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# 默认延迟分桶（秒）
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    """转义标签值中的反斜杠、双引号和换行"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _render_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    """渲染标签，如 {command="sign",status="ok"}"""
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """单调递增计数器"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, *labelvalues: str) -> None:
+        self.values[labelvalues] = self.values.get(labelvalues, 0) + amount
+
+    def get(self, *labelvalues: str) -> float:
+        return self.values.get(labelvalues, 0)
+
+    def total(self) -> float:
+        return sum(self.values.values())
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_render_labels(self.labelnames, labels)} {_format_number(value)}"
+            for labels, value in sorted(self.values.items())
+        ]
+
+
+class Gauge:
+    """仪表，取值由回调函数在导出时计算"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, func: Callable[[], float]):
+        self.name = name
+        self.help = help_text
+        self.func = func
+
+    def get(self) -> float:
+        try:
+            return float(self.func())
+        except Exception:
+            return float("nan")
+
+    def render(self) -> List[str]:
+        return [f"{self.name} {_format_number(self.get())}"]
+
+
+class _HistogramData:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram:
+    """固定分桶直方图"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self.values: Dict[LabelValues, _HistogramData] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        data = self.values.get(labelvalues)
+        if data is None:
+            data = self.values[labelvalues] = _HistogramData(len(self.buckets))
+        data.counts[bisect_left(self.buckets, value)] += 1
+        data.sum += value
+        data.count += 1
+
+    def quantile(self, q: float, *labelvalues: str) -> Optional[float]:
+        """由分桶估算分位数（返回所在分桶的上界）"""
+        data = self.values.get(labelvalues)
+        if data is None or not data.count:
+            return None
+        target = q * data.count
+        seen = 0
+        for bound, count in zip(self.buckets, data.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.buckets[-1]
+
+    def render(self) -> List[str]:
+        lines = []
+        for labels, data in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, data.counts):
+                cumulative += count
+                le = f'le="{_format_number(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_render_labels(self.labelnames, labels, le)} {cumulative}"
+                )
+            rendered = _render_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{rendered} {_format_number(data.sum)}")
+            lines.append(f"{self.name}_count{rendered} {data.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    DEFAULT_DUMP_PATH = os.path.join(
+        "data", "plugin_data", "astrbot_plugin_interactive", "metrics.prom"
+    )
+
+    def __init__(self, prefix: str = "interactive", enabled: bool = True):
+        self.prefix = prefix
+        self.enabled = enabled
+        self._metrics: Dict[str, object] = {}
+        self._dump_task: Optional[asyncio.Task] = None
+        self.started_at = time.time()
+
+    def _full_name(self, name: str) -> str:
+        return f"{self.prefix}_{name}" if self.prefix else name
+
+    def counter(
+        self, name: str, help_text: str = "", labelnames: Sequence[str] = ()
+    ) -> Counter:
+        """获取或创建计数器"""
+        full = self._full_name(name)
+        metric = self._metrics.get(full)
+        if metric is None:
+            metric = self._metrics[full] = Counter(full, help_text, labelnames)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str = "",
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """获取或创建直方图"""
+        full = self._full_name(name)
+        metric = self._metrics.get(full)
+        if metric is None:
+            metric = self._metrics[full] = Histogram(
+                full, help_text, labelnames, buckets
+            )
+        return metric
+
+    def gauge(self, name: str, help_text: str, func: Callable[[], float]) -> Gauge:
+        """注册回调仪表（同名时替换回调）"""
+        full = self._full_name(name)
+        metric = self._metrics[full] = Gauge(full, help_text, func)
+        return metric
+
+    def get(self, name: str):
+        """按名称（不含前缀）获取指标"""
+        return self._metrics.get(self._full_name(name))
+
+    def render_prometheus(self) -> str:
+        """导出 Prometheus 文本格式"""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            if metric.help:
+                lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _write_file(self, path: str, text: str) -> None:
+        """原子写入导出文件（在线程中执行）"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    async def dump(self, path: str) -> None:
+        """将当前指标写入文件"""
+        await asyncio.to_thread(self._write_file, path, self.render_prometheus())
+
+    async def _dump_loop(self, path: str, interval: float, logger) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.dump(path)
+            except Exception as e:
+                logger.error("指标导出失败", path=path, error=str(e))
+
+    def start_dump(self, path: str, interval: float, logger) -> None:
+        """启动定期导出任务"""
+        if self._dump_task is None or self._dump_task.done():
+            self._dump_task = asyncio.create_task(
+                self._dump_loop(path, interval, logger)
+            )
+
+    async def stop_dump(self) -> None:
+        """停止定期导出任务"""
+        if self._dump_task is not None:
+            self._dump_task.cancel()
+            try:
+                await self._dump_task
+            except asyncio.CancelledError:
+                pass
+            self._dump_task = None
+
+
+def instrumented(command: str):
+    """
+    命令处理函数装饰器：按命令统计调用次数、异常次数和耗时
+
+    被装饰的方法所属对象需要有 metrics 属性（MetricsRegistry）
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            metrics: Optional[MetricsRegistry] = getattr(self, "metrics", None)
+            if metrics is None or not metrics.enabled:
+                return await func(self, *args, **kwargs)
+            started = time.perf_counter()
+            status = "error"
+            try:
+                result = await func(self, *args, **kwargs)
+                status = "ok"
+                return result
+            finally:
+                metrics.counter(
+                    "commands_total", "命令调用次数", ("command", "status")
+                ).inc(1, command, status)
+                metrics.histogram(
+                    "command_duration_seconds", "命令处理耗时", ("command",)
+                ).observe(time.perf_counter() - started, command)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,43 @@
+"""
+静态回复渲染缓存
+商店列表、转盘奖品、帮助等只依赖配置的回复在每个配置版本下只构建一次，
+配置重新加载（快照版本号变化）后首次读取时整体失效并重新构建
+"""
+
+from typing import Callable, Dict, Hashable, Optional
+
+
+class RenderCache:
+    """按配置快照版本缓存的静态文本"""
+
+    def __init__(self):
+        self._version: Optional[int] = None
+        self._texts: Dict[Hashable, str] = {}
+
+    def get(self, runtime, key: Hashable, build: Callable[..., str]) -> str:
+        """
+        读取缓存的文本，缺失时用 build(runtime) 构建
+
+        Args:
+            runtime: 当前配置快照
+            key: 文本的缓存键
+            build: 构建函数，只能依赖配置快照
+
+        Returns:
+            渲染好的文本
+        """
+        if runtime.version != self._version:
+            self._texts.clear()
+            self._version = runtime.version
+        text = self._texts.get(key)
+        if text is None:
+            text = self._texts[key] = build(runtime)
+        return text
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._texts.clear()
+        self._version = None
+
+    def __len__(self) -> int:
+        return len(self._texts)
@@ -0,0 +1,150 @@
+"""
+加权抽样模块
+基于 Vose 别名法，预处理 O(n)，每次抽样 O(1)
+"""
+
+import random
+from typing import Callable, Dict, Generic, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+class AliasSampler:
+    """别名法加权抽样器"""
+
+    __slots__ = ("_prob", "_alias", "_n")
+
+    def __init__(self, weights: Sequence[float]):
+        """
+        构建别名表
+
+        Args:
+            weights: 各项的非负权重，无需归一化
+        """
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            raise ValueError("权重列表不能为空且总和必须大于 0")
+        if any(w < 0 for w in weights):
+            raise ValueError("权重不能为负数")
+
+        scaled = [w * n / total for w in weights]
+        prob = [0.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            s, g = small.pop(), large.pop()
+            prob[s] = scaled[s]
+            alias[s] = g
+            scaled[g] -= 1.0 - scaled[s]
+            (small if scaled[g] < 1.0 else large).append(g)
+        # 剩余项因浮点误差略偏离 1，视为 1
+        for i in large + small:
+            prob[i] = 1.0
+
+        self._prob = prob
+        self._alias = alias
+        self._n = n
+
+    def __len__(self) -> int:
+        return self._n
+
+    def sample(self, rng: Optional[random.Random] = None) -> int:
+        """抽取一个下标"""
+        r = (rng or random).random() * self._n
+        i = int(r)
+        return i if r - i < self._prob[i] else self._alias[i]
+
+    def sample_many(self, k: int, rng: Optional[random.Random] = None) -> List[int]:
+        """抽取 k 个下标（有放回）"""
+        rand = (rng or random).random
+        n, prob, alias = self._n, self._prob, self._alias
+        result = []
+        for _ in range(k):
+            r = rand() * n
+            i = int(r)
+            result.append(i if r - i < prob[i] else alias[i])
+        return result
+
+
+class PrizeTable(Generic[T]):
+    """奖品表
+
+    构建时为基础权重和每个修正项（如幸运护符）各预先生成一张别名表，
+    抽奖时只按修正项名称选表，不会重复构建。配置变化时重新创建即可。
+    """
+
+    def __init__(
+        self,
+        prizes: Sequence[T],
+        weights: Sequence[float],
+        modifiers: Optional[Dict[str, Callable[[List[float]], Sequence[float]]]] = None,
+    ):
+        """
+        初始化奖品表
+
+        Args:
+            prizes: 奖品列表
+            weights: 与奖品一一对应的权重
+            modifiers: 修正项名称 -> 由基础权重计算修正后权重的函数
+        """
+        if len(prizes) != len(weights):
+            raise ValueError("奖品数量与权重数量不一致")
+        self.prizes = list(prizes)
+        self.weights = [float(w) for w in weights]
+        self._weights: Dict[Optional[str], List[float]] = {None: self.weights}
+        for name, modify in (modifiers or {}).items():
+            self._weights[name] = [float(w) for w in modify(list(self.weights))]
+        self._samplers: Dict[Optional[str], AliasSampler] = {
+            name: AliasSampler(weights) for name, weights in self._weights.items()
+        }
+
+    def probabilities(self, modifier: Optional[str] = None) -> List[float]:
+        """获取归一化后的概率（用于展示）"""
+        weights = self._weights[modifier]
+        total = sum(weights)
+        return [w / total for w in weights]
+
+    def draw_index(
+        self, modifier: Optional[str] = None, rng: Optional[random.Random] = None
+    ) -> int:
+        """抽取一个奖品下标"""
+        return self._samplers[modifier].sample(rng)
+
+    def draw(
+        self, modifier: Optional[str] = None, rng: Optional[random.Random] = None
+    ) -> T:
+        """抽取一个奖品"""
+        return self.prizes[self._samplers[modifier].sample(rng)]
+
+    def draw_many(
+        self,
+        k: int,
+        modifier: Optional[str] = None,
+        rng: Optional[random.Random] = None,
+    ) -> List[int]:
+        """抽取 k 个奖品下标"""
+        return self._samplers[modifier].sample_many(k, rng)
+
+
+def boost_weights(
+    weights: List[float], boosted: Sequence[int], factor: float, filler: int
+) -> List[float]:
+    """
+    按比例提升部分奖品的权重，多出的概率从 filler 项中扣除
+
+    Args:
+        weights: 基础权重（已归一化为概率时效果最直观）
+        boosted: 需要提升的奖品下标
+        factor: 提升倍数，如 1.2 表示提升 20%
+        filler: 用于补足差额的奖品下标（通常是“谢谢参与”）
+    """
+    result = list(weights)
+    extra = 0.0
+    for i in boosted:
+        extra += result[i] * (factor - 1)
+        result[i] *= factor
+    result[filler] = max(0.0, result[filler] - extra)
+    return result
@@ -0,0 +1,194 @@
+"""
+交易流水模块
+以追加方式记录积分收支、物品变动和成就解锁，由后台任务批量写入本地滚动文件
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .logger_manager import PluginLogger
+
+
+class TransactionJournal:
+    """异步批量写入的交易流水"""
+
+    DEFAULT_PATH = os.path.join(
+        "data", "plugin_data", "astrbot_plugin_interactive", "journal.jsonl"
+    )
+
+    def __init__(
+        self,
+        logger: PluginLogger,
+        path: str = DEFAULT_PATH,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+        queue_size: int = 10000,
+        batch_size: int = 500,
+    ):
+        """
+        初始化交易流水
+
+        Args:
+            logger: 日志记录器
+            path: 流水文件路径（JSON Lines）
+            max_bytes: 单个文件的最大字节数，超出后滚动
+            backup_count: 保留的历史文件数
+            queue_size: 内存中最多排队的事件数
+            batch_size: 每批最多写入的事件数
+        """
+        self.logger = logger
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self._queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue(
+            maxsize=queue_size
+        )
+        # 队列使用量超过高水位时，提交方需要等待写入任务追上
+        self._high_water = max(1, queue_size * 4 // 5)
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0  # 已写入的事件数
+        self.dropped = 0  # 队列已满被丢弃的事件数
+
+    def record(
+        self,
+        event_type: str,
+        user_id: str,
+        platform: str,
+        **fields: Any,
+    ) -> bool:
+        """
+        记录一条事件（不等待写入）
+
+        Args:
+            event_type: 事件类型，如 earn/spend/item/achievement
+            user_id: 用户ID
+            platform: 平台
+            fields: 事件附加字段
+
+        Returns:
+            是否成功入队，队列已满时返回 False
+        """
+        event = {
+            "ts": int(time.time() * 1000),
+            "type": event_type,
+            "user": f"{platform}:{user_id}",
+        }
+        event.update(fields)
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        if self._queue.qsize() >= self._high_water:
+            self._drained.clear()
+        return True
+
+    async def wait_for_capacity(self) -> None:
+        """队列积压超过高水位时等待后台写入追上（背压）"""
+        if not self._drained.is_set() and self._task is not None:
+            await self._drained.wait()
+
+    def _write_batch(self, lines: List[str]) -> None:
+        """写入一批事件（在线程中执行）"""
+        data = "".join(lines).encode("utf-8")
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        if size and size + len(data) > self.max_bytes:
+            self._rotate()
+        with open(self.path, "ab") as f:
+            f.write(data)
+
+    def _rotate(self) -> None:
+        """滚动文件：journal.jsonl -> journal.jsonl.1 -> ... -> journal.jsonl.N"""
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    async def _writer_loop(self) -> None:
+        """后台写入任务：取出一批事件后统一写入"""
+        stopping = False
+        while not stopping:
+            event = await self._queue.get()
+            batch = []
+            while True:
+                if event is None:
+                    stopping = True
+                    break
+                batch.append(json.dumps(event, ensure_ascii=False) + "\n")
+                if len(batch) >= self.batch_size or self._queue.empty():
+                    break
+                event = self._queue.get_nowait()
+            if batch:
+                try:
+                    await asyncio.to_thread(self._write_batch, batch)
+                    self.written += len(batch)
+                except Exception as e:
+                    self.logger.error(
+                        "交易流水写入失败", count=len(batch), error=str(e)
+                    )
+            if self._queue.qsize() < self._high_water:
+                self._drained.set()
+
+    def start(self) -> None:
+        """启动后台写入任务"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._writer_loop())
+
+    async def stop(self) -> None:
+        """写完队列中剩余的事件后停止"""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        self._drained.set()
+        self.logger.info("交易流水已关闭", written=self.written, dropped=self.dropped)
+
+
+class PendingJournal:
+    """
+    会话内暂存的流水事件
+
+    与 TransactionJournal 接口相同：事件先在内存中排队，会话提交后才写入交易流水，
+    会话回滚时丢弃，避免未生效的修改留下流水记录
+    """
+
+    def __init__(self, journal):
+        self.journal = journal
+        self._events: List[Tuple[str, str, str, Dict[str, Any]]] = []
+
+    def record(
+        self, event_type: str, user_id: str, platform: str, **fields: Any
+    ) -> bool:
+        """暂存一条事件"""
+        self._events.append((event_type, user_id, platform, fields))
+        return True
+
+    def flush(self) -> None:
+        """将暂存的事件写入交易流水"""
+        events, self._events = self._events, []
+        for event_type, user_id, platform, fields in events:
+            self.journal.record(event_type, user_id, platform, **fields)
+
+    def discard(self) -> int:
+        """丢弃暂存的事件，返回丢弃的条数"""
+        count = len(self._events)
+        self._events = []
+        return count
+
+    async def wait_for_capacity(self) -> None:
+        await self.journal.wait_for_capacity()